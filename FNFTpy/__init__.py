@@ -27,14 +27,29 @@ Christoph Mahnke, 2018 - 2023
 
 """
 
-from .auxiliary import get_lib_path, get_fnft_version, print_fnft_version, cmplxrpr
+from .auxiliary import get_lib_path, get_fnft_version, print_fnft_version, cmplxrpr, pad_pow2
+from .fnft_clib import FnftClib, get_fnft_clib
+from .results import GenericResult, NsevResult, KdvvResult, ManakovvResult, NsepResult, NsevInverseResult, SpectrumBatch
 
 # import wrapper functions
-from .fnft_kdvv_wrapper import kdvv_wrapper, kdvv
-from .fnft_manakovv_wrapper import manakovv_wrapper, manakovv
-from .fnft_nsep_wrapper import nsep_wrapper, nsep
-from .fnft_nsev_wrapper import nsev_wrapper, nsev
-from .fnft_nsev_inverse_wrapper import nsev_inverse_xi_wrapper, nsev_inverse_wrapper, nsev_inverse
+from .fnft_kdvv_wrapper import kdvv_wrapper, kdvv, KdvvPlan
+from .fnft_manakovv_wrapper import manakovv_wrapper, manakovv, ManakovvPlan
+from .fnft_nsep_wrapper import nsep_wrapper, nsep, NsepPlan
+from .fnft_nsev_wrapper import nsev_wrapper, nsev, nsev_parallel_segments, nsev_partitioned, nsev_coarse_to_fine, \
+    NsevPlan
+from .fnft_nsev_inverse_wrapper import nsev_inverse_xi_wrapper, nsev_inverse_wrapper, nsev_inverse, NsevInversePlan
+from .batch import nsev_batch, kdvv_batch, manakovv_batch
+from .scattering import compose_ab, compose_segments
+from .incremental import IncrementalNsev
+from .transfer_matrix import nsev_xi, kdvv_xi, manakovv_xi
+from .zoom import NsevZoom, nsev_zoom
+from .chunked import nsev_chunked, kdvv_chunked, manakovv_chunked
+from .tracking import BoundStateTracker
+from .adaptive import nsev_adaptive, kdvv_adaptive, manakovv_adaptive
+from .streaming import stream_frames, nsev_stream
+from .spectrogram import nsev_spectrogram
+from .asynchronous import nsev_async, kdvv_async, manakovv_async, nsep_async, nsev_inverse_async, run_async, \
+    get_async_executor, set_async_concurrency
 from .typesdef import *
 from .options_handling import *
 
@@ -0,0 +1,317 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from warnings import warn
+from .typesdef import *
+from .fnft_nsev_wrapper import nsev
+from .fnft_kdvv_wrapper import kdvv
+from .fnft_manakovv_wrapper import manakovv
+from .tracking import match_bound_states
+
+
+def resample(q, D):
+    """Resample q to D samples by Fourier interpolation (zero-padding or truncation of the spectrum).
+
+    The samples are treated as one period of length len(q) * dt, the resampled signal covers the
+    same period with step len(q) * dt / D. For signals vanishing at the borders of the time window
+    this is the band-limited interpolation of q.
+
+    Arguments:
+
+    * q : samples (complex)
+    * D : number of samples of the resampled signal
+
+    Returns:
+
+    * qr : complex array of D samples
+    """
+    q = np.asarray(q, dtype=numpy_complex)
+    n = len(q)
+    if D == n:
+        return q.copy()
+    c = np.fft.fft(q)
+    out = np.zeros(D, dtype=numpy_complex)
+    m = min(n, D)
+    h = m // 2
+    out[:m - h] = c[:m - h]
+    out[D - h:] = c[n - h:]
+    if (m % 2 == 0) and (h > 0):
+        if D > n:
+            # split the Nyquist coefficient of q between the positive and negative frequency
+            out[h] = 0.5 * c[h]
+            out[D - h] = 0.5 * c[h]
+        else:
+            # fold the two coefficients into the Nyquist coefficient of the result
+            out[D - h] = c[n - h] + c[h]
+    return np.fft.ifft(out) * (D / n)
+
+
+def estimate_errors(fine, coarse, transform, order=2):
+    """Estimate the errors of a result from the result at half the number of samples.
+
+    For a discretization of order p the error of the fine result is about
+    |fine - coarse| / (2**p - 1) (Richardson error estimate).
+
+    Arguments:
+
+    * fine : result calculated with D samples
+    * coarse : result calculated with D // 2 samples (same xi grid)
+    * transform : 'nsev', 'kdvv' or 'manakovv'
+
+    Optional arguments:
+
+    * order : convergence order assumed, default = 2
+
+    Returns:
+
+    * error_xi : array (M) of the largest estimated error of all continuous spectrum fields, per xi
+                 (empty if no continuous spectrum is calculated)
+    * error_bound_states : array of the estimated errors of the bound states of fine, inf for
+                           bound states without partner in coarse
+    * lost : number of bound states of coarse without partner in fine
+    """
+    factor = 1.0 / (2 ** order - 1)
+    # all continuous spectrum fields (contspec_type BOTH), those calculated are compared
+    cont_fields = manakovv_contspec_fields[2] if transform == 'manakovv' else nsev_contspec_fields[2]
+    fields = [k for k in cont_fields if (k in fine) and (k in coarse)]
+    if len(fields) > 0:
+        error_xi = factor * np.max([np.abs(fine[k] - coarse[k]) for k in fields], axis=0)
+    else:
+        error_xi = np.zeros(0)
+    if ('bound_states' in fine) and ('bound_states' in coarse):
+        bs_fine = fine['bound_states']
+        bs_coarse = coarse['bound_states']
+        index = match_bound_states(bs_coarse, bs_fine)
+        error_bound_states = np.full(len(bs_fine), np.inf)
+        matched = index >= 0
+        error_bound_states[matched] = factor * np.abs(bs_fine[matched] - bs_coarse[index[matched]])
+        lost = len(bs_coarse) - int(np.count_nonzero(matched))
+    else:
+        error_bound_states = np.zeros(0)
+        lost = 0
+    return error_xi, error_bound_states, lost
+
+
+def _adaptive(transform, call, signals, tvec, rtol, atol, richardson, order, min_D, max_D, shrink):
+    """Adaptive choice of the number of samples and of Richardson extrapolation, see nsev_adaptive."""
+    if not (rtol >= 0 and atol >= 0 and (rtol > 0 or atol > 0)):
+        raise ValueError("rtol and atol must be non-negative, one of them positive")
+    n = len(signals[0])
+    T1 = np.min(tvec)
+    period = n * (np.max(tvec) - T1) / (n - 1)
+    if min_D < 4:
+        raise ValueError("min_D must be at least 4, got %d" % min_D)
+    cont_fields = manakovv_contspec_fields[2] if transform == 'manakovv' else nsev_contspec_fields[2]
+    cache = {}
+    history = []
+
+    def result(D, ref):
+        if (D, ref) not in cache:
+            if D == n:
+                cache[(D, ref)] = call(signals, tvec, ref)
+            else:
+                cache[(D, ref)] = call([resample(s, D) for s in signals], T1 + np.arange(D) * (period / D), ref)
+        return cache[(D, ref)]
+
+    def difference(D, ref):
+        # largest difference between the results at D and D // 2 (estimate_errors with factor 1)
+        error_xi, error_bs, lost = estimate_errors(result(D, ref), result(D // 2, ref), transform, order=1)
+        return max(np.max(error_xi, initial=0), np.max(error_bs[np.isfinite(error_bs)], initial=0))
+
+    def estimated_order(D, ref):
+        # Richardson extrapolation adds up to one order, as far as the order measured from the
+        # results at D, D // 2 and D // 4 confirms it (it gains nothing e.g. for discontinuous signals)
+        if not ref:
+            return order
+        d1 = difference(D, ref)
+        if d1 == 0:
+            return order + 1
+        d2 = difference(D // 2, ref)
+        gain = np.log2(d2 / d1) - order if d2 > 0 else 0.0
+        return order + min(1.0, max(0.0, gain))
+
+    def estimate(D, ref):
+        fine = result(D, ref)
+        p = estimated_order(D, ref)
+        error_xi, error_bs, lost = estimate_errors(fine, result(D // 2, ref), transform, order=p)
+        ok = (lost == 0) and np.all(np.isfinite(error_bs))
+        if len(error_xi) > 0:
+            scale = max(np.max(np.abs(fine[k])) for k in cont_fields if k in fine)
+            ok = ok and np.all(error_xi <= atol + rtol * scale)
+        if len(error_bs) > 0:
+            ok = ok and np.all(error_bs <= atol + rtol * np.abs(fine['bound_states']))
+        largest = max(np.max(error_xi, initial=0), np.max(error_bs, initial=0))
+        history.append({'D': D, 'richardson': bool(ref), 'order': p, 'error': largest, 'converged': bool(ok)})
+        return ok, error_xi, error_bs, largest
+
+    D = max(n, 2 * min_D)
+    refs = {None: [0, 1], False: [0], True: [1]}[richardson]
+    ref = refs[0]
+    est = estimate(D, ref)
+    if (not est[0]) and (len(refs) > 1):
+        est1 = estimate(D, refs[1])
+        if est1[0] or (est1[3] < est[3]):
+            ref, est = refs[1], est1
+    if est[0]:
+        while shrink and (D // 4 >= min_D):
+            est_half = estimate(D // 2, ref)
+            if not est_half[0]:
+                break
+            D, est = D // 2, est_half
+    else:
+        while (not est[0]) and (2 * D <= max_D):
+            D *= 2
+            est = estimate(D, ref)
+    if not est[0]:
+        warn("%s_adaptive: tolerance not met with D = %d samples (max_D = %d)" % (transform, D, max_D))
+    res = result(D, ref)
+    metadata = dict(res.metadata) if res.metadata is not None else {}
+    metadata.update({'D': D, 'T1': T1, 'T2': T1 + (D - 1) * period / D, 'richardson': bool(ref),
+                     'converged': bool(est[0]), 'error_xi': est[1], 'error_bound_states': est[2],
+                     'levels': history, 'transforms': len(cache)})
+    res.metadata = metadata
+    return res
+
+
+def nsev_adaptive(q, tvec, rtol=1e-6, atol=0.0, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, richardson=None, order=2,
+                  min_D=64, max_D=2 ** 20, shrink=True, **kwargs):
+    """Calculate the NFT (NSE, vanishing boundaries) with the number of samples chosen to meet a tolerance.
+
+    The discretization error of a result with D samples is estimated from the result with D // 2
+    samples (see estimate_errors). Starting with D = len(q), the signal is resampled by Fourier
+    interpolation (see resample) to twice the number of samples until the estimated errors meet
+    the tolerance, or, if the tolerance is met, to half the number of samples as long as the
+    tolerance is still met. The result with the smallest D meeting the tolerance is returned.
+
+    The tolerance is met if the estimated error of every xi is below atol + rtol * max(|cont|)
+    (maximum over all xi and continuous spectrum fields), every bound state has a partner at
+    D // 2 with estimated error below atol + rtol * |bound state|, and no bound state is lost.
+
+    Resampling keeps the period len(q) * dt covered by the samples, thus the time window of a
+    resampled result is T1 ... T1 + (D - 1) * len(q) * dt / D (see res.metadata['T2']). The
+    signal has to vanish at the borders of the time window.
+
+    Arguments:
+
+    * q : numpy array holding the samples of the field to be analyzed
+    * tvec : time vector
+
+    Optional arguments:
+
+    * rtol, atol : relative and absolute tolerance, default = 1e-6, 0
+    * Xi1, Xi2, M, K, kappa : see nsev
+    * richardson : use Richardson extrapolation of FNFT (ref=1). Default = None: chosen at the
+                   first D, used if the tolerance is met only with it or its error is smaller
+    * order : convergence order of the discretization assumed for the error estimate, default = 2
+              (the lowest order of the FNFT discretizations, higher orders make the estimate
+              conservative). Richardson extrapolation adds up to one order, as far as confirmed
+              by the order measured from the results at D, D // 2 and D // 4.
+    * min_D, max_D : limits of the number of samples, default = 64, 2**20
+    * shrink : try fewer samples than len(q) if the tolerance is met, default = True
+    * kwargs : further arguments of nsev (e.g. dis, cst, dst, bsl), except ref
+
+    Returns:
+
+    * res : NsevResult (see nsev) of the chosen D. res.metadata holds the fields D, T1, T2,
+            richardson, converged, error_xi (estimated error per xi), error_bound_states
+            (estimated error per bound state), levels (list of the estimates made, with the
+            order used) and transforms (number of calls of nsev), in addition to the metadata
+            of nsev (e.g. discrete_spectrum, padding)
+
+    """
+    if 'ref' in kwargs:
+        raise ValueError("ref is chosen by nsev_adaptive, use the argument richardson")
+
+    def call(signals, t, ref):
+        return nsev(signals[0], t, Xi1=Xi1, Xi2=Xi2, M=M, K=K, kappa=kappa, ref=ref, **kwargs)
+
+    return _adaptive('nsev', call, [np.asarray(q)], tvec, rtol, atol, richardson, order, min_D, max_D, shrink)
+
+
+def kdvv_adaptive(u, tvec, rtol=1e-6, atol=0.0, K=128, M=128, Xi1=-2, Xi2=2, richardson=None, order=2,
+                  min_D=64, max_D=2 ** 20, shrink=True, **kwargs):
+    """Calculate the NFT (KdV, vanishing boundaries) with the number of samples chosen to meet a tolerance.
+
+    See nsev_adaptive for the controller and the tolerance.
+
+    Arguments:
+
+    * u : numpy array holding the samples of the field to be analyzed
+    * tvec : time vector
+
+    Optional arguments:
+
+    * rtol, atol, richardson, order, min_D, max_D, shrink : see nsev_adaptive
+    * K, M, Xi1, Xi2 : see kdvv
+    * kwargs : further arguments of kdvv (e.g. dis, cst, dst, bsl), except ref
+
+    Returns:
+
+    * res : KdvvResult (see kdvv) of the chosen D, res.metadata see nsev_adaptive
+
+    """
+    if 'ref' in kwargs:
+        raise ValueError("ref is chosen by kdvv_adaptive, use the argument richardson")
+
+    def call(signals, t, ref):
+        return kdvv(signals[0], t, K=K, M=M, Xi1=Xi1, Xi2=Xi2, ref=ref, **kwargs)
+
+    return _adaptive('kdvv', call, [np.asarray(u)], tvec, rtol, atol, richardson, order, min_D, max_D, shrink)
+
+
+def manakovv_adaptive(q1, q2, tvec, rtol=1e-6, atol=0.0, Xi1=-1.75, Xi2=2, M=128, K=128, kappa=1, richardson=None,
+                      order=2, min_D=64, max_D=2 ** 20, shrink=True, **kwargs):
+    """Calculate the NFT (Manakov, vanishing boundaries) with the number of samples chosen to meet a tolerance.
+
+    See nsev_adaptive for the controller and the tolerance. Both components are resampled.
+
+    Arguments:
+
+    * q1, q2 : numpy arrays holding the samples of the two components
+    * tvec : time vector
+
+    Optional arguments:
+
+    * rtol, atol, richardson, order, min_D, max_D, shrink : see nsev_adaptive
+    * Xi1, Xi2, M, K, kappa : see manakovv
+    * kwargs : further arguments of manakovv (e.g. dis, cst, dst, bsl), except ref
+
+    Returns:
+
+    * res : ManakovvResult (see manakovv) of the chosen D, res.metadata see nsev_adaptive
+
+    """
+    if 'ref' in kwargs:
+        raise ValueError("ref is chosen by manakovv_adaptive, use the argument richardson")
+
+    def call(signals, t, ref):
+        return manakovv(signals[0], signals[1], t, Xi1=Xi1, Xi2=Xi2, M=M, K=K, kappa=kappa, ref=ref, **kwargs)
+
+    return _adaptive('manakovv', call, [np.asarray(q1), np.asarray(q2)], tvec, rtol, atol, richardson, order,
+                     min_D, max_D, shrink)
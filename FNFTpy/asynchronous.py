@@ -0,0 +1,181 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .fnft_kdvv_wrapper import kdvv
+from .fnft_manakovv_wrapper import manakovv
+from .fnft_nsep_wrapper import nsep
+from .fnft_nsev_wrapper import nsev
+from .fnft_nsev_inverse_wrapper import nsev_inverse
+
+_async_executor = None
+_async_executor_lock = threading.Lock()
+
+
+def get_async_executor():
+    """Return the executor used by the async functions (nsev_async, ...) if no executor is given.
+
+    The executor is a ThreadPoolExecutor created on the first call. Its number of threads is the
+    maximum number of transforms running at the same time, further calls are queued. FNFT releases
+    the GIL, so the transforms run in parallel while the event loop stays responsive.
+
+    Returns:
+
+    * executor : concurrent.futures.ThreadPoolExecutor
+
+    """
+    global _async_executor
+    executor = _async_executor
+    if executor is None:
+        with _async_executor_lock:
+            if _async_executor is None:
+                _async_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                     thread_name_prefix='FNFTpy-async')
+            executor = _async_executor
+    return executor
+
+
+def set_async_concurrency(max_workers):
+    """Set the maximum number of transforms run concurrently by the async functions.
+
+    A new executor with max_workers threads is used for all following calls. Transforms already
+    submitted to the previous executor are finished, then its threads exit.
+
+    Arguments:
+
+    * max_workers : number of threads (>= 1)
+
+    """
+    global _async_executor
+    if (type(max_workers) != int) or (max_workers < 1):
+        raise ValueError("max_workers must be a positive integer, got %r" % (max_workers,))
+    with _async_executor_lock:
+        old = _async_executor
+        _async_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='FNFTpy-async')
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+async def run_async(func, *args, executor=None, **kwargs):
+    """Run func(*args, **kwargs) on an executor and wait for the result without blocking the event loop.
+
+    Cancellation: if the awaiting task is cancelled while the call is still queued, the call is
+    removed from the executor and never runs. A call already running in FNFT can not be
+    interrupted; it finishes in the background and its result is discarded.
+    The arrays passed must not be modified until the call is finished.
+
+    Arguments:
+
+    * func : function to call, e.g. nsev or the execute method of a plan
+    * args : positional arguments of func
+
+    Optional arguments:
+
+    * executor : concurrent.futures executor, default = None (get_async_executor())
+    * kwargs : keyword arguments of func
+
+    Returns:
+
+    * result of func
+
+    """
+    if executor is None:
+        executor = get_async_executor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def nsev_async(q, tvec, *args, executor=None, **kwargs):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) without blocking the event loop.
+
+    Same arguments and result as nsev, the transform runs on the executor (see run_async).
+
+    Optional arguments:
+
+    * executor : concurrent.futures executor, default = None (get_async_executor())
+
+    """
+    return await run_async(nsev, q, tvec, *args, executor=executor, **kwargs)
+
+
+async def kdvv_async(u, tvec, *args, executor=None, **kwargs):
+    """Calculate the Nonlinear Fourier Transform (KdV, vanishing boundaries) without blocking the event loop.
+
+    Same arguments and result as kdvv, the transform runs on the executor (see run_async).
+
+    Optional arguments:
+
+    * executor : concurrent.futures executor, default = None (get_async_executor())
+
+    """
+    return await run_async(kdvv, u, tvec, *args, executor=executor, **kwargs)
+
+
+async def manakovv_async(q1, q2, tvec, *args, executor=None, **kwargs):
+    """Calculate the Nonlinear Fourier Transform (Manakov, vanishing boundaries) without blocking the event loop.
+
+    Same arguments and result as manakovv, the transform runs on the executor (see run_async).
+
+    Optional arguments:
+
+    * executor : concurrent.futures executor, default = None (get_async_executor())
+
+    """
+    return await run_async(manakovv, q1, q2, tvec, *args, executor=executor, **kwargs)
+
+
+async def nsep_async(q, T1, T2, *args, executor=None, **kwargs):
+    """Calculate the Nonlinear Fourier Transform (NSE, periodic boundaries) without blocking the event loop.
+
+    Same arguments and result as nsep, the transform runs on the executor (see run_async).
+
+    Optional arguments:
+
+    * executor : concurrent.futures executor, default = None (get_async_executor())
+
+    """
+    return await run_async(nsep, q, T1, T2, *args, executor=executor, **kwargs)
+
+
+async def nsev_inverse_async(xivec, tvec, contspec, bound_states, discspec, *args, executor=None, **kwargs):
+    """Calculate the Inverse Nonlinear Fourier Transform (NSE, vanishing boundaries) without blocking the event loop.
+
+    Same arguments and result as nsev_inverse, the transform runs on the executor (see run_async).
+
+    Optional arguments:
+
+    * executor : concurrent.futures executor, default = None (get_async_executor())
+
+    """
+    return await run_async(nsev_inverse, xivec, tvec, contspec, bound_states, discspec, *args, executor=executor,
+                           **kwargs)
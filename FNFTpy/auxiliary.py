@@ -26,9 +26,14 @@ Contributors:
 Christoph Mahnke, 2018-2023
 
 """
+import array
 from warnings import warn
 from .typesdef import *
 
+# results occupying less than this fraction of a buffer allocated by FNFTpy are copied
+# instead of returned as views, so that they do not keep the oversized buffer alive
+result_trim_threshold = 0.5
+
 
 def get_lib_path():
     """Return the path of the FNFT file.
@@ -83,19 +88,13 @@ def get_fnft_version():
         * suffix : suffix string
 
     """
+    from .fnft_clib import get_fnft_clib  # imported here, fnft_clib depends on this module
     suffix_maxlen = 8  # defined in  FNFT/include/fnft_config.h.in
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=0)
-    clib_versionf = fnft_clib.fnft_version
-    clib_versionf.restype = ctypes_int
+    clib_versionf = get_fnft_clib().prototype('fnft_version')
     version_major = ctypes_uint(0)
     version_minor = ctypes_uint(0)
     version_patch = ctypes_uint(0)
     suffix_buff = ctypes.create_string_buffer(suffix_maxlen)
-    clib_versionf.argtypes = [
-        ctypes.POINTER(ctypes_uint),
-        ctypes.POINTER(ctypes_uint),
-        ctypes.POINTER(ctypes_uint),
-        type(suffix_buff)]
 
     rv = clib_versionf(ctypes.byref(version_major),
                        ctypes.byref(version_minor),
@@ -159,6 +158,169 @@ def check_return_code(rv):
         warn(wstring)
 
 
+def as_input_array(x, size=None, name='q'):
+    """Return the samples x as an array which can be passed to FNFT, copying only if necessary.
+
+    FNFT does not modify its input, so a one-dimensional, aligned, C-contiguous numpy array of
+    dtype complex128 is returned unchanged. Any other input is converted exactly once.
+    Objects supporting the buffer protocol (e.g. memoryview, array.array, mmap) are wrapped
+    without a copy. Untyped buffers of raw bytes (format 'B': bytes, bytearray, mmap or a
+    memoryview of them) are interpreted as complex128 samples; typed buffers (e.g. array.array,
+    also with typecode 'b' or 'B') are converted by value.
+
+    Arguments:
+
+    * x : samples, numpy array, buffer object or sequence
+
+    Optional arguments:
+
+    * size : number of samples x must have, default = None (no check)
+    * name : name of the argument, used in the error message, default = 'q'
+
+    Returns:
+
+    * arr : one-dimensional C-contiguous complex128 numpy array
+    """
+    if not isinstance(x, np.ndarray):
+        try:
+            view = memoryview(x)
+        except TypeError:  # no buffer object, e.g. list
+            x = np.asarray(x)
+        else:
+            if view.format == 'B' and not isinstance(x, array.array):  # raw bytes
+                x = np.frombuffer(view, dtype=numpy_complex)
+            else:
+                x = np.asarray(view)
+    if x.ndim != 1:
+        raise ValueError("%s: expected one-dimensional array, got shape %s" % (name, x.shape))
+    if (size is not None) and (x.shape[0] != size):
+        raise ValueError("%s: expected %d samples, got %d" % (name, size, x.shape[0]))
+    if x.dtype == numpy_complex and x.flags['C_CONTIGUOUS'] and x.flags['ALIGNED']:
+        return x
+    return np.ascontiguousarray(x, dtype=numpy_complex)
+
+
+def check_out_array(arr, size, name):
+    """Check a caller-supplied output array. Raise a ValueError if FNFT can not write into it.
+
+    FNFT writes directly into the memory of the array, so it has to be a writeable, aligned,
+    C-contiguous one-dimensional numpy array of dtype complex128 with exactly size elements
+    (e.g. a row of a C-ordered two-dimensional result array).
+
+    Arguments:
+
+    * arr : output array to check
+    * size : number of elements the array must have
+    * name : name of the argument, used in the error message
+
+    Returns:
+
+    * arr : the unchanged output array
+    """
+    if not isinstance(arr, np.ndarray):
+        raise ValueError("%s: expected numpy array, got %s" % (name, type(arr)))
+    if arr.dtype != numpy_complex:
+        raise ValueError("%s: expected dtype complex128, got %s" % (name, arr.dtype))
+    if arr.shape != (size,):
+        raise ValueError("%s: expected shape (%d,), got %s" % (name, size, arr.shape))
+    if not (arr.flags['C_CONTIGUOUS'] and arr.flags['ALIGNED']):
+        raise ValueError("%s: array must be aligned and C-contiguous" % name)
+    if not arr.flags['WRITEABLE']:
+        raise ValueError("%s: array is not writeable" % name)
+    return arr
+
+
+def select_out_array(arr, own, name):
+    """Return the buffer FNFT should write into: a checked caller-supplied array or the own buffer.
+
+    Arguments:
+
+    * arr : caller-supplied output array or None
+    * own : buffer allocated by the plan, numpy array or ctypes_nullptr if not calculated
+    * name : name of the argument, used in error messages
+
+    Returns:
+
+    * buffer : own if arr is None, otherwise arr (see check_out_array)
+    """
+    if arr is None:
+        return own
+    if own is ctypes_nullptr:
+        raise ValueError("%s given, but this part of the spectrum is not calculated with the chosen options" % name)
+    return check_out_array(arr, len(own), name)
+
+
+def result_array_func(buffer, used, copy, own=True):
+    """Return the function used to turn slices of an output buffer into result arrays.
+
+    Slices of caller-supplied buffers are always returned as views. Slices of buffers allocated
+    by FNFTpy are copied if copy is True or if the result uses less than result_trim_threshold of
+    the buffer (copy-on-trim). Otherwise the views are returned.
+
+    Arguments:
+
+    * buffer : output buffer (numpy array or ctypes_nullptr)
+    * used : number of elements of the buffer holding results, None if the whole buffer is used
+    * copy : whether copies are requested
+    * own : whether the buffer was allocated by FNFTpy, default = True
+
+    Returns:
+
+    * func : np.copy or np.asarray
+    """
+    if (buffer is ctypes_nullptr) or (not own):
+        return np.asarray
+    if copy or ((used is not None) and (used < result_trim_threshold * len(buffer))):
+        return np.copy
+    return np.asarray
+
+
+def next_pow2(D):
+    """Return the smallest power of two >= D (D >= 1)."""
+    return 1 << (int(D) - 1).bit_length()
+
+
+def pad_pow2(signals, T1, T2):
+    """Zero-pad signals to the next power of two number of samples, extending the time window.
+
+    The zeros are split evenly between both sides (one more on the right for an odd number), the
+    time step is kept. For vanishing boundaries zero-padding does not change the spectrum, while
+    the fast discretizations of FNFT work best with a power of two number of samples.
+
+    Arguments:
+
+    * signals : list of sample arrays of the same length D (e.g. [q] or [q1, q2])
+    * T1, T2 : time positions of the first and the last sample
+
+    Returns:
+
+    * padded : list of complex128 arrays with next_pow2(D) samples (the input arrays, if D is a power of two)
+    * T1, T2 : time positions of the first and the last padded sample
+    * padding : tuple (number of zeros on the left, number of zeros on the right)
+    """
+    D = len(signals[0])
+    Dp = next_pow2(D)
+    if Dp == D:
+        return list(signals), T1, T2, (0, 0)
+    left = (Dp - D) // 2
+    right = Dp - D - left
+    dt = (T2 - T1) / (D - 1)
+    padded = []
+    for x in signals:
+        xp = np.zeros(Dp, dtype=numpy_complex)
+        xp[left:left + D] = x
+        padded.append(xp)
+    return padded, T1 - left * dt, T2 + right * dt, (left, right)
+
+
+def add_metadata(res, key, value):
+    """Store value as res.metadata[key] (creating the metadata dictionary if needed) and return res."""
+    metadata = dict(res.metadata) if res.metadata is not None else {}
+    metadata[key] = value
+    res.metadata = metadata
+    return res
+
+
 def cmplxrpr(z, dig=3,fmtter='%d', formatter = "e", accuracy=8):
     """get string representation of a complex numbers
 
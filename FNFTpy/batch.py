@@ -0,0 +1,509 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import sys
+import atexit
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from warnings import warn
+from .typesdef import *
+from .fnft_clib import get_fnft_clib, init_fnft_clib
+from .auxiliary import get_winmode_param
+from .fnft_nsev_wrapper import NsevPlan
+from .fnft_kdvv_wrapper import KdvvPlan
+from .fnft_manakovv_wrapper import ManakovvPlan
+from .options_handling import get_nsev_options, get_kdvv_options, get_manakovv_options
+from .results import SpectrumBatch
+
+
+def as_input_matrix(x, name='Q'):
+    """Return the signals x as (N, D) array which can be passed to FNFT row by row.
+
+    C-contiguous complex128 arrays are returned unchanged, everything else is converted once.
+
+    Arguments:
+
+    * x : two-dimensional array holding one signal per row
+
+    Optional arguments:
+
+    * name : name of the argument, used in the error message, default = 'Q'
+
+    Returns:
+
+    * arr : C-contiguous complex128 numpy array of shape (N, D)
+    """
+    x = np.asarray(x)
+    if x.ndim != 2:
+        raise ValueError("%s: expected two-dimensional array (N, D), got shape %s" % (name, x.shape))
+    if x.dtype == numpy_complex and x.flags['C_CONTIGUOUS'] and x.flags['ALIGNED']:
+        return x
+    return np.ascontiguousarray(x, dtype=numpy_complex)
+
+
+def row_chunks(N, nchunks):
+    """Split range(N) into at most nchunks consecutive (start, stop) ranges of (almost) equal length."""
+    nchunks = max(1, min(N, nchunks))
+    bounds = np.linspace(0, N, nchunks + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def run_batch(make_plan, inputs, ncont, M, cont_fields, disc_fields, bsg=None, workers=None, time_windows=None):
+    """Execute a plan for every row of the input arrays on a thread pool.
+
+    Every thread creates its own plan with make_plan(). The continuous spectra are written
+    directly into one (N, ncont * M) array, the discrete spectra of all rows are collected and
+    stored as flat arrays with offsets. FNFT error codes are returned per row, no warnings are given.
+
+    Arguments:
+
+    * make_plan : function without arguments returning a new plan (e.g. NsevPlan)
+    * inputs : list of (N, D) arrays, passed row by row to plan.execute
+    * ncont : number of continuous spectrum fields written by FNFT (0 if not calculated)
+    * M : number of values per continuous spectrum field
+    * cont_fields : names of the continuous spectrum fields
+    * disc_fields : names of the discrete spectrum fields
+
+    Optional arguments:
+
+    * bsg : bound state guesses, passed to every call of plan.execute, default = None
+    * workers : number of threads, default = os.cpu_count(). 1 runs in the calling thread.
+    * time_windows : None or (N, 2) array of the time positions T1, T2 of the first and the last
+                     sample of each row (see set_time_window of the plans), default = None
+
+    Returns:
+
+    * batch : SpectrumBatch holding the fields
+
+        * return_value : (N,) array of FNFT return values
+        * bound_states_num : (N,) array, number of bound states of each row
+        * offsets : (N + 1,) array, bound states of row i are bound_states[offsets[i]:offsets[i+1]]
+        * bound_states : flat array holding the bound states of all rows
+        * disc_norm, disc_res : flat arrays of the discrete spectrum (same offsets as bound_states)
+        * cont_xxx : (N, M) arrays of the continuous spectrum fields, one row per signal
+
+    """
+    N = inputs[0].shape[0]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return_value = np.zeros(N, dtype=int)
+    bound_states_num = np.zeros(N, dtype=np.int64)
+    cont = np.zeros((N, ncont * M), dtype=numpy_complex) if ncont > 0 else None
+    local = threading.local()
+
+    def process_rows(rows):
+        plan = getattr(local, 'plan', None)
+        if plan is None:
+            plan = make_plan()
+            local.plan = plan
+        bound_states = []
+        disc = {name: [] for name in disc_fields}
+        for i in range(rows[0], rows[1]):
+            if time_windows is not None:
+                plan.set_time_window(time_windows[i, 0], time_windows[i, 1])
+            res = plan.execute(*[x[i] for x in inputs], bsg=bsg, copy=True,
+                               out_cont=None if cont is None else cont[i], check=False)
+            return_value[i] = res.return_value
+            bound_states_num[i] = res.bound_states_num
+            bound_states.append(res.bound_states)
+            for name in disc_fields:
+                disc[name].append(res[name])
+        return bound_states, disc
+
+    chunks = row_chunks(N, 4 * workers)
+    if workers == 1:
+        parts = [process_rows(rows) for rows in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(process_rows, chunks))
+
+    def flatten(lists):
+        arrays = [a for part in lists for a in part]
+        if len(arrays) == 0:
+            return np.zeros(0, dtype=numpy_complex)
+        return np.concatenate(arrays)
+
+    offsets = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(bound_states_num, out=offsets[1:])
+    discrete = {'bound_states': flatten([p[0] for p in parts])}
+    for name in disc_fields:
+        discrete[name] = flatten([p[1][name] for p in parts])
+    continuous = {}
+    for k, name in enumerate(cont_fields):
+        continuous[name] = cont[:, k * M:(k + 1) * M]
+    return SpectrumBatch(return_value, offsets, discrete, continuous)
+
+
+# state of a worker process of run_batch_processes, set by _process_worker_init
+_worker_state = None
+
+
+def _attach_shared(name, shape, dtype):
+    """Attach to the shared memory block name and return it with a numpy array using its memory."""
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)  # the parent process unlinks the block
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _process_worker_cleanup():
+    """Release the arrays of the worker process before closing its shared memory blocks."""
+    global _worker_state
+    if _worker_state is not None:
+        blocks = _worker_state['blocks']
+        _worker_state = None
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                pass
+
+
+def _process_worker_init(spec):
+    """Initializer of the worker processes: load FNFT, create the plan and attach the shared memory."""
+    global _worker_state
+    init_fnft_clib(spec['libpath'], spec['winmode'])
+    if not spec['display_c_msg']:
+        get_fnft_clib().suppress_c_messages()
+    blocks = []
+    arrays = {}
+    for name, (shm_name, shape, dtype) in spec['arrays'].items():
+        shm, arrays[name] = _attach_shared(shm_name, shape, dtype)
+        blocks.append(shm)
+    _worker_state = {'plan': spec['plan_class'](*spec['plan_args']),
+                     'bsg': spec['bsg'],
+                     'ninputs': spec['ninputs'],
+                     'arrays': arrays,
+                     'blocks': blocks}
+    atexit.register(_process_worker_cleanup)
+
+
+def _process_worker_rows(rows):
+    """Transform the rows [rows[0], rows[1]) in a worker process, writing into the shared arrays."""
+    plan = _worker_state['plan']
+    bsg = _worker_state['bsg']
+    arrays = _worker_state['arrays']
+    inputs = [arrays['input%d' % j] for j in range(_worker_state['ninputs'])]
+    cont = arrays.get('cont')
+    bound_states = arrays.get('bound_states')
+    disc = arrays.get('disc')
+    time_windows = arrays.get('time_windows')
+    for i in range(rows[0], rows[1]):
+        if time_windows is not None:
+            plan.set_time_window(time_windows[i, 0], time_windows[i, 1])
+        res = plan.execute(*[x[i] for x in inputs], bsg=bsg, copy=False,
+                           out_cont=None if cont is None else cont[i],
+                           out_bound_states=None if bound_states is None else bound_states[i],
+                           out_disc=None if disc is None else disc[i], check=False)
+        arrays['return_value'][i] = res.return_value
+        arrays['bound_states_num'][i] = res.bound_states_num
+
+
+def _get_mp_context(mp_context):
+    """Return the multiprocessing context for None, a start method name or a context."""
+    if (mp_context is None) or isinstance(mp_context, str):
+        return multiprocessing.get_context(mp_context)
+    return mp_context
+
+
+def run_batch_processes(plan_class, plan_args, inputs, ncont, M, K, cont_fields, disc_fields, bsg=None,
+                        workers=None, mp_context=None, display_c_msg=True, time_windows=None):
+    """Execute a plan for every row of the input arrays on a process pool using shared memory.
+
+    The input arrays and all outputs are placed in multiprocessing.shared_memory blocks. The
+    worker processes load FNFT and create their plan once (in the pool initializer), then read
+    the input rows and let FNFT write the spectra directly into the shared blocks. Only the
+    row ranges are sent to the workers, no signal or spectrum is pickled. After all rows are
+    processed, the results are copied once from the shared blocks into regular arrays and the
+    blocks are released.
+
+    The start methods 'fork' and 'spawn' (and 'forkserver') are supported. With 'spawn', the
+    workers load the same library file as the calling process. As usual for multiprocessing,
+    scripts using 'spawn' must guard their main code with if __name__ == '__main__'.
+
+    If a worker process terminates abruptly (e.g. a crash in native code), the calling process
+    is not affected: the rows which were not finished get the return value -1 and no discrete
+    spectrum, and a warning is given.
+
+    Arguments:
+
+    * plan_class : class of the plan (e.g. NsevPlan), must be importable in the workers
+    * plan_args : arguments of plan_class, picklable
+    * inputs : list of (N, D) arrays, passed row by row to plan.execute
+    * ncont : number of continuous spectrum fields written by FNFT (0 if not calculated)
+    * M : number of values per continuous spectrum field
+    * K : maximum number of bound states per row
+    * cont_fields : names of the continuous spectrum fields
+    * disc_fields : names of the discrete spectrum fields
+
+    Optional arguments:
+
+    * bsg : bound state guesses, passed to every call of plan.execute, default = None
+    * workers : number of processes, default = os.cpu_count()
+    * mp_context : multiprocessing context or start method ('fork', 'spawn', 'forkserver'),
+                   default = None (default start method of multiprocessing)
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+    * time_windows : None or (N, 2) array of the time windows of the rows, see run_batch, default = None
+
+    Returns:
+
+    * batch : SpectrumBatch, see run_batch
+
+    """
+    N = inputs[0].shape[0]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    clib = get_fnft_clib()
+    blocks = []
+    spec = {'libpath': clib.libpath, 'winmode': get_winmode_param(), 'display_c_msg': display_c_msg,
+            'plan_class': plan_class, 'plan_args': plan_args, 'bsg': bsg, 'ninputs': len(inputs),
+            'arrays': {}}
+
+    def shared_array(name, shape, dtype):
+        nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        blocks.append(shm)
+        spec['arrays'][name] = (shm.name, shape, dtype)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def run():
+        for j, x in enumerate(inputs):
+            shared_array('input%d' % j, x.shape, numpy_complex)[...] = x
+        if time_windows is not None:
+            shared_array('time_windows', (N, 2), numpy_double)[...] = time_windows
+        return_value = shared_array('return_value', (N,), np.int64)
+        bound_states_num = shared_array('bound_states_num', (N,), np.int64)
+        cont = shared_array('cont', (N, ncont * M), numpy_complex) if ncont > 0 else None
+        ndisc = len(disc_fields)
+        if ndisc > 0:
+            bound_states = shared_array('bound_states', (N, K), numpy_complex)
+            disc = shared_array('disc', (N, ndisc * K), numpy_complex)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_get_mp_context(mp_context),
+                                 initializer=_process_worker_init, initargs=(spec,)) as executor:
+            futures = [(rows, executor.submit(_process_worker_rows, rows)) for rows in row_chunks(N, 4 * workers)]
+            failed = 0
+            for rows, future in futures:
+                try:
+                    future.result()
+                except BrokenProcessPool:
+                    return_value[rows[0]:rows[1]] = -1
+                    bound_states_num[rows[0]:rows[1]] = 0
+                    failed += rows[1] - rows[0]
+        if failed > 0:
+            warn("a worker process terminated abruptly, return_value of %d rows set to -1" % failed)
+        # compact the discrete spectra: row i holds bound_states_num[i] values per field
+        # (for two fields, FNFT writes the first field to disc[i, 0:k] and the second to disc[i, k:2k])
+        discrete = {'bound_states': np.zeros(0, dtype=numpy_complex)}
+        if ndisc > 0:
+            num = bound_states_num[:, np.newaxis]
+            discrete['bound_states'] = bound_states[np.arange(K) < num]
+            col = np.arange(ndisc * K)
+            for j, name in enumerate(disc_fields):
+                discrete[name] = disc[(col >= j * num) & (col < (j + 1) * num)]
+        continuous = {}
+        for k, name in enumerate(cont_fields):
+            continuous[name] = np.array(cont[:, k * M:(k + 1) * M])
+        offsets = np.zeros(N + 1, dtype=np.int64)
+        np.cumsum(bound_states_num, out=offsets[1:])
+        return SpectrumBatch(np.array(return_value, dtype=int), offsets, discrete, continuous)
+
+    try:
+        return run()
+    finally:
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:  # arrays still referenced by a traceback, released by the garbage collector
+                pass
+            shm.unlink()
+
+
+def run_backend(backend, plan_class, plan_args, inputs, ncont, M, K, cont_fields, disc_fields, bsg, workers,
+                mp_context, display_c_msg, time_windows=None):
+    """Run a batch on the thread pool (backend='thread') or on the process pool (backend='process').
+
+    See run_batch and run_batch_processes. The arguments are those of run_batch_processes, the plans of the thread backend are created by
+    plan_class(*plan_args). With backend='thread' and display_c_msg=False the messages of the C-library are
+    suppressed once, before the threads are started.
+    """
+    if backend == 'thread':
+        if not display_c_msg:  # suppress once, before the threads are started
+            get_fnft_clib().suppress_c_messages()
+        return run_batch(lambda: plan_class(*plan_args), inputs, ncont, M, cont_fields, disc_fields, bsg=bsg,
+                         workers=workers, time_windows=time_windows)
+    if backend == 'process':
+        return run_batch_processes(plan_class, plan_args, inputs, ncont, M, K, cont_fields, disc_fields, bsg=bsg,
+                                   workers=workers, mp_context=mp_context, display_c_msg=display_c_msg,
+                                   time_windows=time_windows)
+    raise ValueError("backend must be 'thread' or 'process', got %r" % (backend,))
+
+
+def nsev_batch(Q, tvec, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None, bsl=None, bsg=None, niter=None,
+               tol=None, Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, bb=None,
+               workers=None, backend='thread', mp_context=None, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) for a batch of signals.
+
+    Each row of Q is transformed as by nsev(Q[i], tvec, ...). The rows are distributed on a
+    thread pool, every thread uses its own NsevPlan. FNFT releases the GIL, so the calls run in
+    parallel.
+
+    Arguments:
+
+    * Q : numpy array of shape (N, D) holding one signal per row
+    * tvec : time vector (D samples, same for all signals)
+
+    Optional arguments:
+
+    * Xi1, Xi2, M, K, kappa, bsf, bsl, bsg, niter, tol, Dsub, dst, cst, nf, dis, ref, bb :
+      see nsev. bsg is used for every row.
+    * workers : number of threads or processes, default = os.cpu_count()
+    * backend : 'thread' (thread pool) or 'process' (process pool with shared memory, see
+                run_batch_processes), default = 'thread'
+    * mp_context : multiprocessing context or start method for backend='process', default = None
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * batch : SpectrumBatch holding the fields (depending on options, dict-compatible)
+
+        * return_value : (N,) array of FNFT return values (no warning is given for errors)
+        * bound_states_num : (N,) array, number of bound states of each signal
+        * offsets : (N + 1,) array, bound states of signal i are bound_states[offsets[i]:offsets[i+1]]
+        * bound_states : flat array holding the bound states of all signals
+        * disc_norm, disc_res : flat arrays of norming constants / residues, same offsets as bound_states
+        * cont_ref, cont_a, cont_b : (N, M) arrays of the continuous spectrum
+        * options : NsevOptionsStruct with the options used (batch['options'] gives its repr)
+
+    """
+    Q = as_input_matrix(Q, 'Q')
+    D = Q.shape[1]
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    options = get_nsev_options(bsf=bsf, bsl=bsl, niter=niter, tol=tol, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis,
+                               ref=ref, bb=bb)
+    cont_fields = nsev_contspec_fields.get(options.contspec_type, [])
+    disc_fields = discspec_fields.get(options.discspec_type, [])
+    plan_args = (D, T1, T2, Xi1, Xi2, M, K, kappa, options)
+    batch = run_backend(backend, NsevPlan, plan_args, [Q], len(cont_fields), M, K, cont_fields, disc_fields, bsg,
+                        workers, mp_context, display_c_msg)
+    batch.options = options
+    return batch
+
+
+def kdvv_batch(U, tvec, K=128, M=128, Xi1=-2, Xi2=2, dis=None, bsl=None, bsg=None, niter=None, dst=None, cst=None,
+               nf=None, ref=None, gs=None, workers=None, backend='thread', mp_context=None, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (KdV, vanishing boundaries) for a batch of signals.
+
+    Each row of U is transformed as by kdvv(U[i], tvec, ...). The rows are distributed on a
+    thread pool, every thread uses its own KdvvPlan.
+
+    Arguments:
+
+    * U : numpy array of shape (N, D) holding one signal per row
+    * tvec : time vector (D samples, same for all signals)
+
+    Optional arguments:
+
+    * K, M, Xi1, Xi2, dis, bsl, bsg, niter, dst, cst, nf, ref, gs : see kdvv. bsg is used for every row.
+    * workers : number of threads or processes, default = os.cpu_count()
+    * backend : 'thread' (thread pool) or 'process' (process pool with shared memory, see
+                run_batch_processes), default = 'thread'
+    * mp_context : multiprocessing context or start method for backend='process', default = None
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * batch : SpectrumBatch holding the fields (depending on options), see nsev_batch
+
+    """
+    U = as_input_matrix(U, 'U')
+    D = U.shape[1]
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    options = get_kdvv_options(dis=dis, bsl=bsl, niter=niter, dst=dst, cst=cst, nf=nf, gs=gs, ref=ref)
+    cont_fields = nsev_contspec_fields.get(options.contspec_type, [])
+    disc_fields = discspec_fields.get(options.discspec_type, [])
+    plan_args = (D, T1, T2, K, M, Xi1, Xi2, options)
+    batch = run_backend(backend, KdvvPlan, plan_args, [U], len(cont_fields), M, K, cont_fields, disc_fields, bsg,
+                        workers, mp_context, display_c_msg)
+    batch.options = options
+    return batch
+
+
+def manakovv_batch(Q1, Q2, tvec, Xi1=-1.75, Xi2=2, M=128, K=128, kappa=1, bsf=None, bsl=None, bsg=None, niter=None,
+                   Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, workers=None, backend='thread',
+                   mp_context=None, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (Manakov equation, vanishing boundaries) for a batch of signals.
+
+    Each pair of rows (Q1[i], Q2[i]) is transformed as by manakovv(Q1[i], Q2[i], tvec, ...).
+    The rows are distributed on a thread pool, every thread uses its own ManakovvPlan.
+
+    Arguments:
+
+    * Q1 : numpy array of shape (N, D) holding the first field of each signal
+    * Q2 : numpy array of shape (N, D) holding the second field of each signal
+    * tvec : time vector (D samples, same for all signals)
+
+    Optional arguments:
+
+    * Xi1, Xi2, M, K, kappa, bsf, bsl, bsg, niter, Dsub, dst, cst, nf, dis, ref : see manakovv.
+      bsg is used for every row.
+    * workers : number of threads or processes, default = os.cpu_count()
+    * backend : 'thread' (thread pool) or 'process' (process pool with shared memory, see
+                run_batch_processes), default = 'thread'
+    * mp_context : multiprocessing context or start method for backend='process', default = None
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * batch : SpectrumBatch holding the fields (depending on options), see nsev_batch. The continuous
+              spectrum fields are cont_ref1, cont_ref2, cont_a, cont_b1, cont_b2.
+
+    """
+    Q1 = as_input_matrix(Q1, 'Q1')
+    Q2 = as_input_matrix(Q2, 'Q2')
+    if Q1.shape != Q2.shape:
+        raise ValueError("Q1 and Q2 must have the same shape, got %s and %s" % (Q1.shape, Q2.shape))
+    D = Q1.shape[1]
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    options = get_manakovv_options(bsf=bsf, bsl=bsl, niter=niter, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis,
+                                   ref=ref)
+    cont_fields = manakovv_contspec_fields.get(options.contspec_type, [])
+    disc_fields = discspec_fields.get(options.discspec_type, [])
+    plan_args = (D, T1, T2, Xi1, Xi2, M, K, kappa, options)
+    batch = run_backend(backend, ManakovvPlan, plan_args, [Q1, Q2], len(cont_fields), M, K, cont_fields,
+                        disc_fields, bsg, workers, mp_context, display_c_msg)
+    batch.options = options
+    return batch
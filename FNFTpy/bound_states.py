@@ -0,0 +1,281 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+from .auxiliary import add_metadata
+
+
+def bound_state_boxes(q, T1, T2, nboxes, bb=None, overlap=0.1):
+    """Partition the upper half plane into nboxes vertical strips for the bound state search.
+
+    The real part of the bound state of a soliton with carrier exp(1j*omega*t) is -omega/2, so
+    the strip edges are placed at quantiles of the spectral energy of q (mapped to xi = -omega/2).
+    This balances the number of bound states per strip. The outer strips extend to the limits of
+    bb, so no part of the search region is lost, whatever the distribution of q.
+
+    Each search box is the strip widened by overlap times the typical strip width on both sides,
+    so that bound states on (or moving across) an edge are found by both neighbours; see
+    merge_bound_states.
+
+    Arguments:
+
+    * q : numpy array holding the samples
+    * T1, T2 : time positions of the first and the last sample
+    * nboxes : number of strips
+
+    Optional arguments:
+
+    * bb : search region [re_min, re_max, im_min, im_max], default = None (upper half plane).
+           NaN entries are replaced by the limits of the upper half plane.
+    * overlap : widening of the search boxes, relative to the typical strip width, default = 0.1
+
+    Returns:
+
+    * cores : list of strips (re_min, re_max, im_min, im_max), non-overlapping, ordered by real part
+    * searches : list of the widened search boxes
+    """
+    if nboxes < 1:
+        raise ValueError("nboxes must be positive, got %d" % nboxes)
+    limits = [-np.inf, np.inf, 0.0, np.inf]
+    if bb is not None:
+        limits = [lim if b != b else float(b) for lim, b in zip(limits, bb)]
+    D = len(q)
+    dt = (T2 - T1) / (D - 1)
+    spectrum = np.abs(np.fft.fft(q)) ** 2
+    xi = -np.pi * np.fft.fftfreq(D, dt)
+    order = np.argsort(xi)
+    xi = xi[order]
+    energy = np.cumsum(spectrum[order])
+    if energy[-1] > 0:
+        energy /= energy[-1]
+    else:
+        energy = np.linspace(0, 1, D)
+    inside = (xi > limits[0]) & (xi < limits[1])
+    if np.any(inside):
+        # quantiles of the energy within the search region
+        e_lo = energy[inside][0]
+        e_hi = energy[inside][-1]
+        quantiles = e_lo + (e_hi - e_lo) * np.arange(1, nboxes) / nboxes
+        inner = np.interp(quantiles, energy[inside], xi[inside])
+        spread = np.interp(e_lo + (e_hi - e_lo) * 0.995, energy[inside], xi[inside]) \
+            - np.interp(e_lo + (e_hi - e_lo) * 0.005, energy[inside], xi[inside])
+    else:
+        inner = np.zeros(0)
+        spread = 0.0
+    edges = np.unique(np.concatenate([[limits[0]], inner, [limits[1]]]))
+    if spread <= 0:
+        spread = 1.0
+    margin = overlap * spread / max(1, len(edges) - 1)
+    cores = []
+    searches = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        cores.append((float(lo), float(hi), limits[2], limits[3]))
+        searches.append((float(max(lo - margin, limits[0])), float(min(hi + margin, limits[1])),
+                         limits[2], limits[3]))
+    return cores, searches
+
+
+def full_filter_box(q, T1, T2):
+    """Return the search region of the FULL bound state filtering of FNFT.
+
+    FULL filtering removes the bound states in the lower half plane, those with a real part
+    close to or beyond the resolution limit of the sampling (|real part| > 0.9 * pi / (2 * dt))
+    and those with an imaginary part above the bound given by the nonlinear Parseval relation
+    (1.5 * 0.25 * squared L2 norm of q).
+
+    Arguments:
+
+    * q : numpy array holding the samples
+    * T1, T2 : time positions of the first and the last sample
+
+    Returns:
+
+    * bb : search region [re_min, re_max, im_min, im_max]
+    """
+    D = len(q)
+    dt = (T2 - T1) / (D - 1)
+    power = np.abs(q) ** 2
+    l2norm2 = dt * (np.sum(power) - 0.5 * (power[0] + power[-1]))
+    re_bound = 0.9 * np.pi / (2 * dt)
+    return [-re_bound, re_bound, 0.0, 1.5 * 0.25 * l2norm2]
+
+
+def in_box(z, box):
+    """Return a boolean mask of the values z lying in box (re_min, re_max, im_min, im_max), limits included."""
+    z = np.asarray(z)
+    return (z.real >= box[0]) & (z.real <= box[1]) & (z.imag >= box[2]) & (z.imag <= box[3])
+
+
+def merge_bound_states(parts, cores, merge_tol=1e-6):
+    """Merge the bound states found in overlapping search boxes.
+
+    Bound states closer than merge_tol to each other (e.g. found by two neighbouring boxes near
+    their common edge) are counted once. The value found by the box whose strip contains it is
+    preferred.
+
+    Arguments:
+
+    * parts : list of dictionaries holding the field bound_states and further fields of the same
+              length (e.g. disc_norm, disc_res), one per box
+    * cores : list of strips, see bound_state_boxes
+
+    Optional arguments:
+
+    * merge_tol : distance below which two bound states are considered equal, default = 1e-6
+
+    Returns:
+
+    * merged : dictionary holding the merged fields (ordered by real part)
+    * counts : list, number of merged bound states taken from each box
+    """
+    if len(parts) == 0:
+        return {'bound_states': np.zeros(0, dtype=numpy_complex)}, []
+    names = list(parts[0].keys())
+    merged = {name: np.concatenate([np.asarray(part[name]) for part in parts]) for name in names}
+    box = np.concatenate([np.full(len(part['bound_states']), i) for i, part in enumerate(parts)]).astype(int)
+    z = merged['bound_states']
+    own = np.zeros(len(z), dtype=bool)
+    for i, core in enumerate(cores):
+        own[box == i] = in_box(z[box == i], core)
+    # candidates in their own strip first, then by real part
+    keep = []
+    for j in np.lexsort((z.real, ~own)):
+        if (len(keep) == 0) or (np.min(np.abs(z[keep] - z[j])) > merge_tol):
+            keep.append(j)
+    keep = np.array(sorted(keep, key=lambda j: z[j].real), dtype=int)
+    counts = [int(np.count_nonzero(box[keep] == i)) for i in range(len(parts))]
+    return {name: merged[name][keep] for name in names}, counts
+
+
+def discrete_spectrum_check(transform, signals, T1, T2, kappa=1):
+    """Check cheaply whether the signal provably has no bound states.
+
+    * nsev, manakovv : there are no bound states in the defocusing case (kappa = -1), and in the
+      focusing case if the L1 norm of the signal (for manakovv of sqrt(|q1|**2 + |q2|**2)),
+      approximated by dt * sum(|q|), is below pi/2.
+    * kdvv : there are no bound states if the real part of u is nowhere positive.
+
+    Arguments:
+
+    * transform : 'nsev', 'kdvv' or 'manakovv'
+    * signals : tuple of sample arrays, (q,), (u,) or (q1, q2)
+    * T1, T2 : time window
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focusing / defocusing nonlinearity (nsev, manakovv), default = 1
+
+    Returns:
+
+    * decision : dictionary holding the fields
+
+        * skipped : True if the discrete spectrum is provably empty
+        * reason : 'defocusing', 'l1_norm', 'nonpositive' or None (not skipped)
+        * l1_norm : L1 norm of the signal (nsev, manakovv), None if not calculated
+
+    """
+    decision = {'skipped': False, 'reason': None, 'l1_norm': None}
+    if transform == 'kdvv':
+        if np.max(signals[0].real) <= 0:
+            decision.update(skipped=True, reason='nonpositive')
+        return decision
+    if transform not in ('nsev', 'manakovv'):
+        raise ValueError("unknown transform %s" % transform)
+    if kappa == -1:
+        decision.update(skipped=True, reason='defocusing')
+        return decision
+    D = len(signals[0])
+    dt = (T2 - T1) / (D - 1) if D > 1 else 0.0
+    if len(signals) == 1:
+        l1_norm = dt * np.sum(np.abs(signals[0]))
+    else:
+        l1_norm = dt * np.sum(np.sqrt(sum(np.abs(s) ** 2 for s in signals)))
+    decision['l1_norm'] = float(l1_norm)
+    if l1_norm < np.pi / 2:
+        decision.update(skipped=True, reason='l1_norm')
+    return decision
+
+
+def skip_discrete_spectrum(res, dst, decision):
+    """Fill the discrete spectrum fields of a result calculated with the discrete spectrum skipped.
+
+    bound_states_num is set to 0, bound_states and the discrete spectrum fields requested by dst are
+    set to empty arrays, and decision is stored as metadata['discrete_spectrum'].
+
+    Arguments:
+
+    * res : result object (e.g. NsevResult)
+    * dst : discrete spectrum type requested by the caller
+    * decision : see discrete_spectrum_check
+
+    Returns:
+
+    * res : the result object
+    """
+    res.bound_states_num = 0
+    for name in ['bound_states'] + discspec_fields.get(dst, []):
+        res[name] = np.zeros(0, dtype=numpy_complex)
+    return add_metadata(res, 'discrete_spectrum', decision)
+
+
+def run_with_discrete_spectrum_check(transform, run, options, signals, T1, T2, kappa=1, skip_empty_disc=True):
+    """Run a transform, skipping the bound state search if the signal provably has no bound states.
+
+    Used by nsev, kdvv and manakovv. If skip_empty_disc is set and options request a discrete
+    spectrum, the signal is checked with discrete_spectrum_check and the decision is stored as
+    res.metadata['discrete_spectrum']. If the discrete spectrum is provably empty, run is called
+    with a copy of options with the discrete spectrum skipped, and the result is completed by
+    skip_discrete_spectrum (res.options are the options of the caller).
+
+    Arguments:
+
+    * transform : 'nsev', 'kdvv' or 'manakovv'
+    * run : function calculating the transform for the options struct passed as only argument
+    * options : options struct requested by the caller
+    * signals, T1, T2 : see discrete_spectrum_check
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focusing / defocusing nonlinearity (nsev, manakovv), default = 1
+    * skip_empty_disc : whether to check the signal at all, default = True
+
+    Returns:
+
+    * res : result of run
+    """
+    if not (skip_empty_disc and (options.discspec_type in discspec_fields)):
+        return run(options)
+    decision = discrete_spectrum_check(transform, signals, T1, T2, kappa=kappa)
+    if not decision['skipped']:
+        return add_metadata(run(options), 'discrete_spectrum', decision)
+    run_options = type(options).from_buffer_copy(options)
+    run_options.discspec_type = 3  # skip
+    res = run(run_options)
+    res.options = options
+    return skip_discrete_spectrum(res, options.discspec_type, decision)
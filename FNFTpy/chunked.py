@@ -0,0 +1,340 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .typesdef import *
+from .auxiliary import as_input_array, check_return_code
+from .fnft_clib import get_fnft_clib
+from .fnft_nsev_wrapper import NsevPlan, nsev_wrapper
+from .fnft_kdvv_wrapper import KdvvPlan, kdvv_wrapper
+from .fnft_manakovv_wrapper import ManakovvPlan, manakovv_wrapper
+from .options_handling import get_nsev_options, get_kdvv_options, get_manakovv_options
+from .results import NsevResult, KdvvResult, ManakovvResult
+
+# bytes of the continuous spectrum buffer of a plan per value of xi and field (complex128)
+_bytes_per_value = 16
+
+
+def xi_chunks(M, chunk_size):
+    """Split range(M) into consecutive (start, stop) ranges of at most chunk_size values.
+
+    All ranges but the last have the same length, the last may be shorter (see run_xi_chunks).
+    The length is at least two (if M >= 2), so that each chunk has a proper frequency interval
+    Xi1 < Xi2.
+
+    Arguments:
+
+    * M : number of values of the continuous spectrum
+    * chunk_size : maximum number of values per chunk
+
+    Returns:
+
+    * chunks : list of (start, stop) tuples
+    """
+    chunk_size = max(2, int(chunk_size))
+    nchunks = max(1, -(-M // chunk_size))
+    length = max(min(2, M), -(-M // nchunks))
+    return [(start, min(start + length, M)) for start in range(0, M, length)]
+
+
+def chunk_size_from_budget(memory_budget, nfields, workers=1):
+    """Return the number of xi values per chunk, so that the plans' buffers stay within memory_budget.
+
+    Only the continuous spectrum buffers held by FNFTpy are accounted for (16 bytes per value and
+    field, one plan per worker, see run_xi_chunks). FNFT's internal working memory also scales with the chunk size
+    and comes on top, so leave some headroom.
+
+    Arguments:
+
+    * memory_budget : number of bytes
+    * nfields : number of continuous spectrum fields (e.g. 3 for nsev with cst=2)
+
+    Optional arguments:
+
+    * workers : number of chunks calculated at the same time, default = 1
+
+    Returns:
+
+    * chunk_size : int >= 2
+    """
+    return max(2, int(memory_budget) // (_bytes_per_value * max(1, nfields) * max(1, workers)))
+
+
+def run_xi_chunks(make_plan, inputs, Xi1, Xi2, M, cont_fields, chunks, out, disc_call=None, workers=1):
+    """Calculate the continuous spectrum on the sub-ranges chunks of the grid linspace(Xi1, Xi2, M).
+
+    Every thread keeps one plan for the length m of the longest chunk (created by make_plan(m))
+    and moves it to the frequency interval of each chunk with set_xi_window. Shorter chunks (e.g.
+    the last one of xi_chunks) are padded: their frequency interval is extended beyond their end
+    to m values of the grid spacing, and only their own values are kept. So each thread holds
+    a single plan, as assumed by chunk_size_from_budget. The fields of each chunk are copied
+    into the rows of out. The discrete spectrum is calculated once by disc_call (on the same
+    pool, started first).
+
+    Arguments:
+
+    * make_plan : function make_plan(m) returning a new plan for m values of xi (discrete spectrum skipped)
+    * inputs : list of arrays passed to plan.execute
+    * Xi1, Xi2, M : frequency grid of the whole continuous spectrum
+    * cont_fields : names of the continuous spectrum fields, in the order of the rows of out
+    * chunks : list of (start, stop) ranges, see xi_chunks
+    * out : array (len(cont_fields), M) the fields are written into
+
+    Optional arguments:
+
+    * disc_call : function without arguments returning the result holding the discrete spectrum,
+                  default = None
+    * workers : number of threads, 1 runs sequentially in the calling thread, default = 1
+
+    Returns:
+
+    * return_values : list of FNFT return values of the chunks
+    * disc : result of disc_call, None if not given
+    """
+    dxi = (Xi2 - Xi1) / (M - 1) if M > 1 else 0.0
+    m = max([stop - start for start, stop in chunks], default=0)
+    local = threading.local()
+
+    def xi_at(i):
+        return Xi2 if i == M - 1 else Xi1 + i * dxi
+
+    def process_chunk(chunk):
+        start, stop = chunk
+        plan = getattr(local, 'plan', None)
+        if plan is None:
+            plan = local.plan = make_plan(m)
+        plan.set_xi_window(xi_at(start), xi_at(start + m - 1))
+        res = plan.execute(*inputs, copy=False, check=False)
+        for k, name in enumerate(cont_fields):
+            out[k, start:stop] = res[name][:stop - start]
+        return res.return_value
+
+    if workers == 1:
+        disc = None if disc_call is None else disc_call()
+        return_values = [process_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # the longest task, started first
+            disc_future = None if disc_call is None else executor.submit(disc_call)
+            return_values = list(executor.map(process_chunk, chunks))
+            disc = None if disc_future is None else disc_future.result()
+    return return_values, disc
+
+
+def _chunked_transform(result_class, options, make_plan, inputs, Xi1, Xi2, M, cont_fields, disc_call, chunk_size,
+                       memory_budget, workers, out, display_c_msg):
+    """Common part of nsev_chunked, kdvv_chunked and manakovv_chunked."""
+    if not display_c_msg:  # suppress once, before the threads are started
+        get_fnft_clib().suppress_c_messages()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    nfields = len(cont_fields)
+    if chunk_size is None:
+        if memory_budget is not None:
+            chunk_size = chunk_size_from_budget(memory_budget, nfields, workers)
+        else:
+            chunk_size = -(-M // workers)
+    chunks = xi_chunks(M, chunk_size) if nfields > 0 else []
+    if out is None:
+        out = np.empty((nfields, M), dtype=numpy_complex)
+    else:
+        if not isinstance(out, np.ndarray):
+            raise ValueError("out: expected numpy array, got %s" % type(out))
+        if out.dtype != numpy_complex:
+            raise ValueError("out: expected dtype complex128, got %s" % out.dtype)
+        if out.shape != (nfields, M):
+            raise ValueError("out: expected shape (%d, %d), got %s" % (nfields, M, out.shape))
+        if not out.flags['WRITEABLE']:
+            raise ValueError("out: array is not writeable")
+    return_values, res = run_xi_chunks(make_plan, inputs, Xi1, Xi2, M, cont_fields, chunks, out,
+                                       disc_call=disc_call, workers=min(workers, max(1, len(chunks))))
+    if res is None:
+        res = result_class(options)
+        res.return_value = 0
+        res.bound_states_num = 0
+        res.bound_states = np.zeros(0, dtype=numpy_complex)
+    else:
+        res.options = options
+    for rv in return_values:
+        if res.return_value == 0:
+            res.return_value = rv
+    check_return_code(res.return_value)
+    for k, name in enumerate(cont_fields):
+        res[name] = out[k]
+    res.metadata = {'xi_chunks': len(chunks), 'chunk_size': max([b - a for a, b in chunks], default=0)}
+    return res
+
+
+def _split_options(options):
+    """Return copies of options for the chunks (discrete spectrum skipped) and for the discrete spectrum
+    (continuous spectrum skipped), the latter None if no discrete spectrum is requested."""
+    chunk_options = type(options).from_buffer_copy(options)
+    chunk_options.discspec_type = 3
+    if options.discspec_type not in (0, 1, 2):
+        return chunk_options, None
+    disc_options = type(options).from_buffer_copy(options)
+    disc_options.contspec_type = 3
+    return chunk_options, disc_options
+
+
+def nsev_chunked(q, tvec, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None, bsl=None, bsg=None, niter=None, tol=None,
+                 Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, bb=None, chunk_size=None,
+                 memory_budget=None, workers=None, out=None, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) with xi-chunked continuous spectrum.
+
+    The grid linspace(Xi1, Xi2, M) is split into sub-ranges (chunks), each calculated by fnft_nsev
+    with the discrete spectrum skipped. The discrete spectrum is calculated by one additional call
+    (continuous spectrum skipped). With workers > 1 the chunks run concurrently on a thread pool,
+    with workers=1 sequentially, so that only one chunk buffer exists at a time. Writing into a
+    preallocated out (e.g. np.memmap) caps the peak memory for very large M.
+
+    The chunks calculate the same grid values as one call of nsev (up to rounding of the
+    interval limits), provided the continuous spectrum of a value does not depend on the grid.
+
+    Arguments:
+
+    * q : numpy array holding the samples of the input field
+    * tvec : time vector
+
+    Optional arguments:
+
+    * Xi1, Xi2, M, K, kappa, bsf, bsl, bsg, niter, tol, Dsub, dst, cst, nf, dis, ref, bb : see nsev
+    * chunk_size : maximum number of xi values per chunk, default = None (from memory_budget, or
+                   M split evenly on the workers)
+    * memory_budget : number of bytes the chunk buffers of all workers may use, see
+                      chunk_size_from_budget, default = None
+    * workers : number of threads, default = os.cpu_count()
+    * out : array (nfields, M) of dtype complex128 receiving the continuous spectrum fields in the
+            order FNFT writes them (e.g. cont_ref, cont_a, cont_b for cst=2), default = None (allocate)
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * res : NsevResult holding the fields (depending on options), see nsev. The continuous
+            spectrum fields are rows of out. res.metadata holds the fields xi_chunks (number of
+            chunks) and chunk_size.
+
+    """
+    q = as_input_array(q)
+    D = len(q)
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    options = get_nsev_options(bsf=bsf, bsl=bsl, niter=niter, tol=tol, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis,
+                               ref=ref, bb=bb)
+    chunk_options, disc_options = _split_options(options)
+    disc_call = None
+    if disc_options is not None:
+        def disc_call():
+            return nsev_wrapper(D, q, T1, T2, Xi1, Xi2, M, K, kappa, disc_options, bsg=bsg)
+    return _chunked_transform(NsevResult, options, lambda m: NsevPlan(D, T1, T2, Xi1, Xi2, m, 1, kappa, chunk_options),
+                              [q], Xi1, Xi2, M, nsev_contspec_fields.get(options.contspec_type, []), disc_call,
+                              chunk_size, memory_budget, workers, out, display_c_msg)
+
+
+def kdvv_chunked(u, tvec, K=128, M=128, Xi1=-2, Xi2=2, dis=None, bsl=None, bsg=None, niter=None, dst=None, cst=None,
+                 nf=None, ref=None, gs=None, chunk_size=None, memory_budget=None, workers=None, out=None,
+                 display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (KdV, vanishing boundaries) with xi-chunked continuous spectrum.
+
+    See nsev_chunked.
+
+    Arguments:
+
+    * u : numpy array holding the samples of the input field
+    * tvec : time vector
+
+    Optional arguments:
+
+    * K, M, Xi1, Xi2, dis, bsl, bsg, niter, dst, cst, nf, ref, gs : see kdvv
+    * chunk_size, memory_budget, workers, out, display_c_msg : see nsev_chunked
+
+    Returns:
+
+    * res : KdvvResult holding the fields (depending on options), see kdvv. res.metadata holds
+            the fields xi_chunks and chunk_size.
+
+    """
+    u = as_input_array(u, name='u')
+    D = len(u)
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    options = get_kdvv_options(dis=dis, bsl=bsl, niter=niter, dst=dst, cst=cst, nf=nf, gs=gs, ref=ref)
+    chunk_options, disc_options = _split_options(options)
+    disc_call = None
+    if disc_options is not None:
+        def disc_call():
+            return kdvv_wrapper(D, u, T1, T2, K, M, Xi1, Xi2, disc_options, bsg=bsg)
+    return _chunked_transform(KdvvResult, options, lambda m: KdvvPlan(D, T1, T2, 1, m, Xi1, Xi2, chunk_options),
+                              [u], Xi1, Xi2, M, nsev_contspec_fields.get(options.contspec_type, []), disc_call,
+                              chunk_size, memory_budget, workers, out, display_c_msg)
+
+
+def manakovv_chunked(q1, q2, tvec, Xi1=-1.75, Xi2=2, M=128, K=128, kappa=1, bsf=None, bsl=None, bsg=None, niter=None,
+                     Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, chunk_size=None, memory_budget=None,
+                     workers=None, out=None, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (Manakov equation, vanishing boundaries) with xi-chunked
+    continuous spectrum.
+
+    See nsev_chunked. With cst=2, a single call of manakovv allocates 5*M values, the chunks only
+    5*chunk_size per worker.
+
+    Arguments:
+
+    * q1, q2 : numpy arrays holding the samples of the two fields
+    * tvec : time vector
+
+    Optional arguments:
+
+    * Xi1, Xi2, M, K, kappa, bsf, bsl, bsg, niter, Dsub, dst, cst, nf, dis, ref : see manakovv
+    * chunk_size, memory_budget, workers, out, display_c_msg : see nsev_chunked
+
+    Returns:
+
+    * res : ManakovvResult holding the fields (depending on options), see manakovv. res.metadata
+            holds the fields xi_chunks and chunk_size.
+
+    """
+    q1 = as_input_array(q1, name='q1')
+    D = len(q1)
+    q2 = as_input_array(q2, D, 'q2')
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    options = get_manakovv_options(bsf=bsf, bsl=bsl, niter=niter, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis,
+                                   ref=ref)
+    chunk_options, disc_options = _split_options(options)
+    disc_call = None
+    if disc_options is not None:
+        def disc_call():
+            return manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2, M, K, kappa, disc_options, bsg=bsg)
+    return _chunked_transform(ManakovvResult, options,
+                              lambda m: ManakovvPlan(D, T1, T2, Xi1, Xi2, m, 1, kappa, chunk_options),
+                              [q1, q2], Xi1, Xi2, M, manakovv_contspec_fields.get(options.contspec_type, []), disc_call,
+                              chunk_size, memory_budget, workers, out, display_c_msg)
@@ -0,0 +1,279 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import threading
+from .typesdef import *
+from .auxiliary import get_lib_path, get_winmode_param
+
+# argument type for pointers which may be passed as NULL (False) or as numpy array (True)
+_complex_arr_or_null = {True: numpy_complex_arr_ptr,
+                        False: type(ctypes_nullptr)}
+
+
+class FnftClib:
+    """Loaded FNFT library with pre-declared function prototypes.
+
+    The library is loaded once and every public function of FNFT used by FNFTpy is bound
+    with a fixed prototype. Pointer arguments which may be NULL are bound once per
+    NULL/non-NULL combination, so the argtypes of a bound function never change after loading.
+
+    Usually there is no need to create an instance directly, use get_fnft_clib() instead.
+
+    Thread safety: the bound functions are not modified after loading and the wrappers pass all
+    input and output buffers per call. The only library-global setting FNFTpy changes is the
+    message output of FNFT (see suppress_c_messages), which is switched off at most once.
+    Thus the wrappers (and the convenience functions nsev, kdvv, manakovv, nsep, nsev_inverse)
+    may be called concurrently from several threads. ctypes releases the GIL during the call
+    of the C function, so the transforms run in parallel.
+
+    Arguments:
+
+    * libpath : path of the FNFT library
+    * winmode : winmode parameter passed to ctypes.CDLL
+
+    """
+
+    def __init__(self, libpath, winmode):
+        self.libpath = libpath
+        self.cdll = ctypes.CDLL(libpath, winmode=winmode)
+        self.c_msg_suppressed = False
+        self._lock = threading.Lock()
+        self._prototypes = {}
+        self._default_options = {}
+        self._declare_prototypes()
+
+    def _bind(self, key, name, restype, argtypes):
+        """Bind the C function 'name' with a fixed prototype and store it under key."""
+        prototype = ctypes.CFUNCTYPE(restype, *argtypes)
+        self._prototypes[key] = prototype((name, self.cdll))
+
+    def _declare_prototypes(self):
+        """Declare the prototypes of all FNFT functions used by FNFTpy."""
+        # auxiliary functions
+        self._bind(('fnft_version',), 'fnft_version', ctypes_int, [
+            ctypes.POINTER(ctypes_uint),  # major
+            ctypes.POINTER(ctypes_uint),  # minor
+            ctypes.POINTER(ctypes_uint),  # patch
+            ctypes.c_char * 8])  # suffix, length defined in FNFT/include/fnft_config.h.in
+        self._bind(('fnft_errwarn_setprintf',), 'fnft_errwarn_setprintf', None, [
+            type(ctypes_nullptr)])
+        # default options
+        for name, options_struct in [('fnft_kdvv_default_opts', KdvvOptionsStruct),
+                                     ('fnft_manakovv_default_opts', ManakovvOptionsStruct),
+                                     ('fnft_nsep_default_opts', NsepOptionsStruct),
+                                     ('fnft_nsev_default_opts', NsevOptionsStruct),
+                                     ('fnft_nsev_inverse_default_opts', NsevInverseOptionsStruct)]:
+            self._bind((name,), name, options_struct, [])
+        # transforms: one prototype for each combination of
+        # continuous spectrum (cont) and discrete spectrum (disc) pointers being NULL or not
+        for cont in (True, False):
+            for disc in (True, False):
+                self._bind(('fnft_kdvv', cont, disc), 'fnft_kdvv', ctypes_int, [
+                    ctypes_uint,  # D
+                    numpy_complex_arr_ptr,  # u
+                    numpy_double_arr_ptr,  # t
+                    ctypes_uint,  # M
+                    _complex_arr_or_null[cont],  # cont
+                    numpy_double_arr_ptr,  # Xi
+                    ctypes.POINTER(ctypes_uint),  # K_ptr
+                    _complex_arr_or_null[disc],  # boundstates
+                    _complex_arr_or_null[disc],  # normconsts res
+                    ctypes.POINTER(KdvvOptionsStruct)])  # options ptr
+                self._bind(('fnft_manakovv', cont, disc), 'fnft_manakovv', ctypes_int, [
+                    ctypes_uint,  # D
+                    numpy_complex_arr_ptr,  # q1
+                    numpy_complex_arr_ptr,  # q2
+                    numpy_double_arr_ptr,  # t
+                    ctypes_uint,  # M
+                    _complex_arr_or_null[cont],  # cont
+                    numpy_double_arr_ptr,  # xi
+                    ctypes.POINTER(ctypes_uint),  # K_ptr
+                    _complex_arr_or_null[disc],  # boundstates
+                    _complex_arr_or_null[disc],  # normconst res
+                    ctypes_int,  # kappa
+                    ctypes.POINTER(ManakovvOptionsStruct)])  # options ptr
+                self._bind(('fnft_nsev', cont, disc), 'fnft_nsev', ctypes_int, [
+                    ctypes_uint,  # D
+                    numpy_complex_arr_ptr,  # q
+                    numpy_double_arr_ptr,  # t
+                    ctypes_uint,  # M
+                    _complex_arr_or_null[cont],  # cont
+                    numpy_double_arr_ptr,  # xi
+                    ctypes.POINTER(ctypes_uint),  # K_ptr
+                    _complex_arr_or_null[disc],  # boundstates
+                    _complex_arr_or_null[disc],  # normconst res
+                    ctypes_int,  # kappa
+                    ctypes.POINTER(NsevOptionsStruct)])  # options ptr
+                self._bind(('fnft_nsev_inverse', cont, disc), 'fnft_nsev_inverse', ctypes_int, [
+                    ctypes_uint,  # M
+                    _complex_arr_or_null[cont],  # contspec
+                    numpy_double_arr_ptr,  # xi
+                    ctypes_uint,  # K
+                    _complex_arr_or_null[disc],  # boundstates
+                    _complex_arr_or_null[disc],  # normconstants or residues
+                    ctypes_uint,  # D
+                    numpy_complex_arr_ptr,  # q
+                    numpy_double_arr_ptr,  # t
+                    ctypes_int,  # kappa
+                    ctypes.POINTER(NsevInverseOptionsStruct)])  # options ptr
+        self._bind(('fnft_nsep',), 'fnft_nsep', ctypes_int, [
+            ctypes_uint,  # D
+            numpy_complex_arr_ptr,  # q
+            numpy_double_arr_ptr,  # t
+            ctypes_double,  # phase_shift
+            ctypes.POINTER(ctypes_uint),  # K_ptr
+            numpy_complex_arr_ptr,  # main_spec
+            ctypes.POINTER(ctypes_uint),  # M_ptr
+            numpy_complex_arr_ptr,  # aux_spec
+            type(ctypes_nullptr),  # sheet indices
+            ctypes_int,  # kappa
+            ctypes.POINTER(NsepOptionsStruct)])  # options ptr
+        self._bind(('fnft_nsev_inverse_XI',), 'fnft_nsev_inverse_XI', ctypes_int, [
+            ctypes_uint,  # D
+            numpy_double_arr_ptr,  # t
+            ctypes_uint,  # M
+            numpy_double_arr_ptr,  # xi
+            ctypes_int32])  # discretization
+
+    def prototype(self, name, *variant):
+        """Return the bound C function 'name'.
+
+        Arguments:
+
+        * name : name of the FNFT function, e.g. 'fnft_nsev'
+
+        Optional arguments:
+
+        * variant : for transforms, two booleans stating whether the continuous spectrum and the
+                    discrete spectrum pointers are arrays (True) or NULL (False)
+
+        Returns:
+
+        * func : ctypes function with fixed argtypes and restype
+
+        """
+        return self._prototypes[(name,) + variant]
+
+    def default_options(self, name):
+        """Return a copy of the default options of FNFT.
+
+        The defaults are fetched from the C-library on the first call for each name and cached,
+        so all further calls only copy the cached options struct.
+
+        Arguments:
+
+        * name : name of the FNFT default options function, e.g. 'fnft_nsev_default_opts'
+
+        Returns:
+
+        * options : new options struct (e.g. NsevOptionsStruct) holding the default values
+
+        """
+        options = self._default_options.get(name)
+        if options is None:
+            with self._lock:
+                options = self._default_options.get(name)
+                if options is None:
+                    options = self.prototype(name)()
+                    self._default_options[name] = options
+        return type(options).from_buffer_copy(options)
+
+    def suppress_c_messages(self):
+        """Suppress messages printed by the C-library for all following calls.
+
+        fnft_errwarn_setprintf changes a library-global setting, so it is called only once.
+        Further calls of this method have no effect, which makes it safe to be used from
+        concurrently running threads. Call it before starting threads to switch off messages for
+        all transforms.
+        """
+        if not self.c_msg_suppressed:
+            with self._lock:
+                if not self.c_msg_suppressed:
+                    self.prototype('fnft_errwarn_setprintf')(ctypes_nullptr)
+                    self.c_msg_suppressed = True
+
+
+_fnft_clib = None
+_fnft_clib_lock = threading.Lock()
+
+
+def get_fnft_clib():
+    """Return the process-wide FnftClib instance.
+
+    The FNFT library is loaded on the first call, using get_lib_path() and get_winmode_param().
+    All subsequent calls return the same instance.
+
+    Returns:
+
+    * clib : FnftClib
+
+    """
+    global _fnft_clib
+    clib = _fnft_clib
+    if clib is None:
+        with _fnft_clib_lock:
+            if _fnft_clib is None:
+                _fnft_clib = FnftClib(get_lib_path(), get_winmode_param())
+            clib = _fnft_clib
+    return clib
+
+
+def init_fnft_clib(libpath, winmode):
+    """Load the FNFT library from libpath, unless a library is already loaded in this process.
+
+    Used by worker processes to load the same library as the parent process
+    (e.g. with the 'spawn' start method, where the library is not inherited).
+
+    Arguments:
+
+    * libpath : path of the FNFT library
+    * winmode : winmode parameter passed to ctypes.CDLL
+
+    Returns:
+
+    * clib : FnftClib
+    """
+    global _fnft_clib
+    with _fnft_clib_lock:
+        if _fnft_clib is None:
+            _fnft_clib = FnftClib(libpath, winmode)
+        return _fnft_clib
+
+
+def _reset_locks_after_fork():
+    """Replace the locks in a forked child: a lock held by another thread of the parent stays locked."""
+    global _fnft_clib_lock
+    _fnft_clib_lock = threading.Lock()
+    if _fnft_clib is not None:
+        _fnft_clib._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
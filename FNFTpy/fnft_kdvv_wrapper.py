@@ -29,11 +29,14 @@ Christoph Mahnke, 2018-2023
 
 from .typesdef import *
 from .options_handling import get_kdvv_options
-from .auxiliary import get_lib_path, check_return_code, get_winmode_param
+from .auxiliary import check_return_code, select_out_array, as_input_array, result_array_func, pad_pow2, add_metadata
+from .fnft_clib import get_fnft_clib
+from .results import KdvvResult
+from .bound_states import run_with_discrete_spectrum_check
 
 
 def kdvv(u, tvec, K=128, M=128, Xi1=-2, Xi2=2, dis=None, bsl=None, bsg=None, niter=None, dst=None, cst=None, nf=None,
-         ref=None, gs=None, display_c_msg=True):
+         ref=None, gs=None, display_c_msg=True, skip_empty_disc=True, pad=False):
     """Calculate the Nonlinear Fourier Transform for the Korteweg-de Vries equation with vanishing boundaries.
 
     This function is intended to be 'convenient', which means it
@@ -155,9 +158,18 @@ def kdvv(u, tvec, K=128, M=128, Xi1=-2, Xi2=2, dis=None, bsl=None, bsg=None, nit
 
     * display_c_msg : whether or not to show messages raised by the C-library, default = True
 
+    * skip_empty_disc : skip the bound state search if the signal provably has no bound states
+                        (real part of u nowhere positive, see discrete_spectrum_check).
+                        The result then holds bound_states_num = 0 and empty arrays, the decision
+                        is stored in res.metadata['discrete_spectrum']. Default = True
+
+    * pad : zero-pad u to the next power of two number of samples, extending the time window
+            (see pad_pow2). res.metadata['padding'] holds the numbers of zeros added on the
+            left and right. Default = False
+
     Returns:
 
-   * rdict : dictionary holding the fields:
+   * res : KdvvResult holding the fields (dict-compatible, see GenericResult)
 
        * return_value : return value from FNFT
        * cont_ref : continuous spectrum (reflection)
@@ -172,17 +184,30 @@ def kdvv(u, tvec, K=128, M=128, Xi1=-2, Xi2=2, dis=None, bsl=None, bsg=None, nit
 
     """
 
+    u = as_input_array(u, name='u')
     D = len(u)
     T1 = np.min(tvec)
     T2 = np.max(tvec)
+    padding = None
+    if pad:
+        (u,), T1, T2, padding = pad_pow2([u], T1, T2)
+        D = len(u)
     options = get_kdvv_options(dis=dis, bsl=bsl, niter=niter, dst=dst, cst=cst, nf=nf,
                                gs=gs, ref=ref)
-    return kdvv_wrapper(D, u, T1, T2, K, M, Xi1, Xi2,
-                        options, bsg=bsg, display_c_msg=display_c_msg)
+
+    def run(run_options):
+        return kdvv_wrapper(D, u, T1, T2, K, M, Xi1, Xi2,
+                            run_options, bsg=bsg, display_c_msg=display_c_msg)
+
+    res = run_with_discrete_spectrum_check('kdvv', run, options, (u,), T1, T2, skip_empty_disc=skip_empty_disc)
+    if padding is not None:
+        add_metadata(res, 'padding', padding)
+    return res
 
 
 def kdvv_wrapper(D, u, T1, T2, K, M, Xi1, Xi2,
-                 options, bsg=None, display_c_msg=True):
+                 options, bsg=None, display_c_msg=True,
+                 out_cont=None, out_bound_states=None, out_disc=None):
     """Calculate the Nonlinear Fourier Transform for the Korteweg-de Vries equation with vanishing boundaries.
 
     This function's interface mimics the behavior of the function 'fnft_kdvv' of FNFT.
@@ -197,17 +222,21 @@ def kdvv_wrapper(D, u, T1, T2, K, M, Xi1, Xi2,
     * K : maximum number of bound states to calculate
     * M : number of values for the continuous spectrum to calculate
     * Xi1, Xi2 : min and max frequency for the continuous spectrum
-    * options: options for kdvv as KdvvOptionsStruct. Can be generated e.g. with 'get_kdvv_options()'
+    * options: options for kdvv as KdvvOptionsStruct or FrozenOptions. Can be generated e.g. with 'get_kdvv_options()'
 
     Optional Arguments:
 
     * display_c_msg : whether or not to show messages raised by the C-library, default = True
     * bsg : lost or array of bound state guesses, only effective if bsl==1 (Newton
                          bound state localization) is activated. Default = None
+    * out_cont, out_bound_states, out_disc : caller-owned C-contiguous complex128 arrays FNFT
+           writes the continuous spectrum, the bound states and the discrete spectrum into
+           (e.g. rows of preallocated result matrices). The result fields are views of them.
+           See KdvvPlan.execute for the required lengths. Default = None (allocate new arrays)
 
     Returns:
 
-    * rdict : dictionary holding the fields:
+    * res : KdvvResult holding the fields (dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * cont_ref : continuous spectrum (reflection)
@@ -220,130 +249,215 @@ def kdvv_wrapper(D, u, T1, T2, K, M, Xi1, Xi2,
         * cont_b : continuous spectrum - scattering coefficient b
         * options : KdvvOptionsStruct with options used
     """
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_kdvv_func = fnft_clib.fnft_kdvv
-    clib_kdvv_func.restype = ctypes_int
-    if not display_c_msg:  # suppress output from C-library
-        clib_errwarn_setprintf = fnft_clib.fnft_errwarn_setprintf
-        clib_errwarn_setprintf(ctypes_nullptr)
-    kdvv_D = ctypes_uint(D)
-    kdvv_u = np.zeros(kdvv_D.value, dtype=numpy_complex)
-    kdvv_u[:] = u[:] + 0.0j
-    kdvv_T = np.zeros(2, dtype=numpy_double)
-    kdvv_T[0] = T1
-    kdvv_T[1] = T2
-    kdvv_M = ctypes_uint(M)
-    kdvv_cont = np.zeros(M, dtype=numpy_complex)
-    kdvv_Xi = np.zeros(2, dtype=numpy_double)
-    kdvv_Xi[0] = Xi1
-    kdvv_Xi[1] = Xi2
-    kdvv_K = ctypes_uint(K)
-
-    #
-    # discrete spectrum -> reflection coefficient and / or residues
-    #
-    kdvv_bound_states_type = numpy_complex_arr_ptr
-    kdvv_disc_spec_type = numpy_complex_arr_ptr
-    if (options.discspec_type == fnft_kdvv_dstype.NORMING_CONSTANTS) \
-            or (options.discspec_type == fnft_kdvv_dstype.RESIDUES):
-        kdvv_discspec = np.zeros(K, dtype=numpy_complex)
-        kdvv_boundstates = np.zeros(K, dtype=numpy_complex)
-    elif options.discspec_type == fnft_kdvv_dstype.BOTH:
-        # norming consts AND res
-        kdvv_discspec = np.zeros(2 * K, dtype=numpy_complex)
-        kdvv_boundstates = np.zeros(K, dtype=numpy_complex)
-    else:  # no discrete spectrum
-        kdvv_discspec = ctypes_nullptr
-        kdvv_boundstates = ctypes_nullptr
-        kdvv_bound_states_type = type(ctypes_nullptr)
-        kdvv_disc_spec_type = type(ctypes_nullptr)
-
-    #
-    # for Newton refinement: use guesses, if provided.
-    #
-    if options.bound_state_localization == fnft_kdvv_bsloc.NEWTON:
-        if bsg is not None:
-            bsg_copy = np.array(bsg, dtype=np.complex128)
-            if len(bsg_copy) > 0:
-                ii = -1
+    plan = KdvvPlan(D, T1, T2, K, M, Xi1, Xi2, options, display_c_msg=display_c_msg)
+    return plan.execute(u, bsg=bsg, copy=False, out_cont=out_cont,
+                        out_bound_states=out_bound_states, out_disc=out_disc)
+
+
+class KdvvPlan:
+    """Execution plan for repeated calls of fnft_kdvv with fixed parameters.
+
+    All buffers passed to FNFT are allocated once when the plan is created, and the matching
+    prototype of fnft_kdvv is picked. Each call of execute() only passes the samples to FNFT
+    ('plan once, execute many'). Samples given as C-contiguous complex128 array are not copied.
+
+    Arguments:
+
+    * D : number of samples
+    * T1, T2  : time positions of the first and the last sample
+    * K : maximum number of bound states to calculate
+    * M : number of values for the continuous spectrum to calculate
+    * Xi1, Xi2 : min and max frequency for the continuous spectrum
+    * options: options for kdvv as KdvvOptionsStruct or FrozenOptions. The plan keeps a copy.
+
+    Optional Arguments:
+
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, D, T1, T2, K, M, Xi1, Xi2, options, display_c_msg=True):
+        fnft_clib = get_fnft_clib()
+        if not display_c_msg:  # suppress output from C-library
+            fnft_clib.suppress_c_messages()
+        self.D = D
+        self.M = M
+        self.K = K
+        self.options = KdvvOptionsStruct.from_buffer_copy(options_struct(options))
+        self._options_ref = ctypes.byref(self.options)
+        self._D = ctypes_uint(D)
+        self._M = ctypes_uint(M)
+        self._K = ctypes_uint(K)
+        self._T = np.array([T1, T2], dtype=numpy_double)
+        self._Xi = np.array([Xi1, Xi2], dtype=numpy_double)
+        #
+        # discrete spectrum -> reflection coefficient and / or residues
+        #
+        self._dst = options.discspec_type
+        if (self._dst == fnft_kdvv_dstype.NORMING_CONSTANTS) \
+                or (self._dst == fnft_kdvv_dstype.RESIDUES):
+            self._discspec = np.zeros(K, dtype=numpy_complex)
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+        elif self._dst == fnft_kdvv_dstype.BOTH:
+            # norming consts AND res
+            self._discspec = np.zeros(2 * K, dtype=numpy_complex)
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+        else:  # no discrete spectrum
+            self._discspec = ctypes_nullptr
+            self._boundstates = ctypes_nullptr
+        # for Newton refinement: guesses are passed in the bound states array
+        self._newton = (options.bound_state_localization == fnft_kdvv_bsloc.NEWTON) \
+            and (self._boundstates is not ctypes_nullptr)
+        #
+        # continuous spectrum -> reflection coefficient and / or a,b
+        #
+        self._cst = options.contspec_type
+        if self._cst == fnft_kdvv_cstype.REFLECTION_COEFFICIENT:
+            self._cont = np.zeros(M, dtype=numpy_complex)
+        elif self._cst == fnft_kdvv_cstype.AB:
+            self._cont = np.zeros(2 * M, dtype=numpy_complex)
+        elif self._cst == fnft_kdvv_cstype.BOTH:
+            self._cont = np.zeros(3 * M, dtype=numpy_complex)
+        else:
+            # 3 or any other option: skip continuous spectrum -> pass NULL
+            self._cont = ctypes_nullptr
+        # pick the prototype matching NULL / non-NULL spectrum pointers
+        self._func = fnft_clib.prototype('fnft_kdvv',
+                                         self._cont is not ctypes_nullptr,
+                                         self._discspec is not ctypes_nullptr)
+
+    def set_time_window(self, T1, T2):
+        """Set the time positions of the first and the last sample for the following executions.
+
+        Arguments:
+
+        * T1, T2 : time positions of the first and the last sample
+        """
+        self._T[0] = T1
+        self._T[1] = T2
+
+    def set_xi_window(self, Xi1, Xi2):
+        """Set the min and max frequency of the continuous spectrum for the following executions.
+
+        The number of values M is fixed by the plan.
+
+        Arguments:
+
+        * Xi1, Xi2 : min and max frequency for the continuous spectrum
+        """
+        self._Xi[0] = Xi1
+        self._Xi[1] = Xi2
+
+    def execute(self, u, bsg=None, copy=True, out_cont=None, out_bound_states=None, out_disc=None, check=True):
+        """Calculate the Nonlinear Fourier Transform of u using the plan.
+
+        Arguments:
+
+        * u : numpy array (or buffer object, see as_input_array) holding the D samples of the field
+              to be analyzed
+
+        Optional Arguments:
+
+        * bsg : list or array of bound state guesses, only effective if bsl==0 (Newton
+                bound state localization) is activated. Default = None
+        * copy : if True (default), the returned arrays are copies. If False, they are views of the
+                 plan's buffers which are overwritten by the next call of execute.
+        * check : if True (default), give a warning if FNFT returns an error code
+        * out_cont : caller-owned array FNFT writes the continuous spectrum into, default = None.
+                     Must be a C-contiguous complex128 array of length M (cst=0), 2M (cst=1)
+                     or 3M (cst=2), e.g. a row of a preallocated result matrix.
+        * out_bound_states : caller-owned complex128 array of length K for the bound states,
+                             default = None
+        * out_disc : caller-owned complex128 array for the discrete spectrum, length K (dst=0, 1)
+                     or 2K (dst=2), default = None
+
+        If an output array is given, the corresponding result fields are views of it
+        (independent of copy).
+
+        Returns:
+
+        * res : KdvvResult holding the fields (depending on options), see kdvv_wrapper
+
+        """
+        cont = select_out_array(out_cont, self._cont, 'out_cont')
+        boundstates = select_out_array(out_bound_states, self._boundstates, 'out_bound_states')
+        discspec = select_out_array(out_disc, self._discspec, 'out_disc')
+        u = as_input_array(u, self.D, 'u')
+        if self._newton:
+            boundstates[:] = 0.0
+            if bsg is not None:
+                bsg_copy = np.array(bsg, dtype=np.complex128)
                 # copy as many of the guesses to bound state array
-                while (ii < K - 1) and (ii < len(bsg_copy) - 1) and (ii < len(kdvv_boundstates) - 1):
-                    ii = ii + 1
-                    kdvv_boundstates[ii] = bsg_copy[ii]
-
-    #
-    # continuous spectrum -> reflection coefficient and / or a,b
-    #
-    kdvv_cont_spec_type = numpy_complex_arr_ptr
-    if options.contspec_type == fnft_kdvv_cstype.REFLECTION_COEFFICIENT:
-        kdvv_cont = np.zeros(kdvv_M.value, dtype=numpy_complex)
-    elif options.contspec_type == fnft_kdvv_cstype.AB:
-        kdvv_cont = np.zeros(2 * kdvv_M.value, dtype=numpy_complex)
-    elif options.contspec_type == fnft_kdvv_cstype.BOTH:
-        kdvv_cont = np.zeros(3 * kdvv_M.value, dtype=numpy_complex)
-    else:
-        # 3 or any other option: skip continuous spectrum -> pass NULL
-        kdvv_cont = ctypes_nullptr
-        kdvv_cont_spec_type = type(ctypes_nullptr)
-
-    clib_kdvv_func.argtypes = [
-        type(kdvv_D),  # D
-        numpy_complex_arr_ptr,  # u
-        numpy_double_arr_ptr,  # t
-        type(kdvv_M),  # M
-        kdvv_cont_spec_type,  # cont
-        numpy_double_arr_ptr,  # Xi
-        ctypes.POINTER(ctypes_uint),  # K_ptr
-        kdvv_bound_states_type,  # numpy_complex_arr_ptr,  # boundstates
-        kdvv_disc_spec_type,  # normconsts res
-        ctypes.POINTER(KdvvOptionsStruct)]  # options ptr
-    rv = clib_kdvv_func(
-        kdvv_D,
-        kdvv_u,
-        kdvv_T,
-        kdvv_M,
-        kdvv_cont,
-        kdvv_Xi,
-        kdvv_K,
-        kdvv_boundstates,
-        kdvv_discspec,
-        ctypes.byref(options))
-    check_return_code(rv)
-    K_new = kdvv_K.value  # number of bound states found
-    rdict = {'return_value': rv,
-             'bound_states_num': K_new,
-             'bound_states': kdvv_boundstates[0:K_new],
-             'options': repr(options)}
-    #
-    # depending on options: output of discrete spectrum
-    #
-    if options.discspec_type == fnft_kdvv_dstype.NORMING_CONSTANTS:
-        rdict['disc_norm'] = kdvv_discspec[0:K_new]
-    elif options.discspec_type == fnft_kdvv_dstype.RESIDUES:
-        rdict['disc_res'] = kdvv_discspec[0:K_new]
-    elif options.discspec_type == fnft_kdvv_dstype.BOTH:
-        rdict['disc_norm'] = kdvv_discspec[0:K_new]
-        rdict['disc_res'] = kdvv_discspec[K_new:2 * K_new]
-    else:
-        # no discrete spectrum calculated
-        pass
-    #
-    # depending on options: output of continuous spectrum
-    #
-    if options.contspec_type == fnft_kdvv_cstype.REFLECTION_COEFFICIENT:
-        rdict['cont_ref'] = kdvv_cont[0:M]
-        # for backward compatibility reasons: include ref spectrum as 'cont'
-        rdict['cont'] = kdvv_cont[0:M]
-    elif options.contspec_type == fnft_kdvv_cstype.AB:
-        rdict['cont_a'] = kdvv_cont[0:M]
-        rdict['cont_b'] = kdvv_cont[M:2 * M]
-    elif options.contspec_type == fnft_kdvv_cstype.BOTH:
-        rdict['cont_ref'] = kdvv_cont[0:M]
-        # for backward compatibility reasons: include ref spectrum as 'cont'
-        rdict['cont'] = kdvv_cont[0:M]
-        rdict['cont_a'] = kdvv_cont[M:2 * M]
-        rdict['cont_b'] = kdvv_cont[2 * M:3 * M]
-    else:
-        # no cont. spectrum calculated
-        pass
-    return rdict
+                nguess = min(len(bsg_copy), self.K)
+                boundstates[0:nguess] = bsg_copy[0:nguess]
+        self._K.value = self.K
+        rv = self._func(
+            self._D,
+            u,
+            self._T,
+            self._M,
+            cont,
+            self._Xi,
+            self._K,
+            boundstates,
+            discspec,
+            self._options_ref)
+        if check:
+            check_return_code(rv)
+        return self._collect(rv, self._K.value, cont, boundstates, discspec, copy)
+
+    def _collect(self, rv, K_new, cont, boundstates, discspec, copy):
+        """Arrange the content of the output buffers in the result object.
+
+        Only the plan's own buffers are copied (if copy is True, or if the results occupy only a
+        small part of the buffer, see result_array_func), caller-supplied buffers never.
+        """
+        M = self.M
+        if self._dst == fnft_kdvv_dstype.BOTH:
+            disc_used = 2 * K_new
+        else:
+            disc_used = K_new
+        out_c = result_array_func(cont, None, copy, cont is self._cont)
+        out_d = result_array_func(discspec, disc_used, copy, discspec is self._discspec)
+        out_b = result_array_func(boundstates, K_new, copy, boundstates is self._boundstates)
+        if boundstates is ctypes_nullptr:
+            bound_states = np.zeros(0, dtype=numpy_complex)
+        else:
+            bound_states = out_b(boundstates[0:K_new])
+        res = KdvvResult(self.options)
+        res.return_value = rv
+        res.bound_states_num = K_new
+        res.bound_states = bound_states
+        #
+        # depending on options: output of discrete spectrum
+        #
+        if self._dst == fnft_kdvv_dstype.NORMING_CONSTANTS:
+            res.disc_norm = out_d(discspec[0:K_new])
+        elif self._dst == fnft_kdvv_dstype.RESIDUES:
+            res.disc_res = out_d(discspec[0:K_new])
+        elif self._dst == fnft_kdvv_dstype.BOTH:
+            res.disc_norm = out_d(discspec[0:K_new])
+            res.disc_res = out_d(discspec[K_new:2 * K_new])
+        else:
+            # no discrete spectrum calculated
+            pass
+        #
+        # depending on options: output of continuous spectrum
+        #
+        if self._cst == fnft_kdvv_cstype.REFLECTION_COEFFICIENT:
+            res.cont_ref = out_c(cont[0:M])
+            # for backward compatibility reasons: include ref spectrum as 'cont'
+            res.cont = res.cont_ref
+        elif self._cst == fnft_kdvv_cstype.AB:
+            res.cont_a = out_c(cont[0:M])
+            res.cont_b = out_c(cont[M:2 * M])
+        elif self._cst == fnft_kdvv_cstype.BOTH:
+            res.cont_ref = out_c(cont[0:M])
+            # for backward compatibility reasons: include ref spectrum as 'cont'
+            res.cont = res.cont_ref
+            res.cont_a = out_c(cont[M:2 * M])
+            res.cont_b = out_c(cont[2 * M:3 * M])
+        else:
+            # no cont. spectrum calculated
+            pass
+        return res
@@ -28,13 +28,16 @@ Christoph Mahnke 2021-2023
 """
 
 from .typesdef import *
-from .auxiliary import get_lib_path, check_return_code, get_winmode_param
+from .auxiliary import check_return_code, select_out_array, as_input_array, result_array_func, pad_pow2, add_metadata
+from .fnft_clib import get_fnft_clib
+from .results import ManakovvResult
 from .options_handling import get_manakovv_options
+from .bound_states import run_with_discrete_spectrum_check
 
 
 def manakovv(q1, q2, tvec, Xi1=-1.75, Xi2=2, M=128, K=128, kappa=1, bsf=None,
              bsl=None, bsg=None, niter=None, Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None,
-             display_c_msg=True):
+             display_c_msg=True, skip_empty_disc=True, pad=False):
     """
     Calculate the Nonlinear Fourier Transform for the Manakov equation with vanishing boundary conditions.
 
@@ -121,10 +124,20 @@ def manakovv(q1, q2, tvec, Xi1=-1.75, Xi2=2, M=128, K=128, kappa=1, bsf=None,
 
     * display_c_msg : whether to show messages raised by the C-library, default = True
 
+    * skip_empty_disc : skip the bound state search if the signal provably has no bound states
+                        (kappa = -1 or L1 norm of sqrt(|q1|**2 + |q2|**2) below pi/2, see
+                        discrete_spectrum_check). The result then holds bound_states_num = 0 and
+                        empty arrays, the decision is stored in res.metadata['discrete_spectrum'].
+                        Default = True
+
+    * pad : zero-pad q1 and q2 to the next power of two number of samples, extending the time
+            window (see pad_pow2). res.metadata['padding'] holds the numbers of zeros added on
+            the left and right. Default = False
+
 
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : ManakovvResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * bound_states_num : number of bound states found
@@ -140,17 +153,32 @@ def manakovv(q1, q2, tvec, Xi1=-1.75, Xi2=2, M=128, K=128, kappa=1, bsf=None,
 
     """
 
+    q1 = as_input_array(q1, name='q1')
+    q2 = as_input_array(q2, name='q2')
     D = len(q1)
     if len(q1) != len(q2):
         print("Warning: q1 and q2 should be of same length.")
     T1 = np.min(tvec)
     T2 = np.max(tvec)
+    padding = None
+    if pad:
+        (q1, q2), T1, T2, padding = pad_pow2([q1, q2], T1, T2)
+        D = len(q1)
     options = get_manakovv_options(bsf=bsf, bsl=bsl, niter=niter, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis, ref=ref)
-    return manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2,
-                            M, K, kappa, options,bsg=bsg,display_c_msg=display_c_msg)
 
+    def run(run_options):
+        return manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2,
+                                M, K, kappa, run_options, bsg=bsg, display_c_msg=display_c_msg)
+
+    res = run_with_discrete_spectrum_check('manakovv', run, options, (q1, q2), T1, T2, kappa=kappa,
+                                           skip_empty_disc=skip_empty_disc)
+    if padding is not None:
+        add_metadata(res, 'padding', padding)
+    return res
 
-def manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=None, display_c_msg=True):
+
+def manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=None, display_c_msg=True,
+                     out_cont=None, out_bound_states=None, out_disc=None):
     """
     Calculate the Nonlinear Fourier Transform for the Manakov equation with vanishing boundary conditions.
 
@@ -168,7 +196,7 @@ def manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=None
     * M : number of values for the continuous spectrum to calculate
     * K : maximum number of bound states to calculate
     * kappa : +/- 1 for focussing/defocussing nonlinearity
-    * options : options for manakovv as ManakovvOptionsStruct
+    * options : options for manakovv as ManakovvOptionsStruct or FrozenOptions
 
     Optional Arguments:
 
@@ -178,9 +206,14 @@ def manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=None
 
     * display_c_msg : whether to show messages raised by the C-library, default = True
 
+    * out_cont, out_bound_states, out_disc : caller-owned C-contiguous complex128 arrays FNFT
+           writes the continuous spectrum, the bound states and the discrete spectrum into
+           (e.g. rows of preallocated result matrices). The result fields are views of them.
+           See ManakovvPlan.execute for the required lengths. Default = None (allocate new arrays)
+
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : ManakovvResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * bound_states_num : number of bound states found
@@ -196,135 +229,220 @@ def manakovv_wrapper(D, q1, q2, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=None
 
     """
 
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_manakovv_func = fnft_clib.fnft_manakovv
-    clib_manakovv_func.restype = ctypes_int
-    if not display_c_msg:  # suppress output from C-library
-        clib_errwarn_setprintf = fnft_clib.fnft_errwarn_setprintf
-        clib_errwarn_setprintf(ctypes_nullptr)
-    manakovv_D = ctypes_uint(D)
-    manakovv_M = ctypes_uint(M)
-    manakovv_K = ctypes_uint(K)
-    manakovv_T = np.zeros(2, dtype=numpy_double)
-    manakovv_T[0] = T1
-    manakovv_T[1] = T2
-    manakovv_q1 = np.zeros(manakovv_D.value, dtype=numpy_complex)
-    manakovv_q2 = np.zeros(manakovv_D.value, dtype=numpy_complex)
-    manakovv_q1[:] = q1[:] + 0.0j
-    manakovv_q2[:] = q2[:] + 0.0j
-    manakovv_kappa = ctypes_int(kappa)
-    manakovv_Xi = np.zeros(2, dtype=numpy_double)
-    manakovv_Xi[0] = Xi1
-    manakovv_Xi[1] = Xi2
-    #
-    # discrete spectrum -> reflection coefficient and / or residues
-    #
-    manakovv_bound_states_type = numpy_complex_arr_ptr
-    manakovv_disc_spec_type = numpy_complex_arr_ptr
-    if (options.discspec_type == fnft_manakovv_dstype.NORMING_CONSTANTS) \
-            or (options.discspec_type == fnft_manakovv_dstype.RESIDUES):
-        manakovv_discspec = np.zeros(K, dtype=numpy_complex)  # todo check sizes
-        manakovv_boundstates = np.zeros(K, dtype=numpy_complex)
-    elif options.discspec_type == fnft_manakovv_dstype.BOTH:
-        manakovv_discspec = np.zeros(2 * K, dtype=numpy_complex)  # todo check sizes
-        manakovv_boundstates = np.zeros(K, dtype=numpy_complex)
-    else:
-        # 3 or any other option: skip discrete spec -> pass NULL
-        manakovv_discspec = ctypes_nullptr
-        manakovv_boundstates = ctypes_nullptr
-        manakovv_bound_states_type = type(ctypes_nullptr)
-        manakovv_disc_spec_type = type(ctypes_nullptr)
-
-    #
-    # for Newton refinement: use guesses, if provided.
-    #
-    if options.bound_state_localization == fnft_manakovv_bsloc.NEWTON:
-        if bsg is not None:
-            bsg_copy = np.array(bsg, dtype=np.complex128)
-            if len(bsg_copy) > 0:
-                ii = -1
+    plan = ManakovvPlan(D, T1, T2, Xi1, Xi2, M, K, kappa, options, display_c_msg=display_c_msg)
+    return plan.execute(q1, q2, bsg=bsg, copy=False, out_cont=out_cont,
+                        out_bound_states=out_bound_states, out_disc=out_disc)
+
+
+class ManakovvPlan:
+    """Execution plan for repeated calls of fnft_manakovv with fixed parameters.
+
+    All buffers passed to FNFT are allocated once when the plan is created, and the matching
+    prototype of fnft_manakovv is picked. Each call of execute() only passes the samples to FNFT
+    ('plan once, execute many'). Samples given as C-contiguous complex128 array are not copied.
+
+    Arguments:
+
+    * D : number of sample points
+    * T1, T2 : time positions of the first and the last sample
+    * Xi1, Xi2 : min and max frequency for the continuous spectrum
+    * M : number of values for the continuous spectrum to calculate
+    * K : maximum number of bound states to calculate
+    * kappa : +/- 1 for focussing/defocussing nonlinearity
+    * options : options for manakovv as ManakovvOptionsStruct or FrozenOptions. The plan keeps a copy.
+
+    Optional Arguments:
+
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, D, T1, T2, Xi1, Xi2, M, K, kappa, options, display_c_msg=True):
+        fnft_clib = get_fnft_clib()
+        if not display_c_msg:  # suppress output from C-library
+            fnft_clib.suppress_c_messages()
+        self.D = D
+        self.M = M
+        self.K = K
+        self.options = ManakovvOptionsStruct.from_buffer_copy(options_struct(options))
+        self._options_ref = ctypes.byref(self.options)
+        self._D = ctypes_uint(D)
+        self._M = ctypes_uint(M)
+        self._K = ctypes_uint(K)
+        self._kappa = ctypes_int(kappa)
+        self._T = np.array([T1, T2], dtype=numpy_double)
+        self._Xi = np.array([Xi1, Xi2], dtype=numpy_double)
+        #
+        # discrete spectrum -> reflection coefficient and / or residues
+        #
+        self._dst = options.discspec_type
+        if (self._dst == fnft_manakovv_dstype.NORMING_CONSTANTS) \
+                or (self._dst == fnft_manakovv_dstype.RESIDUES):
+            self._discspec = np.zeros(K, dtype=numpy_complex)  # todo check sizes
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+        elif self._dst == fnft_manakovv_dstype.BOTH:
+            self._discspec = np.zeros(2 * K, dtype=numpy_complex)  # todo check sizes
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+        else:
+            # 3 or any other option: skip discrete spec -> pass NULL
+            self._discspec = ctypes_nullptr
+            self._boundstates = ctypes_nullptr
+        # for Newton refinement: guesses are passed in the bound states array
+        self._newton = (options.bound_state_localization == fnft_manakovv_bsloc.NEWTON) \
+            and (self._boundstates is not ctypes_nullptr)
+        #
+        # continuous spectrum -> reflection coefficient and / or a,b
+        #
+        self._cst = options.contspec_type
+        if self._cst == fnft_manakovv_cstype.REFLECTION_COEFFICIENT:  # this is default
+            self._cont = np.zeros(2 * M, dtype=numpy_complex)
+        elif self._cst == fnft_manakovv_cstype.AB:
+            self._cont = np.zeros(3 * M, dtype=numpy_complex)
+        elif self._cst == fnft_manakovv_cstype.BOTH:
+            self._cont = np.zeros(5 * M, dtype=numpy_complex)
+        else:
+            # 3 or any other option: skip continuous spectrum -> pass NULL
+            self._cont = ctypes_nullptr
+        # pick the prototype matching NULL / non-NULL spectrum pointers
+        self._func = fnft_clib.prototype('fnft_manakovv',
+                                         self._cont is not ctypes_nullptr,
+                                         self._discspec is not ctypes_nullptr)
+
+    def set_time_window(self, T1, T2):
+        """Set the time positions of the first and the last sample for the following executions.
+
+        Arguments:
+
+        * T1, T2 : time positions of the first and the last sample
+        """
+        self._T[0] = T1
+        self._T[1] = T2
+
+    def set_xi_window(self, Xi1, Xi2):
+        """Set the min and max frequency of the continuous spectrum for the following executions.
+
+        The number of values M is fixed by the plan.
+
+        Arguments:
+
+        * Xi1, Xi2 : min and max frequency for the continuous spectrum
+        """
+        self._Xi[0] = Xi1
+        self._Xi[1] = Xi2
+
+    def execute(self, q1, q2, bsg=None, copy=True, out_cont=None, out_bound_states=None, out_disc=None, check=True):
+        """Calculate the Nonlinear Fourier Transform of (q1, q2) using the plan.
+
+        Arguments:
+
+        * q1 : numpy array (or buffer object, see as_input_array) holding the D samples of the
+               first input field
+        * q2 : numpy array (or buffer object) holding the D samples of the second input field
+
+        Optional Arguments:
+
+        * bsg : list or array of bound state guesses, only effective if
+                options.bound_state_localization == 1  (Newton
+                bound state location is activated). Default = None
+        * copy : if True (default), the returned arrays are copies. If False, they are views of the
+                 plan's buffers which are overwritten by the next call of execute.
+        * check : if True (default), give a warning if FNFT returns an error code
+        * out_cont : caller-owned array FNFT writes the continuous spectrum into, default = None.
+                     Must be a C-contiguous complex128 array of length 2M (cst=0), 3M (cst=1)
+                     or 5M (cst=2), e.g. a row of a preallocated result matrix.
+        * out_bound_states : caller-owned complex128 array of length K for the bound states,
+                             default = None
+        * out_disc : caller-owned complex128 array for the discrete spectrum, length K (dst=0, 1)
+                     or 2K (dst=2), default = None
+
+        If an output array is given, the corresponding result fields are views of it
+        (independent of copy).
+
+        Returns:
+
+        * res : ManakovvResult holding the fields (depending on options), see manakovv_wrapper
+
+        """
+        cont = select_out_array(out_cont, self._cont, 'out_cont')
+        boundstates = select_out_array(out_bound_states, self._boundstates, 'out_bound_states')
+        discspec = select_out_array(out_disc, self._discspec, 'out_disc')
+        q1 = as_input_array(q1, self.D, 'q1')
+        q2 = as_input_array(q2, self.D, 'q2')
+        if self._newton:
+            boundstates[:] = 0.0
+            if bsg is not None:
+                bsg_copy = np.array(bsg, dtype=np.complex128)
                 # copy as many of the guesses to bound state array
-                while (ii < K - 1) and (ii < len(bsg_copy) - 1) and (ii < len(manakovv_boundstates) - 1):
-                    ii = ii + 1
-                    manakovv_boundstates[ii] = bsg_copy[ii]
-    #
-    # continuous spectrum -> reflection coefficient and / or a,b
-    #
-    manakovv_cont_spec_type = numpy_complex_arr_ptr
-
-    if options.contspec_type == fnft_manakovv_cstype.REFLECTION_COEFFICIENT:  # this is default
-        manakovv_cont = np.zeros(2 * M, dtype=numpy_complex)
-    elif options.contspec_type == fnft_manakovv_cstype.AB:
-        manakovv_cont = np.zeros(3 * M, dtype=numpy_complex)
-    elif options.contspec_type == fnft_manakovv_cstype.BOTH:
-        manakovv_cont = np.zeros(5 * M, dtype=numpy_complex)
-    else:
-        # 3 or any other option: skip continuous spectrum -> pass NULL
-        manakovv_cont = ctypes_nullptr
-        manakovv_cont_spec_type = type(ctypes_nullptr)
-
-    clib_manakovv_func.argtypes = [
-        type(manakovv_D),  # D
-        numpy_complex_arr_ptr,  # q1
-        numpy_complex_arr_ptr,  # q2
-        numpy_double_arr_ptr,  # t
-        type(manakovv_M),  # M
-        manakovv_cont_spec_type,  # cont
-        numpy_double_arr_ptr,  # xi
-        ctypes.POINTER(ctypes_uint),  # K_ptr
-        manakovv_bound_states_type,  # boundstates
-        manakovv_disc_spec_type,  # normconst res
-        type(manakovv_kappa),  # kappa
-        ctypes.POINTER(ManakovvOptionsStruct)]  # options ptr
-
-    rv = clib_manakovv_func(
-        manakovv_D,
-        manakovv_q1,
-        manakovv_q2,
-        manakovv_T,
-        manakovv_M,
-        manakovv_cont,
-        manakovv_Xi,
-        manakovv_K,
-        manakovv_boundstates,
-        manakovv_discspec,
-        manakovv_kappa,
-        ctypes.byref(options))
-    check_return_code(rv)
-    K_new = manakovv_K.value
-    rdict = {
-        'return_value': rv,
-        'bound_states_num': K_new,
-        'bound_states': manakovv_boundstates[0:K_new]}
-    #
-    # depending on options: output of discrete spectrum
-    #
-    if options.discspec_type == fnft_manakovv_dstype.NORMING_CONSTANTS:
-        rdict['disc_norm'] = manakovv_discspec[0:K_new]
-    elif options.discspec_type == fnft_manakovv_dstype.RESIDUES:
-        rdict['disc_res'] = manakovv_discspec[0:K_new]
-    elif options.discspec_type == fnft_manakovv_dstype.BOTH:
-        rdict['disc_norm'] = manakovv_discspec[0:K_new]
-        rdict['disc_res'] = manakovv_discspec[K_new:2 * K_new]
-    else:
-        # no discrete spectrum calculated
-        pass
-    #
-    # depending on options: output of continuous spectrum
-    #
-    if options.contspec_type == fnft_manakovv_cstype.REFLECTION_COEFFICIENT:
-        rdict['cont_ref1'] = manakovv_cont[0:M]
-        rdict['cont_ref2'] = manakovv_cont[M:2 * M]
-    if options.contspec_type == fnft_manakovv_cstype.AB:
-        # a and b
-        rdict['cont_a'] = manakovv_cont[0:M]
-        rdict['cont_b1'] = manakovv_cont[M:2 * M]
-        rdict['cont_b2'] = manakovv_cont[2 * M::]
-    if options.contspec_type == fnft_manakovv_cstype.BOTH:
-        rdict['cont_ref1'] = manakovv_cont[0:M]
-        rdict['cont_ref2'] = manakovv_cont[M:2 * M]
-        rdict['cont_a'] = manakovv_cont[2 * M:3 * M]
-        rdict['cont_b1'] = manakovv_cont[3 * M:4 * M]
-        rdict['cont_b2'] = manakovv_cont[4 * M::]
-    rdict['options'] = repr(options)
-    return rdict
+                nguess = min(len(bsg_copy), self.K)
+                boundstates[0:nguess] = bsg_copy[0:nguess]
+        self._K.value = self.K
+        rv = self._func(
+            self._D,
+            q1,
+            q2,
+            self._T,
+            self._M,
+            cont,
+            self._Xi,
+            self._K,
+            boundstates,
+            discspec,
+            self._kappa,
+            self._options_ref)
+        if check:
+            check_return_code(rv)
+        return self._collect(rv, self._K.value, cont, boundstates, discspec, copy)
+
+    def _collect(self, rv, K_new, cont, boundstates, discspec, copy):
+        """Arrange the content of the output buffers in the result object.
+
+        Only the plan's own buffers are copied (if copy is True, or if the results occupy only a
+        small part of the buffer, see result_array_func), caller-supplied buffers never.
+        """
+        M = self.M
+        if self._dst == fnft_manakovv_dstype.BOTH:
+            disc_used = 2 * K_new
+        else:
+            disc_used = K_new
+        out_c = result_array_func(cont, None, copy, cont is self._cont)
+        out_d = result_array_func(discspec, disc_used, copy, discspec is self._discspec)
+        out_b = result_array_func(boundstates, K_new, copy, boundstates is self._boundstates)
+        if boundstates is ctypes_nullptr:
+            bound_states = np.zeros(0, dtype=numpy_complex)
+        else:
+            bound_states = out_b(boundstates[0:K_new])
+        res = ManakovvResult(self.options)
+        res.return_value = rv
+        res.bound_states_num = K_new
+        res.bound_states = bound_states
+        #
+        # depending on options: output of discrete spectrum
+        #
+        if self._dst == fnft_manakovv_dstype.NORMING_CONSTANTS:
+            res.disc_norm = out_d(discspec[0:K_new])
+        elif self._dst == fnft_manakovv_dstype.RESIDUES:
+            res.disc_res = out_d(discspec[0:K_new])
+        elif self._dst == fnft_manakovv_dstype.BOTH:
+            res.disc_norm = out_d(discspec[0:K_new])
+            res.disc_res = out_d(discspec[K_new:2 * K_new])
+        else:
+            # no discrete spectrum calculated
+            pass
+        #
+        # depending on options: output of continuous spectrum
+        #
+        if self._cst == fnft_manakovv_cstype.REFLECTION_COEFFICIENT:
+            res.cont_ref1 = out_c(cont[0:M])
+            res.cont_ref2 = out_c(cont[M:2 * M])
+        if self._cst == fnft_manakovv_cstype.AB:
+            # a and b
+            res.cont_a = out_c(cont[0:M])
+            res.cont_b1 = out_c(cont[M:2 * M])
+            res.cont_b2 = out_c(cont[2 * M::])
+        if self._cst == fnft_manakovv_cstype.BOTH:
+            res.cont_ref1 = out_c(cont[0:M])
+            res.cont_ref2 = out_c(cont[M:2 * M])
+            res.cont_a = out_c(cont[2 * M:3 * M])
+            res.cont_b1 = out_c(cont[3 * M:4 * M])
+            res.cont_b2 = out_c(cont[4 * M::])
+        return res
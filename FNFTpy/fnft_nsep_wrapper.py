@@ -28,7 +28,9 @@ Christoph Mahnke, 2018-2023
 """
 
 from .typesdef import *
-from .auxiliary import get_lib_path, check_return_code, get_winmode_param
+from .auxiliary import check_return_code, select_out_array, as_input_array, result_array_func
+from .fnft_clib import get_fnft_clib
+from .results import NsepResult
 from .options_handling import print_nsep_options, get_nsep_options
 
 
@@ -127,7 +129,7 @@ def nsep(q, T1, T2, K=None, msg=None, M=None, asg=None, kappa=1, loc=None, filt=
 
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : NsepResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * K : number of points in the main spectrum
@@ -137,6 +139,7 @@ def nsep(q, T1, T2, K=None, msg=None, M=None, asg=None, kappa=1, loc=None, filt=
         * options : NsepOptionsStruct with options used
 
         """
+    q = as_input_array(q)
     #D = len(q)
     # sometimes D is one off to 2**N, approximate
     D = int(2**(np.round(np.log2(len(q)))))
@@ -151,7 +154,7 @@ def nsep(q, T1, T2, K=None, msg=None, M=None, asg=None, kappa=1, loc=None, filt=
                         kappa, options, msg=msg, asg=asg, display_c_msg=display_c_msg)
 
 def nsep_wrapper(D, q, T1, T2, K, M, phase_shift, kappa,
-                 options,  msg=None, asg=None, display_c_msg=True):
+                 options,  msg=None, asg=None, display_c_msg=True, out_main=None, out_aux=None):
     """Calculate the Nonlinear Fourier Transform for the Nonlinear Schroedinger equation with periodic boundaries.
 
     This function's interface mimics the behavior of the function 'fnft_nsep' of FNFT.
@@ -167,7 +170,7 @@ def nsep_wrapper(D, q, T1, T2, K, M, phase_shift, kappa,
     * M : expected length of the auxiliary specrum. A good guess is D
     * phase_shift : change of the phase over one quasi-period, arg(q(t+(T2-T1)/q(t))
     * kappa   : +/- 1 for focussing/defocussing nonlinearity
-    * options : options for nsep as NsepOptionsStruct. Can be generated e.g. with 'get_nsep_options()'
+    * options : options for nsep as NsepOptionsStruct or FrozenOptions. Can be generated e.g. with 'get_nsep_options()'
 
     Optional Arguments:
 
@@ -177,9 +180,13 @@ def nsep_wrapper(D, q, T1, T2, K, M, phase_shift, kappa,
 
     * asg : auxiliary spectrum guesses (on has effect if options.localization == Newton).
 
+    * out_main, out_aux : caller-owned C-contiguous complex128 arrays FNFT writes the main spectrum
+            (length K * options.points_per_spine) and the auxiliary spectrum (length M) into.
+            The result fields are views of them. Default = None (allocate new arrays)
+
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : NsepResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * K : number of points in the main spectrum
@@ -190,79 +197,126 @@ def nsep_wrapper(D, q, T1, T2, K, M, phase_shift, kappa,
 
     """
 
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_nsep_func = fnft_clib.fnft_nsep
-    clib_nsep_func.restype = ctypes_int
-    if not display_c_msg:  # suppress output from C-library
-        clib_errwarn_setprintf = fnft_clib.fnft_errwarn_setprintf
-        clib_errwarn_setprintf(ctypes_nullptr)
-    nsep_D = ctypes_uint(D)
-    nsep_K = ctypes_uint(K)
-    nsep_M = ctypes_uint(M)
-    #nsep_q = np.zeros(nsep_D.value, dtype=numpy_complex)
-    nsep_q = np.zeros(len(q), dtype=numpy_complex)
-    nsep_q[:] = q[:] + 0.0j
-    nsep_T = np.zeros(2, dtype=numpy_double)
-    nsep_T[0] = T1
-    nsep_T[1] = T2
-    nsep_phase_shift = ctypes_double(phase_shift)
-    nsep_main_spec = np.zeros(nsep_K.value * options.points_per_spine, dtype=numpy_complex)
-    # if main spec guesses are provided
-    nsep_aux_spec = np.zeros(nsep_M.value, dtype=numpy_complex)
-    if options.localization == fnft_nsep_loc.NEWTON:
-        if msg is not None:
-            msg_copy = np.array(msg, dtype=np.complex128)
-            if len(msg_copy) > 0:
-                ii = -1
-                # copy as many of the guesses to main spec array
-                #while (ii < K * options.points_per_spine - 1) and (ii < len(msg_copy) - 1) and (ii < len(nsep_main_spec) - 1):
-                while (ii < len(msg_copy) - 1) and (ii < len(nsep_main_spec) - 1):
-                    ii = ii + 1
-                    nsep_main_spec[ii] = msg_copy[ii]
-        if asg is not None:
-            asg_copy = np.array(asg, dtype=np.complex128)
-            if len(asg_copy) > 0:
-                ii = -1
-                # copy as many of the guesses to main spec array
-                #while (ii < K - 1) and (ii < len(asg_copy) - 1) and (ii < len(nsep_aux_spec) - 1):
-                while (ii < len(asg_copy) - 1) and (ii < len(nsep_aux_spec) - 1):
-                    ii = ii + 1
-                    nsep_aux_spec[ii] = asg_copy[ii]
-        #
-    nsep_sheet_indices = ctypes_nullptr
-    nsep_kappa = ctypes_int(kappa)
-
-    clib_nsep_func.argtypes = [
-        type(nsep_D),  # D
-        numpy_complex_arr_ptr,  # q
-        numpy_double_arr_ptr,  # t
-        type(nsep_phase_shift),  # phase_shift
-        ctypes.POINTER(ctypes_uint),  # K_ptr
-        numpy_complex_arr_ptr,  # main_spec
-        ctypes.POINTER(ctypes_uint),  # M_ptr
-        numpy_complex_arr_ptr,  # aux_spec
-        type(nsep_sheet_indices),  # sheet indices
-        type(nsep_kappa),  # kappa
-        ctypes.POINTER(NsepOptionsStruct)]  # options ptr
-
-    rv = clib_nsep_func(
-        nsep_D,
-        nsep_q,
-        nsep_T,
-        nsep_phase_shift,
-        nsep_K,
-        nsep_main_spec,
-        nsep_M,
-        nsep_aux_spec,
-        nsep_sheet_indices,
-        nsep_kappa,
-        ctypes.byref(options))
-    check_return_code(rv)
-    rdict = {
-        'return_value': rv,
-        'K': nsep_K.value,
-        'main': nsep_main_spec[0:nsep_K.value],
-        'M': nsep_M.value,
-        'aux': nsep_aux_spec[0:nsep_M.value],
-        'options': repr(options)}
-    return rdict
+    plan = NsepPlan(D, T1, T2, K, M, phase_shift, kappa, options, display_c_msg=display_c_msg)
+    return plan.execute(q, msg=msg, asg=asg, copy=False, out_main=out_main, out_aux=out_aux)
+
+
+class NsepPlan:
+    """Execution plan for repeated calls of fnft_nsep with fixed parameters.
+
+    All buffers passed to FNFT are allocated once when the plan is created. Each call of
+    execute() only passes the samples to FNFT ('plan once, execute many'). Samples given as
+    C-contiguous complex128 array with at least D elements are not copied.
+
+    Arguments:
+
+    * D : number of sample points (should be power of 2)
+    * T1, T2  : time positions of the first and the (D+1) sample
+    * K : expected length of the main spectrum. A good guess is options.points_per_spine * D
+    * M : expected length of the auxiliary specrum. A good guess is D
+    * phase_shift : change of the phase over one quasi-period, arg(q(t+(T2-T1)/q(t))
+    * kappa   : +/- 1 for focussing/defocussing nonlinearity
+    * options : options for nsep as NsepOptionsStruct or FrozenOptions. The plan keeps a copy.
+
+    Optional Arguments:
+
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, D, T1, T2, K, M, phase_shift, kappa, options, display_c_msg=True):
+        fnft_clib = get_fnft_clib()
+        if not display_c_msg:  # suppress output from C-library
+            fnft_clib.suppress_c_messages()
+        self.D = D
+        self.K = K
+        self.M = M
+        self.options = NsepOptionsStruct.from_buffer_copy(options_struct(options))
+        self._options_ref = ctypes.byref(self.options)
+        self._D = ctypes_uint(D)
+        self._K = ctypes_uint(K)
+        self._M = ctypes_uint(M)
+        self._T = np.array([T1, T2], dtype=numpy_double)
+        self._phase_shift = ctypes_double(phase_shift)
+        self._main_spec = np.zeros(K * options.points_per_spine, dtype=numpy_complex)
+        self._aux_spec = np.zeros(M, dtype=numpy_complex)
+        self._newton = options.localization == fnft_nsep_loc.NEWTON
+        self._sheet_indices = ctypes_nullptr
+        self._kappa = ctypes_int(kappa)
+        self._func = fnft_clib.prototype('fnft_nsep')
+
+    def execute(self, q, msg=None, asg=None, copy=True, out_main=None, out_aux=None, check=True):
+        """Calculate the Nonlinear Fourier Transform of q using the plan.
+
+        Arguments:
+
+        * q : numpy array (or buffer object, see as_input_array) holding the D samples of the input
+              field. Longer arrays are truncated, shorter arrays are padded with zeros.
+
+        Optional Arguments:
+
+        * msg : main spectrum guesses (on has effect if options.localization == Newton).
+        * asg : auxiliary spectrum guesses (on has effect if options.localization == Newton).
+        * copy : if True (default), the returned arrays are copies. If False, they are views of the
+                 plan's buffers which are overwritten by the next call of execute.
+        * check : if True (default), give a warning if FNFT returns an error code
+        * out_main : caller-owned C-contiguous complex128 array of length K * options.points_per_spine
+                     FNFT writes the main spectrum into, default = None
+        * out_aux : caller-owned C-contiguous complex128 array of length M FNFT writes the
+                    auxiliary spectrum into, default = None
+
+        If an output array is given, the corresponding result field is a view of it
+        (independent of copy).
+
+        Returns:
+
+        * res : NsepResult holding the fields (depending on options), see nsep_wrapper
+
+        """
+        main_spec = select_out_array(out_main, self._main_spec, 'out_main')
+        aux_spec = select_out_array(out_aux, self._aux_spec, 'out_aux')
+        q = as_input_array(q, name='q')
+        if len(q) >= self.D:
+            q = q[0:self.D]
+        else:
+            q_padded = np.zeros(self.D, dtype=numpy_complex)
+            q_padded[0:len(q)] = q
+            q = q_padded
+        if self._newton:
+            # if guesses are provided: copy as many of them as fit in the spectrum arrays
+            main_spec[:] = 0.0
+            if msg is not None:
+                msg_copy = np.array(msg, dtype=np.complex128)
+                nguess = min(len(msg_copy), len(main_spec))
+                main_spec[0:nguess] = msg_copy[0:nguess]
+            aux_spec[:] = 0.0
+            if asg is not None:
+                asg_copy = np.array(asg, dtype=np.complex128)
+                nguess = min(len(asg_copy), len(aux_spec))
+                aux_spec[0:nguess] = asg_copy[0:nguess]
+        self._K.value = self.K
+        self._M.value = self.M
+        rv = self._func(
+            self._D,
+            q,
+            self._T,
+            self._phase_shift,
+            self._K,
+            main_spec,
+            self._M,
+            aux_spec,
+            self._sheet_indices,
+            self._kappa,
+            self._options_ref)
+        if check:
+            check_return_code(rv)
+        # copy (or copy-on-trim, see result_array_func) only the plan's own buffers
+        out_m = result_array_func(main_spec, self._K.value, copy, out_main is None)
+        out_a = result_array_func(aux_spec, self._M.value, copy, out_aux is None)
+        res = NsepResult(self.options)
+        res.return_value = rv
+        res.K = self._K.value
+        res.main = out_m(main_spec[0:self._K.value])
+        res.M = self._M.value
+        res.aux = out_a(aux_spec[0:self._M.value])
+        return res
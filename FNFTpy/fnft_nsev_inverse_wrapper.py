@@ -29,6 +29,8 @@ Christoph Mahnke, Shrinivas Chimmalgi 2018-2023
 
 from .typesdef import *
 from .auxiliary import *
+from .fnft_clib import get_fnft_clib
+from .results import NsevInverseResult
 from .options_handling import get_nsev_inverse_options
 
 
@@ -129,7 +131,7 @@ def nsev_inverse(xivec, tvec, contspec, bound_states, discspec,
 
 def nsev_inverse_wrapper(M, contspec, Xi1, Xi2, K, bound_states,
                          normconst_or_residues, D, T1, T2, kappa,
-                         options, display_c_msg=True):
+                         options, display_c_msg=True, out_q=None):
     """Calculate the  Inverse Nonlinear Fourier Transform for the Nonlinear Schroedinger equation with vanishing boundaries.
 
     This function's interface mimics the behavior of the function 'fnft_nsev_inverse' of FNFT.
@@ -148,90 +150,128 @@ def nsev_inverse_wrapper(M, contspec, Xi1, Xi2, K, bound_states,
     * D : number of samples for the output field
     * T1, T2 : borders of the desired time window
     * kappa : +1/-1 for focussing / defocussing NSE
-    * options : options for nsev_inverse as NsevInverseOptionsStruct
+    * options : options for nsev_inverse as NsevInverseOptionsStruct or FrozenOptions
 
     Optional Arguments:
 
     * display_c_msg : whether or not to show messages raised by the C-library, default = True
+    * out_q : caller-owned C-contiguous complex128 array of length D FNFT writes the field into
+              (e.g. a row of a preallocated result matrix). Default = None (allocate a new array)
 
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : NsevInverseResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * q : time field resulting from inverse transform
-        * options : options for nsev_inverse as NsevInverseOptionsStruct
+        * options : options for nsev_inverse as NsevInverseOptionsStruct or FrozenOptions
     """
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_nsev_inverse_func = fnft_clib.fnft_nsev_inverse
-    clib_nsev_inverse_func.restype = ctypes_int
-    if not display_c_msg:  # suppress output from C-library
-        clib_errwarn_setprintf = fnft_clib.fnft_errwarn_setprintf
-        clib_errwarn_setprintf(ctypes_nullptr)
-    nsev_M = ctypes_uint(M)
-    nsev_Xi = np.zeros(2, dtype=numpy_double)
-    nsev_Xi[0] = Xi1
-    nsev_Xi[1] = Xi2
-    nsev_K = ctypes_uint(K)
-
-    if K > 0:  # at least one bound states
-        nsev_boundstates = np.zeros(K, dtype=numpy_complex)
-        nsev_boundstates[:] = bound_states[:]
-        nsev_discspec = np.zeros(K, dtype=numpy_complex)
-        nsev_discspec[:] = normconst_or_residues[:]
-        nsev_dstype = numpy_complex_arr_ptr
-        nsev_bstype = numpy_complex_arr_ptr
-    else:
-        nsev_boundstates = ctypes_nullptr
-        nsev_discspec = ctypes_nullptr
-        nsev_bstype = type(ctypes_nullptr)
-        nsev_dstype = type(ctypes_nullptr)
-    if M > 0:  # continuous spectrum
-        nsev_contspec = np.zeros(M, dtype=numpy_complex)
-        nsev_contspec[:] = contspec[:]
-        nsev_cstype = numpy_complex_arr_ptr  # contspec
-    else:
-        nsev_contspec = ctypes_nullptr
-        nsev_cstype = type(ctypes_nullptr)
-    nsev_D = ctypes_uint(D)
-    nsev_T = np.zeros(2, dtype=numpy_double)
-    nsev_T[0] = T1
-    nsev_T[1] = T2
-    nsev_kappa = ctypes_int(kappa)
-    nsev_q = np.zeros(nsev_D.value, dtype=numpy_complex)
-    clib_nsev_inverse_func.argtypes = [
-        type(nsev_M),
-        nsev_cstype,  # contspec type
-        numpy_double_arr_ptr,  # xi
-        type(nsev_K),
-        nsev_bstype,  # boundstates type
-        nsev_dstype,  # normconstants or residues type
-        type(nsev_D),
-        numpy_complex_arr_ptr,  # q
-        numpy_double_arr_ptr,  # t
-        type(nsev_kappa),
-        ctypes.POINTER(NsevInverseOptionsStruct)  # options ptr
-    ]
-    rv = clib_nsev_inverse_func(
-        nsev_M,
-        nsev_contspec,
-        nsev_Xi,
-        nsev_K,
-        nsev_boundstates,
-        nsev_discspec,
-        nsev_D,
-        nsev_q,
-        nsev_T,
-        nsev_kappa,
-        ctypes.byref(options)
-    )
-    check_return_code(rv)
-    rdict = {
-        'return_value': rv,
-        'q': nsev_q,
-        'options': repr(options)
-    }
-    return rdict
+    plan = NsevInversePlan(M, Xi1, Xi2, K, D, T1, T2, kappa, options, display_c_msg=display_c_msg)
+    return plan.execute(contspec, bound_states, normconst_or_residues, copy=False, out_q=out_q)
+
+
+class NsevInversePlan:
+    """Execution plan for repeated calls of fnft_nsev_inverse with fixed parameters.
+
+    All buffers passed to FNFT are allocated once when the plan is created. Each call of
+    execute() copies the spectra into the plan and calls FNFT ('plan once, execute many').
+
+    Arguments:
+
+    * M : number of sample points for continuous spectrum (0 for no continuous spectrum)
+    * Xi1, Xi2  : frequencies defining the frequency range of the continuous spectrum.
+                    ! Currently, the positions returned by nsev_inverse_xi_wrapper must be used !
+    * K : number of bound states (0 for no discrete spectrum)
+    * D : number of samples for the output field
+    * T1, T2 : borders of the desired time window
+    * kappa : +1/-1 for focussing / defocussing NSE
+    * options : options for nsev_inverse as NsevInverseOptionsStruct or FrozenOptions. The plan keeps a copy.
+
+    Optional Arguments:
+
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, M, Xi1, Xi2, K, D, T1, T2, kappa, options, display_c_msg=True):
+        fnft_clib = get_fnft_clib()
+        if not display_c_msg:  # suppress output from C-library
+            fnft_clib.suppress_c_messages()
+        self.M = M
+        self.K = K
+        self.D = D
+        self.options = NsevInverseOptionsStruct.from_buffer_copy(options_struct(options))
+        self._options_ref = ctypes.byref(self.options)
+        self._M = ctypes_uint(M)
+        self._Xi = np.array([Xi1, Xi2], dtype=numpy_double)
+        self._K = ctypes_uint(K)
+        if K > 0:  # at least one bound states
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+            self._discspec = np.zeros(K, dtype=numpy_complex)
+        else:
+            self._boundstates = ctypes_nullptr
+            self._discspec = ctypes_nullptr
+        if M > 0:  # continuous spectrum
+            self._contspec = np.zeros(M, dtype=numpy_complex)
+        else:
+            self._contspec = ctypes_nullptr
+        self._D = ctypes_uint(D)
+        self._T = np.array([T1, T2], dtype=numpy_double)
+        self._kappa = ctypes_int(kappa)
+        self._q = np.zeros(D, dtype=numpy_complex)
+        # pick the prototype matching NULL / non-NULL spectrum pointers
+        self._func = fnft_clib.prototype('fnft_nsev_inverse', M > 0, K > 0)
+
+    def execute(self, contspec, bound_states, normconst_or_residues, copy=True, out_q=None, check=True):
+        """Calculate the Inverse Nonlinear Fourier Transform using the plan.
+
+        Arguments:
+
+        * contspec : numpy array holding the M samples of the continuous spectrum (ignored if M=0)
+        * bound_states : K bound states (ignored if K=0)
+        * normconst_or_residues : K bound state spectral coefficients (ignored if K=0)
+
+        Optional Arguments:
+
+        * copy : if True (default), the returned field is a copy. If False, it is a view of the
+                 plan's buffer which is overwritten by the next call of execute.
+        * check : if True (default), give a warning if FNFT returns an error code
+        * out_q : caller-owned C-contiguous complex128 array of length D FNFT writes the field into.
+                  If given, the field 'q' of the result is this array (independent of copy).
+                  Default = None
+
+        Returns:
+
+        * res : NsevInverseResult holding the fields, see nsev_inverse_wrapper
+
+        """
+        q = select_out_array(out_q, self._q, 'out_q')
+        if self.K > 0:
+            self._boundstates[:] = bound_states[:]
+            self._discspec[:] = normconst_or_residues[:]
+        if self.M > 0:
+            self._contspec[:] = contspec[:]
+        rv = self._func(
+            self._M,
+            self._contspec,
+            self._Xi,
+            self._K,
+            self._boundstates,
+            self._discspec,
+            self._D,
+            q,
+            self._T,
+            self._kappa,
+            self._options_ref
+        )
+        if check:
+            check_return_code(rv)
+        if copy and out_q is None:
+            q = np.copy(q)
+        res = NsevInverseResult(self.options)
+        res.return_value = rv
+        res.q = q
+        return res
 
 
 def nsev_inverse_xi_wrapper(D, T1, T2, M, dis=None, display_c_msg=True):
@@ -287,12 +327,10 @@ def nsev_inverse_xi_wrapper(D, T1, T2, M, dis=None, display_c_msg=True):
     * xi : two-element C double vector containing XI borders
 
     """
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_nsev_inverse_xi_func = fnft_clib.fnft_nsev_inverse_XI
-    clib_nsev_inverse_xi_func.restype = ctypes_int
+    fnft_clib = get_fnft_clib()
+    clib_nsev_inverse_xi_func = fnft_clib.prototype('fnft_nsev_inverse_XI')
     if not display_c_msg:  # suppress output from C-library
-        clib_errwarn_setprintf = fnft_clib.fnft_errwarn_setprintf
-        clib_errwarn_setprintf(ctypes_nullptr)
+        fnft_clib.suppress_c_messages()
     nsev_D = ctypes_uint(D)
     nsev_T = np.zeros(2, dtype=numpy_double)
     nsev_T[0] = T1
@@ -303,11 +341,5 @@ def nsev_inverse_xi_wrapper(D, T1, T2, M, dis=None, display_c_msg=True):
         tmpoptions = get_nsev_inverse_options()
         dis = tmpoptions.discretization
     nsev_dis = ctypes_int32(dis)
-    clib_nsev_inverse_xi_func.argtypes = [
-        type(nsev_D),  # D
-        numpy_double_arr_ptr,  # t
-        type(nsev_M),  # M
-        numpy_double_arr_ptr,  # xi
-        type(nsev_dis)]
     rv = clib_nsev_inverse_xi_func(nsev_D, nsev_T, nsev_M, nsev_Xi, nsev_dis)
     return rv, nsev_Xi
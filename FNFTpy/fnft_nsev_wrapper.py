@@ -27,14 +27,23 @@ Christoph Mahnke, Shrinivas Chimmalgi 2018-2023
 
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from .typesdef import *
-from .auxiliary import get_lib_path, check_return_code, get_winmode_param
+from .auxiliary import check_return_code, select_out_array, as_input_array, result_array_func, pad_pow2, add_metadata
+from .fnft_clib import get_fnft_clib
+from .results import NsevResult
 from .options_handling import get_nsev_options
+from .scattering import compose_segments, segment_bounds
+from .bound_states import bound_state_boxes, full_filter_box, in_box, merge_bound_states, \
+    run_with_discrete_spectrum_check
+
 
 
 def nsev(q, tvec, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None,
          bsl=None, bsg=None, niter=None, tol=None, Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, display_c_msg=True,
-         bb=None):
+         bb=None, parallel_segments=None, bound_state_boxes=None, coarse_decimation=None, workers=None,
+         skip_empty_disc=True, pad=False):
     """Calculate the Nonlinear Fourier Transform for the Nonlinear Schroedinger equation with vanishing boundaries.
 
     This function is intended to be 'convenient', which means it
@@ -136,9 +145,30 @@ def nsev(q, tvec, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None,
 
     * display_c_msg : whether or not to show messages raised by the C-library, default = True
 
+    * parallel_segments : number of segments for the segment-parallel calculation of the continuous
+                          spectrum, see nsev_parallel_segments. Default = None (one call of fnft_nsev)
+
+    * bound_state_boxes : number of boxes for the partitioned bound state search, see
+                          nsev_partitioned. Default = None (one call of fnft_nsev)
+
+    * coarse_decimation : decimation factor of the coarse stage of the coarse-to-fine bound state
+                          search, see nsev_coarse_to_fine. Default = None (one call of fnft_nsev)
+
+    * workers : number of threads for parallel_segments, bound_state_boxes or coarse_decimation,
+                default = None (see nsev_parallel_segments, nsev_partitioned, nsev_coarse_to_fine)
+
+    * skip_empty_disc : skip the bound state search if the signal provably has no bound states
+                        (kappa = -1 or L1 norm of q below pi/2, see discrete_spectrum_check).
+                        The result then holds bound_states_num = 0 and empty arrays, the decision
+                        is stored in res.metadata['discrete_spectrum']. Default = True
+
+    * pad : zero-pad q to the next power of two number of samples, extending the time window
+            (see pad_pow2). res.metadata['padding'] holds the numbers of zeros added on the
+            left and right. Default = False
+
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : NsevResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * bound_states_num : number of bound states found
@@ -151,16 +181,42 @@ def nsev(q, tvec, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None,
         * options : NsevOptionsStruct with the options used
 
     """
+    q = as_input_array(q)
     D = len(q)
     T1 = np.min(tvec)
     T2 = np.max(tvec)
+    padding = None
+    if pad:
+        (q,), T1, T2, padding = pad_pow2([q], T1, T2)
+        D = len(q)
     options = get_nsev_options(bsf=bsf, bsl=bsl, niter=niter, tol=tol, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis, ref=ref, bb=bb)
-    return nsev_wrapper(D, q, T1, T2, Xi1, Xi2,
-                        M, K, kappa, options, bsg=bsg, display_c_msg=display_c_msg)
+    modes = [(mode is not None) and (mode > 1) for mode in (parallel_segments, bound_state_boxes, coarse_decimation)]
+    if sum(modes) > 1:
+        raise ValueError("only one of parallel_segments, bound_state_boxes and coarse_decimation can be used")
+
+    def run(run_options):
+        if modes[2]:
+            return nsev_coarse_to_fine(D, q, T1, T2, Xi1, Xi2, M, K, kappa, run_options, coarse_decimation,
+                                       workers=workers, display_c_msg=display_c_msg)
+        if modes[1]:
+            return nsev_partitioned(D, q, T1, T2, Xi1, Xi2, M, K, kappa, run_options, bound_state_boxes, bsg=bsg,
+                                    workers=workers, display_c_msg=display_c_msg)
+        if modes[0]:
+            return nsev_parallel_segments(D, q, T1, T2, Xi1, Xi2, M, K, kappa, run_options, parallel_segments,
+                                          bsg=bsg, workers=workers, display_c_msg=display_c_msg)
+        return nsev_wrapper(D, q, T1, T2, Xi1, Xi2,
+                            M, K, kappa, run_options, bsg=bsg, display_c_msg=display_c_msg)
+
+    res = run_with_discrete_spectrum_check('nsev', run, options, (q,), T1, T2, kappa=kappa,
+                                           skip_empty_disc=skip_empty_disc)
+    if padding is not None:
+        add_metadata(res, 'padding', padding)
+    return res
 
 
 def nsev_wrapper(D, q, T1, T2, Xi1, Xi2,
-                 M, K, kappa, options, bsg=None, display_c_msg=True):
+                 M, K, kappa, options, bsg=None, display_c_msg=True,
+                 out_cont=None, out_bound_states=None, out_disc=None):
     """Calculate the Nonlinear Fourier Transform for the Nonlinear Schroedinger equation with vanishing boundaries.
 
     This function's interface mimics the behavior of the function 'fnft_nsev' of FNFT.
@@ -176,7 +232,7 @@ def nsev_wrapper(D, q, T1, T2, Xi1, Xi2,
     * M : number of values for the continuous spectrum to calculate
     * K : maximum number of bound states to calculate
     * kappa : +/- 1 for focussing/defocussing nonlinearity
-    * options : options for nsev as NsevOptionsStruct
+    * options : options for nsev as NsevOptionsStruct or FrozenOptions
 
     Optional Arguments:
 
@@ -186,9 +242,14 @@ def nsev_wrapper(D, q, T1, T2, Xi1, Xi2,
 
     * display_c_msg : whether to show messages raised by the C-library, default = True
 
+    * out_cont, out_bound_states, out_disc : caller-owned C-contiguous complex128 arrays FNFT
+           writes the continuous spectrum, the bound states and the discrete spectrum into
+           (e.g. rows of preallocated result matrices). The result fields are views of them.
+           See NsevPlan.execute for the required lengths. Default = None (allocate new arrays)
+
     Returns:
 
-    * rdict : dictionary holding the fields (depending on options)
+    * res : NsevResult holding the fields (depending on options, dict-compatible, see GenericResult)
 
         * return_value : return value from FNFT
         * bound_states_num : number of bound states found
@@ -201,132 +262,504 @@ def nsev_wrapper(D, q, T1, T2, Xi1, Xi2,
         * options : NsepOptionsStruct with the options used
 
     """
+    plan = NsevPlan(D, T1, T2, Xi1, Xi2, M, K, kappa, options, display_c_msg=display_c_msg)
+    return plan.execute(q, bsg=bsg, copy=False, out_cont=out_cont,
+                        out_bound_states=out_bound_states, out_disc=out_disc)
 
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_nsev_func = fnft_clib.fnft_nsev
-    clib_nsev_func.restype = ctypes_int
-    if not display_c_msg:  # suppress output from C-library
-        clib_errwarn_setprintf = fnft_clib.fnft_errwarn_setprintf
-        clib_errwarn_setprintf(ctypes_nullptr)
-    nsev_D = ctypes_uint(D)
-    nsev_M = ctypes_uint(M)
-    nsev_K = ctypes_uint(K)
-    nsev_T = np.zeros(2, dtype=numpy_double)
-    nsev_T[0] = T1
-    nsev_T[1] = T2
-    nsev_q = np.zeros(nsev_D.value, dtype=numpy_complex)
-    nsev_q[:] = q[:] + 0.0j
-    nsev_kappa = ctypes_int(kappa)
-    nsev_Xi = np.zeros(2, dtype=numpy_double)
-    nsev_Xi[0] = Xi1
-    nsev_Xi[1] = Xi2
-    #
-    # discrete spectrum -> reflection coefficient and / or residues
-    #
-    nsev_bound_states_type = numpy_complex_arr_ptr
-    nsev_disc_spec_type = numpy_complex_arr_ptr
-    if (options.discspec_type == fnft_nsev_dstype.NORMING_CONSTANTS) \
-            or (options.discspec_type == fnft_nsev_dstype.RESIDUES):
-        nsev_discspec = np.zeros(K, dtype=numpy_complex)
-        nsev_boundstates = np.zeros(K, dtype=numpy_complex)
-    elif options.discspec_type == fnft_nsev_dstype.BOTH:
-        nsev_discspec = np.zeros(2 * K, dtype=numpy_complex)
-        nsev_boundstates = np.zeros(K, dtype=numpy_complex)
-    else:
-        # 3 or any other option: skip discrete spec -> pass NULL
-        nsev_discspec = ctypes_nullptr
-        nsev_boundstates = ctypes_nullptr
-        nsev_bound_states_type = type(ctypes_nullptr)
-        nsev_disc_spec_type = type(ctypes_nullptr)
-    #
-    # for Newton refinement: use guesses, if provided.
-    #
-    if options.bound_state_localization == fnft_nsev_bsloc.NEWTON:
-        if bsg is not None:
-            bsg_copy = np.array(bsg, dtype=np.complex128)
-            if len(bsg_copy) > 0:
-                ii = -1
-                # copy as many of the guesses to bound state array
-                while (ii < K - 1) and (ii < len(bsg_copy) - 1) and (ii < len(nsev_boundstates) - 1):
-                    ii = ii + 1
-                    nsev_boundstates[ii] = bsg_copy[ii]
-    #
-    # continuous spectrum -> reflection coefficient and / or a,b
-    #
-    nsev_cont_spec_type = numpy_complex_arr_ptr
-
-    if options.contspec_type == fnft_nsev_cstype.REFLECTION_COEFFICIENT:
-        nsev_cont = np.zeros(M, dtype=numpy_complex)
-    elif options.contspec_type == fnft_nsev_cstype.AB:
-        nsev_cont = np.zeros(2 * M, dtype=numpy_complex)
-    elif options.contspec_type == fnft_nsev_cstype.BOTH:
-        nsev_cont = np.zeros(3 * M, dtype=numpy_complex)
-    else:
-        # 3 or any other option: skip continuous spectrum -> pass NULL
-        nsev_cont = ctypes_nullptr
-        nsev_cont_spec_type = type(ctypes_nullptr)
-
-    clib_nsev_func.argtypes = [
-        type(nsev_D),  # D
-        numpy_complex_arr_ptr,  # q
-        numpy_double_arr_ptr,  # t
-        type(nsev_M),  # M
-        nsev_cont_spec_type,  # cont
-        numpy_double_arr_ptr,  # xi
-        ctypes.POINTER(ctypes_uint),  # K_ptr
-        nsev_bound_states_type,  # boundstates
-        nsev_disc_spec_type,  # normconst res
-        type(nsev_kappa),  # kappa
-        ctypes.POINTER(NsevOptionsStruct)]  # options ptr
-
-    rv = clib_nsev_func(
-        nsev_D,
-        nsev_q,
-        nsev_T,
-        nsev_M,
-        nsev_cont,
-        nsev_Xi,
-        nsev_K,
-        nsev_boundstates,
-        nsev_discspec,
-        nsev_kappa,
-        ctypes.byref(options))
-    check_return_code(rv)
-    K_new = nsev_K.value
-    rdict = {
-        'return_value': rv,
-        'bound_states_num': K_new,
-        'bound_states': nsev_boundstates[0:K_new]}
-    #
-    # depending on options: output of discrete spectrum
-    #
-    if options.discspec_type == fnft_nsev_dstype.NORMING_CONSTANTS:
-        rdict['disc_norm'] = nsev_discspec[0:K_new]
-    elif options.discspec_type == fnft_nsev_dstype.RESIDUES:
-        rdict['disc_res'] = nsev_discspec[0:K_new]
-    elif options.discspec_type == fnft_nsev_dstype.BOTH:
-        rdict['disc_norm'] = nsev_discspec[0:K_new]
-        rdict['disc_res'] = nsev_discspec[K_new:2 * K_new]
+
+def nsev_parallel_segments(D, q, T1, T2, Xi1, Xi2, M, K, kappa, options, nsegments, bsg=None, workers=None,
+                           display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) with segment-parallel continuous spectrum.
+
+    The signal is split into nsegments adjacent segments. The scattering coefficients a and b of
+    each segment are calculated by fnft_nsev on the segment's own time window (in parallel
+    threads) and combined to those of the whole signal (see compose_segments). The discrete
+    spectrum can not be split, it is calculated by one additional call of fnft_nsev for the whole
+    signal, running concurrently with the segments.
+
+    For discretizations which approximate the transfer matrix as product of matrices of single
+    samples (e.g. BO and the splitting schemes), the result equals the one of a single call up to
+    rounding errors. Otherwise (e.g. Richardson extrapolation, subsampling) both results agree
+    within the accuracy of the discretization. The samples are assumed to be equally spaced.
+
+    Arguments:
+
+    * D, q, T1, T2, Xi1, Xi2, M, K, kappa, options : see nsev_wrapper
+    * nsegments : number of segments, each segment has at least two samples
+
+    Optional Arguments:
+
+    * bsg : bound state guesses, see nsev_wrapper, default = None
+    * workers : number of threads, default = None (min(nsegments + 1, os.cpu_count()))
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * res : NsevResult holding the fields (depending on options), see nsev_wrapper. The number
+            of segments is stored in res.metadata['parallel_segments'].
+
+    """
+    q = as_input_array(q, D, 'q')
+    options = NsevOptionsStruct.from_buffer_copy(options_struct(options))
+    cst = options.contspec_type
+    dst = options.discspec_type
+    if cst not in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+        # nothing to split
+        return nsev_wrapper(D, q, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=bsg, display_c_msg=display_c_msg)
+    bounds = segment_bounds(D, nsegments)
+    dt = (T2 - T1) / (D - 1)
+    segment_options = NsevOptionsStruct.from_buffer_copy(options)
+    segment_options.contspec_type = fnft_nsev_cstype.AB
+    segment_options.discspec_type = 3  # skip
+    disc_options = NsevOptionsStruct.from_buffer_copy(options)
+    disc_options.contspec_type = 3  # skip
+    if not display_c_msg:
+        get_fnft_clib().suppress_c_messages()
+
+    def segment(b):
+        return nsev_wrapper(b[1] - b[0], q[b[0]:b[1]], T1 + b[0] * dt, T1 + (b[1] - 1) * dt, Xi1, Xi2, M, 1,
+                            kappa, segment_options)
+
+    if workers is None:
+        workers = min(nsegments + 1, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        disc_future = None
+        if dst in (fnft_nsev_dstype.NORMING_CONSTANTS, fnft_nsev_dstype.RESIDUES, fnft_nsev_dstype.BOTH):
+            # the longest task, started first
+            disc_future = executor.submit(nsev_wrapper, D, q, T1, T2, Xi1, Xi2, M, K, kappa, disc_options, bsg=bsg)
+        segments = list(executor.map(segment, bounds))
+        if disc_future is None:
+            res = NsevResult(options)
+            res.return_value = 0
+            res.bound_states_num = 0
+            res.bound_states = np.zeros(0, dtype=numpy_complex)
+        else:
+            res = disc_future.result()
+            res.options = options
+    for r in segments:
+        if res.return_value == 0:
+            res.return_value = r.return_value
+    a, b = compose_segments([(r.cont_a, r.cont_b) for r in segments], kappa)
+    if cst in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.BOTH):
+        res.cont_ref = b / a
+    if cst in (fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+        res.cont_a = a
+        res.cont_b = b
+    res.metadata = {'parallel_segments': nsegments}
+    return res
+
+
+def nsev_partitioned(D, q, T1, T2, Xi1, Xi2, M, K, kappa, options, nboxes, bsg=None, workers=None, overlap=0.1,
+                     merge_tol=1e-6, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) with partitioned bound state search.
+
+    The search region (see below) is split into nboxes vertical strips, see bound_state_boxes.
+    The bound states of each strip are searched by one call of fnft_nsev with manual filtering
+    (bsf=3) on a slightly widened box and the continuous spectrum skipped (cst=3). The calls run on a thread pool.
+    The results are merged and bound states found near the edges by two boxes are counted once,
+    see merge_bound_states. The continuous spectrum is calculated once, by one additional call
+    with the discrete spectrum skipped.
+
+    The gain depends on the localization method: FNFT applies the bounding box before refining
+    the candidates (e.g. with SUBSAMPLE_AND_REFINE), so the refinement of many bound states is
+    split between the workers. With Newton localization (bsl=1), the guesses bsg are distributed
+    to the boxes they lie in, boxes without guesses are skipped. The search region follows the
+    filtering of options: the bounding box for MANUAL, the region of the FULL criteria for FULL
+    (see full_filter_box), the upper half plane for BASIC and the whole plane for NONE.
+
+    Arguments:
+
+    * D, q, T1, T2, Xi1, Xi2, M, K, kappa, options : see nsev_wrapper
+    * nboxes : number of boxes
+
+    Optional Arguments:
+
+    * bsg : bound state guesses, see nsev_wrapper, default = None
+    * workers : number of threads, default = None (min(nboxes + 1, os.cpu_count()))
+    * overlap : widening of the search boxes relative to the strip width, default = 0.1
+    * merge_tol : distance below which bound states of neighbouring boxes are merged, default = 1e-6
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * res : NsevResult holding the fields (depending on options), see nsev_wrapper. At most K
+            bound states are returned, ordered by real part. res.metadata holds the fields
+            bound_state_boxes (list of strips) and bound_states_per_box.
+
+    """
+    q = as_input_array(q, D, 'q')
+    options = NsevOptionsStruct.from_buffer_copy(options_struct(options))
+    cst = options.contspec_type
+    dst = options.discspec_type
+    if dst not in (fnft_nsev_dstype.NORMING_CONSTANTS, fnft_nsev_dstype.RESIDUES, fnft_nsev_dstype.BOTH):
+        # nothing to partition
+        return nsev_wrapper(D, q, T1, T2, Xi1, Xi2, M, K, kappa, options, bsg=bsg, display_c_msg=display_c_msg)
+    bsf = options.bound_state_filtering
+    if bsf == 3:  # manual
+        bb = list(options.bounding_box)
+    elif bsf == 2:  # full
+        bb = full_filter_box(q, T1, T2)
+    elif bsf == 1:  # basic
+        bb = None
     else:
-        # no discrete spectrum calculated
-        pass
-    #
-    # depending on options: output of continuous spectrum
-    #
-    if options.contspec_type == fnft_nsev_cstype.REFLECTION_COEFFICIENT:
-        # refl. coeff
-        rdict['cont_ref'] = nsev_cont[0:M]
-    elif options.contspec_type == fnft_nsev_cstype.AB:
-        # a and b
-        rdict['cont_a'] = nsev_cont[0:M]
-        rdict['cont_b'] = nsev_cont[M:2 * M]
-    elif options.contspec_type == fnft_nsev_cstype.BOTH:
-        # refl. coeff AND a and b
-        rdict['cont_ref'] = nsev_cont[0:M]
-        rdict['cont_a'] = nsev_cont[M:2 * M]
-        rdict['cont_b'] = nsev_cont[2 * M:3 * M]
+        bb = [-np.inf, np.inf, -np.inf, np.inf]
+    cores, searches = bound_state_boxes(q, T1, T2, nboxes, bb=bb, overlap=overlap)
+    newton = (options.bound_state_localization == fnft_nsev_bsloc.NEWTON) and (bsg is not None)
+    if newton:
+        bsg = np.asarray(bsg, dtype=numpy_complex)
+    tasks = []
+    for i, box in enumerate(searches):
+        box_options = NsevOptionsStruct.from_buffer_copy(options)
+        box_options.contspec_type = 3  # skip
+        box_options.bound_state_filtering = 3  # manual
+        for j in range(4):
+            box_options.bounding_box[j] = box[j]
+        guesses = bsg[in_box(bsg, box)] if newton else bsg
+        if newton and len(guesses) == 0:
+            continue
+        tasks.append((i, box_options, guesses))
+    cont_options = NsevOptionsStruct.from_buffer_copy(options)
+    cont_options.discspec_type = 3  # skip
+    if not display_c_msg:
+        get_fnft_clib().suppress_c_messages()
+
+    def search(task):
+        return nsev_wrapper(D, q, T1, T2, Xi1, Xi2, M, K, kappa, task[1], bsg=task[2])
+
+    if workers is None:
+        workers = min(len(tasks) + 1, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        cont_future = None
+        if cst in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+            cont_future = executor.submit(nsev_wrapper, D, q, T1, T2, Xi1, Xi2, M, K, kappa, cont_options)
+        parts = list(executor.map(search, tasks))
+        if cont_future is None:
+            res = NsevResult(options)
+            res.return_value = 0
+        else:
+            res = cont_future.result()
+            res.options = options
+    disc_fields = discspec_fields[dst]
+    for r in parts:
+        if res.return_value == 0:
+            res.return_value = r.return_value
+    merged, counts = merge_bound_states([{name: r[name] for name in ['bound_states'] + disc_fields} for r in parts],
+                                        [cores[task[0]] for task in tasks], merge_tol=merge_tol)
+    per_box = [0] * len(cores)
+    for task, n in zip(tasks, counts):
+        per_box[task[0]] = n
+    res.bound_states_num = min(K, len(merged['bound_states']))
+    for name in ['bound_states'] + disc_fields:
+        res[name] = merged[name][:K]
+    res.metadata = {'bound_state_boxes': cores, 'bound_states_per_box': per_box}
+    return res
+
+
+def nsev_coarse_to_fine(D, q, T1, T2, Xi1, Xi2, M, K, kappa, options, decimation, workers=None, merge_tol=1e-6,
+                        display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) with coarse-to-fine bound state search.
+
+    Stage 1 finds candidate bound states on the signal decimated by decimation (every decimation-th
+    sample), using FAST_EIGENVALUE localization and skipping the continuous spectrum. Stage 2
+    refines the candidates on the full signal with NEWTON localization (candidates passed as bsg),
+    the candidates being split into chunks refined on a thread pool. Candidates converging to the
+    same bound state are counted once. The continuous spectrum is calculated once, by one
+    additional call with the discrete spectrum skipped, concurrently to stage 2.
+
+    The decimated signal must still resolve the signal: bound states with |real part| beyond
+    pi / (2 * decimation * dt) are aliased and not found. Stage 1 uses the discretization, filtering
+    and bounding box of options. Powers of two for D and decimation keep the number of samples of
+    the coarse stage a power of two.
+
+    Arguments:
+
+    * D, q, T1, T2, Xi1, Xi2, M, K, kappa, options : see nsev_wrapper
+    * decimation : decimation factor of stage 1 (int >= 2)
+
+    Optional Arguments:
+
+    * workers : number of threads, default = None (os.cpu_count())
+    * merge_tol : distance below which refined bound states are considered equal, default = 1e-6
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * res : NsevResult holding the fields (depending on options), see nsev_wrapper. res.metadata
+            holds the fields decimation, candidates (number of bound states found in stage 1)
+            and refine_chunks.
+
+    """
+    q = as_input_array(q, D, 'q')
+    options = NsevOptionsStruct.from_buffer_copy(options_struct(options))
+    cst = options.contspec_type
+    dst = options.discspec_type
+    if dst not in discspec_fields:
+        # no bound states to search
+        return nsev_wrapper(D, q, T1, T2, Xi1, Xi2, M, K, kappa, options, display_c_msg=display_c_msg)
+    decimation = int(decimation)
+    if (decimation < 2) or (2 * decimation > D):
+        raise ValueError("decimation must be in [2, %d], got %d" % (D // 2, decimation))
+    if not display_c_msg:
+        get_fnft_clib().suppress_c_messages()
+    dt = (T2 - T1) / (D - 1)
+    q_coarse = np.ascontiguousarray(q[::decimation])
+    D_coarse = len(q_coarse)
+    coarse_options = NsevOptionsStruct.from_buffer_copy(options)
+    coarse_options.bound_state_localization = fnft_nsev_bsloc.FAST_EIGENVALUE
+    coarse_options.contspec_type = 3  # skip
+    coarse_options.discspec_type = fnft_nsev_dstype.NORMING_CONSTANTS
+    coarse = nsev_wrapper(D_coarse, q_coarse, T1, T1 + (D_coarse - 1) * decimation * dt, Xi1, Xi2, M, K, kappa,
+                          coarse_options)
+    candidates = coarse.bound_states
+    refine_options = NsevOptionsStruct.from_buffer_copy(options)
+    refine_options.bound_state_localization = fnft_nsev_bsloc.NEWTON
+    refine_options.contspec_type = 3  # skip
+    cont_options = NsevOptionsStruct.from_buffer_copy(options)
+    cont_options.discspec_type = 3  # skip
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = [c for c in np.array_split(candidates, max(1, min(workers, len(candidates)))) if len(c) > 0]
+
+    def refine(guesses):
+        return nsev_wrapper(D, q, T1, T2, Xi1, Xi2, M, len(guesses), kappa, refine_options, bsg=guesses)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks) + 1))) as executor:
+        cont_future = None
+        if cst in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+            cont_future = executor.submit(nsev_wrapper, D, q, T1, T2, Xi1, Xi2, M, K, kappa, cont_options)
+        parts = list(executor.map(refine, chunks))
+        if cont_future is None:
+            res = NsevResult(options)
+            res.return_value = coarse.return_value
+        else:
+            res = cont_future.result()
+            res.options = options
+            if res.return_value == 0:
+                res.return_value = coarse.return_value
+    fields = ['bound_states'] + discspec_fields[dst]
+    for r in parts:
+        if res.return_value == 0:
+            res.return_value = r.return_value
+    if len(parts) > 0:
+        everywhere = (-np.inf, np.inf, -np.inf, np.inf)
+        merged, _ = merge_bound_states([{name: r[name] for name in fields} for r in parts],
+                                       [everywhere] * len(parts), merge_tol=merge_tol)
     else:
-        # no cont. spectrum calculated
-        pass
-    rdict['options'] = repr(options)
-    return rdict
+        merged = {name: np.zeros(0, dtype=numpy_complex) for name in fields}
+    res.bound_states_num = min(K, len(merged['bound_states']))
+    for name in fields:
+        res[name] = merged[name][:K]
+    res.metadata = {'decimation': decimation, 'candidates': len(candidates), 'refine_chunks': len(chunks)}
+    return res
+
+
+class NsevPlan:
+    """Execution plan for repeated calls of fnft_nsev with fixed parameters.
+
+    All buffers passed to FNFT are allocated once when the plan is created, and the matching
+    prototype of fnft_nsev is picked. Each call of execute() only passes the samples to FNFT
+    ('plan once, execute many'). Samples given as C-contiguous complex128 array are not copied.
+
+    Arguments:
+
+    * D : number of sample points
+    * T1, T2 : time positions of the first and the last sample
+    * Xi1, Xi2 : min and max frequency for the continuous spectrum
+    * M : number of values for the continuous spectrum to calculate
+    * K : maximum number of bound states to calculate
+    * kappa : +/- 1 for focussing/defocussing nonlinearity
+    * options : options for nsev as NsevOptionsStruct or FrozenOptions. The plan keeps a copy.
+
+    Optional Arguments:
+
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, D, T1, T2, Xi1, Xi2, M, K, kappa, options, display_c_msg=True):
+        fnft_clib = get_fnft_clib()
+        if not display_c_msg:  # suppress output from C-library
+            fnft_clib.suppress_c_messages()
+        self.D = D
+        self.M = M
+        self.K = K
+        self.options = NsevOptionsStruct.from_buffer_copy(options_struct(options))
+        self._options_ref = ctypes.byref(self.options)
+        self._D = ctypes_uint(D)
+        self._M = ctypes_uint(M)
+        self._K = ctypes_uint(K)
+        self._kappa = ctypes_int(kappa)
+        self._T = np.array([T1, T2], dtype=numpy_double)
+        self._Xi = np.array([Xi1, Xi2], dtype=numpy_double)
+        #
+        # discrete spectrum -> reflection coefficient and / or residues
+        #
+        self._dst = options.discspec_type
+        if (self._dst == fnft_nsev_dstype.NORMING_CONSTANTS) \
+                or (self._dst == fnft_nsev_dstype.RESIDUES):
+            self._discspec = np.zeros(K, dtype=numpy_complex)
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+        elif self._dst == fnft_nsev_dstype.BOTH:
+            self._discspec = np.zeros(2 * K, dtype=numpy_complex)
+            self._boundstates = np.zeros(K, dtype=numpy_complex)
+        else:
+            # 3 or any other option: skip discrete spec -> pass NULL
+            self._discspec = ctypes_nullptr
+            self._boundstates = ctypes_nullptr
+        # for Newton refinement: guesses are passed in the bound states array
+        self._newton = (options.bound_state_localization == fnft_nsev_bsloc.NEWTON) \
+            and (self._boundstates is not ctypes_nullptr)
+        #
+        # continuous spectrum -> reflection coefficient and / or a,b
+        #
+        self._cst = options.contspec_type
+        if self._cst == fnft_nsev_cstype.REFLECTION_COEFFICIENT:
+            self._cont = np.zeros(M, dtype=numpy_complex)
+        elif self._cst == fnft_nsev_cstype.AB:
+            self._cont = np.zeros(2 * M, dtype=numpy_complex)
+        elif self._cst == fnft_nsev_cstype.BOTH:
+            self._cont = np.zeros(3 * M, dtype=numpy_complex)
+        else:
+            # 3 or any other option: skip continuous spectrum -> pass NULL
+            self._cont = ctypes_nullptr
+        # pick the prototype matching NULL / non-NULL spectrum pointers
+        self._func = fnft_clib.prototype('fnft_nsev',
+                                         self._cont is not ctypes_nullptr,
+                                         self._discspec is not ctypes_nullptr)
+
+    def set_time_window(self, T1, T2):
+        """Set the time positions of the first and the last sample for the following executions.
+
+        Arguments:
+
+        * T1, T2 : time positions of the first and the last sample
+        """
+        self._T[0] = T1
+        self._T[1] = T2
+
+    def set_xi_window(self, Xi1, Xi2):
+        """Set the min and max frequency of the continuous spectrum for the following executions.
+
+        The number of values M is fixed by the plan.
+
+        Arguments:
+
+        * Xi1, Xi2 : min and max frequency for the continuous spectrum
+        """
+        self._Xi[0] = Xi1
+        self._Xi[1] = Xi2
+
+    def execute(self, q, bsg=None, copy=True, out_cont=None, out_bound_states=None, out_disc=None, check=True):
+        """Calculate the Nonlinear Fourier Transform of q using the plan.
+
+        Arguments:
+
+        * q : numpy array (or buffer object, see as_input_array) holding the D samples of the field
+              to be analyzed
+
+        Optional Arguments:
+
+        * bsg : list or array of bound state guesses, only effective if
+                options.bound_state_localization == 1  (Newton bound state
+                location is activated). Default = None
+        * copy : if True (default), the returned arrays are copies. If False, they are views of the
+                 plan's buffers which are overwritten by the next call of execute.
+        * check : if True (default), give a warning if FNFT returns an error code
+        * out_cont : caller-owned array FNFT writes the continuous spectrum into, default = None.
+                     Must be a C-contiguous complex128 array of length M (cst=0), 2M (cst=1)
+                     or 3M (cst=2), e.g. a row of a preallocated result matrix.
+        * out_bound_states : caller-owned complex128 array of length K for the bound states,
+                             default = None
+        * out_disc : caller-owned complex128 array for the discrete spectrum, length K (dst=0, 1)
+                     or 2K (dst=2), default = None
+
+        If an output array is given, the corresponding result fields are views of it
+        (independent of copy).
+
+        Returns:
+
+        * res : NsevResult holding the fields (depending on options), see nsev_wrapper
+
+        """
+        cont = select_out_array(out_cont, self._cont, 'out_cont')
+        boundstates = select_out_array(out_bound_states, self._boundstates, 'out_bound_states')
+        discspec = select_out_array(out_disc, self._discspec, 'out_disc')
+        q = as_input_array(q, self.D, 'q')
+        if self._newton:
+            boundstates[:] = 0.0
+            if bsg is not None:
+                bsg_copy = np.array(bsg, dtype=np.complex128)
+                # copy as many of the guesses to bound state array
+                nguess = min(len(bsg_copy), self.K)
+                boundstates[0:nguess] = bsg_copy[0:nguess]
+        self._K.value = self.K
+        rv = self._func(
+            self._D,
+            q,
+            self._T,
+            self._M,
+            cont,
+            self._Xi,
+            self._K,
+            boundstates,
+            discspec,
+            self._kappa,
+            self._options_ref)
+        if check:
+            check_return_code(rv)
+        return self._collect(rv, self._K.value, cont, boundstates, discspec, copy)
+
+    def _collect(self, rv, K_new, cont, boundstates, discspec, copy):
+        """Arrange the content of the output buffers in the result object.
+
+        Only the plan's own buffers are copied (if copy is True, or if the results occupy only a
+        small part of the buffer, see result_array_func), caller-supplied buffers never.
+        """
+        M = self.M
+        if self._dst == fnft_nsev_dstype.BOTH:
+            disc_used = 2 * K_new
+        else:
+            disc_used = K_new
+        out_c = result_array_func(cont, None, copy, cont is self._cont)
+        out_d = result_array_func(discspec, disc_used, copy, discspec is self._discspec)
+        out_b = result_array_func(boundstates, K_new, copy, boundstates is self._boundstates)
+        if boundstates is ctypes_nullptr:
+            bound_states = np.zeros(0, dtype=numpy_complex)
+        else:
+            bound_states = out_b(boundstates[0:K_new])
+        res = NsevResult(self.options)
+        res.return_value = rv
+        res.bound_states_num = K_new
+        res.bound_states = bound_states
+        #
+        # depending on options: output of discrete spectrum
+        #
+        if self._dst == fnft_nsev_dstype.NORMING_CONSTANTS:
+            res.disc_norm = out_d(discspec[0:K_new])
+        elif self._dst == fnft_nsev_dstype.RESIDUES:
+            res.disc_res = out_d(discspec[0:K_new])
+        elif self._dst == fnft_nsev_dstype.BOTH:
+            res.disc_norm = out_d(discspec[0:K_new])
+            res.disc_res = out_d(discspec[K_new:2 * K_new])
+        else:
+            # no discrete spectrum calculated
+            pass
+        #
+        # depending on options: output of continuous spectrum
+        #
+        if self._cst == fnft_nsev_cstype.REFLECTION_COEFFICIENT:
+            # refl. coeff
+            res.cont_ref = out_c(cont[0:M])
+        elif self._cst == fnft_nsev_cstype.AB:
+            # a and b
+            res.cont_a = out_c(cont[0:M])
+            res.cont_b = out_c(cont[M:2 * M])
+        elif self._cst == fnft_nsev_cstype.BOTH:
+            # refl. coeff AND a and b
+            res.cont_ref = out_c(cont[0:M])
+            res.cont_a = out_c(cont[M:2 * M])
+            res.cont_b = out_c(cont[2 * M:3 * M])
+        else:
+            # no cont. spectrum calculated
+            pass
+        return res
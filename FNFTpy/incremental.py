@@ -0,0 +1,265 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+from .auxiliary import as_input_array
+from .fnft_nsev_wrapper import NsevPlan
+from .options_handling import get_nsev_options
+from .results import NsevResult
+from .scattering import compose_ab
+
+
+class IncrementalNsev:
+    """Continuous spectrum (NSE, vanishing boundaries) of a signal which is edited or extended repeatedly.
+
+    The signal is divided into segments of segment_len samples (the last segment holds the
+    remaining samples). The scattering coefficients a, b of every segment are calculated by
+    fnft_nsev (cst=1) on the segment's time window and stored in a segment tree, each inner node
+    holding the composition of its children (see compose_ab). Editing samples recalculates only
+    the affected segments and O(log P) compositions per xi, where P is the number of segments.
+    Appending samples recalculates the last segment and the new ones.
+
+    The result equals the one of nsev with the same options up to rounding errors, if the
+    discretization approximates the transfer matrix as product of matrices of single samples
+    (e.g. BO and the splitting schemes), see nsev_parallel_segments. The samples are assumed to
+    be equally spaced. The discrete spectrum is not calculated.
+
+    Arguments:
+
+    * q : numpy array holding the samples of the field (at least two samples)
+    * tvec : time vector, defines the time of the first sample and the sampling interval.
+             Appended samples continue this time grid.
+
+    Optional arguments:
+
+    * segment_len : number of samples per segment (at least 2), default = 4096
+    * Xi1, Xi2 : min and max frequency for the continuous spectrum, default = -2, 2
+    * M : number of values for the continuous spectrum, default = 128
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+    * options : NsevOptionsStruct or FrozenOptions, default = None (get_nsev_options()).
+                contspec_type selects the fields of the results.
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, q, tvec, segment_len=4096, Xi1=-2, Xi2=2, M=128, kappa=1, options=None,
+                 display_c_msg=True):
+        q = as_input_array(q)
+        D = len(q)
+        if D < 2:
+            raise ValueError("at least two samples are needed, got %d" % D)
+        if segment_len < 2:
+            raise ValueError("segment_len must be at least 2, got %d" % segment_len)
+        if options is None:
+            options = get_nsev_options()
+        self.options = NsevOptionsStruct.from_buffer_copy(options_struct(options))
+        self._segment_options = NsevOptionsStruct.from_buffer_copy(self.options)
+        self._segment_options.contspec_type = fnft_nsev_cstype.AB
+        self._segment_options.discspec_type = 3  # skip
+        self.segment_len = int(segment_len)
+        self.Xi1 = Xi1
+        self.Xi2 = Xi2
+        self.M = M
+        self.kappa = kappa
+        self.display_c_msg = display_c_msg
+        self.T1 = np.min(tvec)
+        self.dt = (np.max(tvec) - self.T1) / (D - 1)
+        self.D = D
+        self._q = np.zeros(max(D, 2 * self.segment_len), dtype=numpy_complex)
+        self._q[0:D] = q
+        self._plans = {}  # segment length -> NsevPlan
+        self._capacity = 0
+        self._resize(self.nsegments)
+        self._recomputed = self._compute_segments(range(self.nsegments))
+        self._build_inner_nodes()
+
+    @property
+    def nsegments(self):
+        """number of segments"""
+        n, r = divmod(self.D, self.segment_len)
+        return max(1, n) if r <= 1 else n + 1
+
+    @property
+    def samples(self):
+        """read-only view of the current samples"""
+        view = self._q[0:self.D].view()
+        view.flags.writeable = False
+        return view
+
+    def _segment_of(self, i):
+        return min(i // self.segment_len, self.nsegments - 1)
+
+    def _segment_bounds(self, k):
+        start = k * self.segment_len
+        stop = self.D if k == self.nsegments - 1 else start + self.segment_len
+        return start, stop
+
+    def _resize(self, nsegments):
+        """Allocate the tree for at least nsegments leaves, keeping the existing leaves."""
+        capacity = max(1, self._capacity)
+        while capacity < nsegments:
+            capacity *= 2
+        if capacity == self._capacity:
+            return False
+        a = np.ones((2 * capacity, self.M), dtype=numpy_complex)  # identity: a = 1, b = 0
+        b = np.zeros((2 * capacity, self.M), dtype=numpy_complex)
+        rv = np.zeros(capacity, dtype=int)
+        if self._capacity > 0:
+            a[capacity:capacity + self._capacity] = self._a[self._capacity:]
+            b[capacity:capacity + self._capacity] = self._b[self._capacity:]
+            rv[0:self._capacity] = self._rv
+        self._a, self._b, self._rv = a, b, rv
+        self._capacity = capacity
+        return True
+
+    def _compute_segments(self, segments):
+        """Calculate the scattering coefficients of the given segments and store them in the leaves."""
+        count = 0
+        for k in segments:
+            start, stop = self._segment_bounds(k)
+            D = stop - start
+            plan = self._plans.get(D)
+            if plan is None:
+                plan = NsevPlan(D, 0, 1, self.Xi1, self.Xi2, self.M, 1, self.kappa, self._segment_options,
+                                display_c_msg=self.display_c_msg)
+                self._plans[D] = plan
+            plan.set_time_window(self.T1 + start * self.dt, self.T1 + (stop - 1) * self.dt)
+            res = plan.execute(self._q[start:stop], copy=False, check=False)
+            self._a[self._capacity + k] = res.cont_a
+            self._b[self._capacity + k] = res.cont_b
+            self._rv[k] = res.return_value
+            count += 1
+        return count
+
+    def _compose_nodes(self, nodes):
+        """Recalculate the given inner nodes from their children (left child: earlier segments)."""
+        left = 2 * nodes
+        right = left + 1
+        self._a[nodes], self._b[nodes] = compose_ab((self._a[right], self._b[right]),
+                                                    (self._a[left], self._b[left]), self.kappa)
+
+    def _build_inner_nodes(self):
+        """Recalculate all inner nodes, level by level."""
+        level = self._capacity // 2
+        while level >= 1:
+            self._compose_nodes(np.arange(level, 2 * level))
+            level //= 2
+
+    def _update_ancestors(self, segments):
+        """Recalculate the inner nodes above the given segments."""
+        nodes = np.unique((np.asarray(list(segments), dtype=int) + self._capacity) // 2)
+        while len(nodes) > 0 and nodes[0] >= 1:
+            self._compose_nodes(nodes)
+            nodes = np.unique(nodes // 2)
+            nodes = nodes[nodes >= 1]
+
+    def update(self, index, new_samples):
+        """Replace samples and return the updated spectrum.
+
+        Arguments:
+
+        * index : slice (step 1) or index of the first sample to replace
+        * new_samples : array of the new samples
+
+        Returns:
+
+        * res : NsevResult, see result
+        """
+        new_samples = as_input_array(new_samples, name='new_samples')
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.D)
+            if step != 1:
+                raise ValueError("only slices with step 1 are supported")
+        else:
+            start = int(index)
+            stop = start + len(new_samples)
+        if (stop - start != len(new_samples)) or (start < 0) or (stop > self.D):
+            raise ValueError("%d new samples do not fit into [%d, %d) of %d samples" % (len(new_samples), start,
+                                                                                      stop, self.D))
+        if stop == start:
+            self._recomputed = 0
+            return self.result()
+        self._q[start:stop] = new_samples
+        segments = range(self._segment_of(start), self._segment_of(stop - 1) + 1)
+        self._recomputed = self._compute_segments(segments)
+        self._update_ancestors(segments)
+        return self.result()
+
+    def append(self, samples):
+        """Append samples to the signal and return the updated spectrum.
+
+        Arguments:
+
+        * samples : array of samples to append
+
+        Returns:
+
+        * res : NsevResult, see result
+        """
+        samples = as_input_array(samples, name='samples')
+        first = self.nsegments - 1  # the last segment changes
+        D = self.D + len(samples)
+        if D > len(self._q):
+            q = np.zeros(max(D, 2 * len(self._q)), dtype=numpy_complex)
+            q[0:self.D] = self._q[0:self.D]
+            self._q = q
+        self._q[self.D:D] = samples
+        self.D = D
+        segments = range(first, self.nsegments)
+        resized = self._resize(self.nsegments)
+        self._recomputed = self._compute_segments(segments)
+        if resized:
+            self._build_inner_nodes()
+        else:
+            self._update_ancestors(segments)
+        return self.result()
+
+    def result(self):
+        """Return the current continuous spectrum.
+
+        Returns:
+
+        * res : NsevResult holding the fields cont_ref, cont_a, cont_b (depending on
+                options.contspec_type) and return_value (first nonzero FNFT return value of the
+                segments, or 0). res.metadata holds the fields segments (number of segments) and
+                recomputed (number of segments calculated by the last call of update or append).
+        """
+        a = self._a[1].copy()
+        b = self._b[1].copy()
+        rv = self._rv[np.nonzero(self._rv)[0]]
+        res = NsevResult(self.options)
+        res.return_value = int(rv[0]) if len(rv) > 0 else 0
+        cst = self.options.contspec_type
+        if cst in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.BOTH):
+            res.cont_ref = b / a
+        if cst in (fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+            res.cont_a = a
+            res.cont_b = b
+        res.metadata = {'segments': self.nsegments, 'recomputed': self._recomputed}
+        return res
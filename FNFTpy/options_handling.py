@@ -27,7 +27,7 @@ Christoph Mahnke, Shrinivas Chimmalgi, 2018-2023
 
 """
 
-from .auxiliary import get_lib_path, get_winmode_param
+from .fnft_clib import get_fnft_clib
 from .typesdef import *
 
 
@@ -43,10 +43,7 @@ def fnft_kdvv_default_options_wrapper():
     * options : KdvvOptionsStruct with options for kdvv_wrapper
 
     """
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_func = fnft_clib.fnft_kdvv_default_opts
-    clib_func.restype = KdvvOptionsStruct
-    clib_func.argtpes = []
+    clib_func = get_fnft_clib().prototype('fnft_kdvv_default_opts')
     return clib_func()
 
 
@@ -72,6 +69,7 @@ def get_kdvv_options(dis=None, bsl=None, niter=None, dst=None, cst=None, nf=None
     """Get an KdvvOptionsStruct struct for use with kdvv_wrapper.
 
     When called without additional optional arguments, the default values from FNFT are used.
+    The defaults are fetched from FNFT once and cached (see FnftClib.default_options).
 
     Optional arguments:
 
@@ -172,7 +170,7 @@ def get_kdvv_options(dis=None, bsl=None, niter=None, dst=None, cst=None, nf=None
     * options : KdvvOptionsStruct
 
     """
-    options = fnft_kdvv_default_options_wrapper()
+    options = get_fnft_clib().default_options('fnft_kdvv_default_opts')
     if dis is not None:
         options.discretization = dis
     if bsl is not None:
@@ -205,10 +203,7 @@ def fnft_manakovv_default_options_wrapper():
 
     * options : ManakovvOptionsStruct with options for manakovv_wrapper.
     """
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_func = fnft_clib.fnft_manakovv_default_opts
-    clib_func.restype = ManakovvOptionsStruct
-    clib_func.argtpes = []
+    clib_func = get_fnft_clib().prototype('fnft_manakovv_default_opts')
     return clib_func()
 
 
@@ -234,6 +229,7 @@ def get_manakovv_options(dis=None, bsf=None, bsl=None, Dsub=None, niter=None, ds
     Get an ManakovvOptionsStruct struct for use with manakovv_wrapper.
 
     When called without additional optional arguments, the default values from FNFT are used.
+    The defaults are fetched from FNFT once and cached (see FnftClib.default_options).
 
     Optional arguments:
 
@@ -302,7 +298,7 @@ def get_manakovv_options(dis=None, bsf=None, bsl=None, Dsub=None, niter=None, ds
     * options: ManakovvOptionsStruct
 
     """
-    options = fnft_manakovv_default_options_wrapper()
+    options = get_fnft_clib().default_options('fnft_manakovv_default_opts')
     if dis is not None:
         options.discretization = dis
     if bsf is not None:
@@ -336,10 +332,7 @@ def fnft_nsep_default_options_wrapper():
     * options : NsepOptionsStruct for nsep_wrapper
 
     """
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_func = fnft_clib.fnft_nsep_default_opts
-    clib_func.restype = NsepOptionsStruct
-    clib_func.argtpes = []
+    clib_func = get_fnft_clib().prototype('fnft_nsep_default_opts')
     return clib_func()
 
 
@@ -364,6 +357,7 @@ def get_nsep_options(loc=None, filt=None, bb=None, maxev=None, dis=None, nf=None
     """Get a NsepOptionsStruct struct for use with nsep_wrapper.
 
     When called without additional optional argument, the default values from FNFT are used.
+    The defaults are fetched from FNFT once and cached (see FnftClib.default_options).
 
     Optional arguments:
 
@@ -431,7 +425,7 @@ def get_nsep_options(loc=None, filt=None, bb=None, maxev=None, dis=None, nf=None
 
     """
 
-    options = fnft_nsep_default_options_wrapper()
+    options = get_fnft_clib().default_options('fnft_nsep_default_opts')
     if loc is not None:
         options.localization = loc
     if filt is not None:
@@ -473,10 +467,7 @@ def fnft_nsev_default_options_wrapper():
 
     """
 
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_func = fnft_clib.fnft_nsev_default_opts
-    clib_func.restype = NsevOptionsStruct
-    clib_func.argtpes = []
+    clib_func = get_fnft_clib().prototype('fnft_nsev_default_opts')
     return clib_func()
 
 
@@ -501,6 +492,7 @@ def get_nsev_options(bsf=None, bsl=None, niter=None, tol=None, Dsub=None, dst=No
     """Get a NsevOptionsStruct for use with nsev_wrapper.
 
     When called without additional optional arguments, the default values from FNFT are used.
+    The defaults are fetched from FNFT once and cached (see FnftClib.default_options).
 
     Optional arguments:
 
@@ -584,7 +576,7 @@ def get_nsev_options(bsf=None, bsl=None, niter=None, tol=None, Dsub=None, dst=No
     * options : NsevOptionsStruct
 
     """
-    options = fnft_nsev_default_options_wrapper()
+    options = get_fnft_clib().default_options('fnft_nsev_default_opts')
     if bsf is not None:
         options.bound_state_filtering = bsf
     if bsl is not None:
@@ -622,10 +614,7 @@ def fnft_nsev_inverse_default_options_wrapper():
 
     """
 
-    fnft_clib = ctypes.CDLL(get_lib_path(), winmode=get_winmode_param())
-    clib_func = fnft_clib.fnft_nsev_inverse_default_opts
-    clib_func.restype = NsevInverseOptionsStruct
-    clib_func.argtpes = []
+    clib_func = get_fnft_clib().prototype('fnft_nsev_inverse_default_opts')
     return clib_func()
 
 
@@ -649,6 +638,7 @@ def get_nsev_inverse_options(dis=None, cst=None, csim=None, dst=None, max_iter=N
     """Get a NsevInverseOptionsStruct for use with nsev_inverse_wrapper.
 
     When called without additional optional arguments, the default values from FNFT are used.
+    The defaults are fetched from FNFT once and cached (see FnftClib.default_options).
 
     Optional arguments:
 
@@ -709,7 +699,7 @@ def get_nsev_inverse_options(dis=None, cst=None, csim=None, dst=None, max_iter=N
     * options : NsevInverseOptionsStruct
 
     """
-    options = fnft_nsev_inverse_default_options_wrapper()
+    options = get_fnft_clib().default_options('fnft_nsev_inverse_default_opts')
     if dis is not None:
         options.discretization = dis
     if cst is not None:
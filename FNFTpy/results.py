@@ -0,0 +1,348 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from collections.abc import MutableMapping
+import numpy as np
+
+
+class GenericResult(MutableMapping):
+    """Result of an FNFT call, with dictionary interface.
+
+    The result fields are stored in slots, so a result object is smaller and faster to create
+    than a dictionary. For compatibility with code written for the dictionaries returned by
+    earlier versions, all fields can be accessed like dictionary items, e.g. res['bound_states'].
+    Fields which are not calculated with the chosen options are not contained.
+
+    The options struct used is kept by reference. Its string representation is only created
+    when the item 'options' is accessed, the struct itself is available as attribute 'options'.
+    Arbitrary further items can be added, e.g. res['Xi'] = xivec. The attribute metadata
+    (None or dictionary) holds additional information about how the result was obtained.
+    """
+
+    __slots__ = ('options', 'metadata', '_extra')
+    _fields = ()
+
+    def __init__(self, options=None, metadata=None):
+        self.options = options
+        self.metadata = metadata
+        self._extra = None
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:  # field not calculated
+                raise KeyError(key) from None
+        if key == 'options':
+            if self.options is None:
+                raise KeyError(key)
+            return repr(self.options)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            setattr(self, key, value)
+        elif key == 'options':
+            self.options = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._fields:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif key == 'options':
+            if self.options is None:
+                raise KeyError(key)
+            self.options = None
+        else:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in self._fields:
+            if hasattr(self, key):
+                yield key
+        if self.options is not None:
+            yield 'options'
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return hasattr(self, key)
+        if key == 'options':
+            return self.options is not None
+        return (self._extra is not None) and (key in self._extra)
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join(repr(k) for k in self))
+
+
+class NsevResult(GenericResult):
+    """Result of nsev / nsev_wrapper, see GenericResult.
+
+    Fields (depending on options): return_value, bound_states_num, bound_states, disc_norm,
+    disc_res, cont_ref, cont_a, cont_b, options
+    """
+
+    __slots__ = ('return_value', 'bound_states_num', 'bound_states', 'disc_norm', 'disc_res',
+                 'cont_ref', 'cont_a', 'cont_b')
+    _fields = __slots__
+
+
+class KdvvResult(GenericResult):
+    """Result of kdvv / kdvv_wrapper, see GenericResult.
+
+    Fields (depending on options): return_value, bound_states_num, bound_states, disc_norm,
+    disc_res, cont_ref, cont (same as cont_ref), cont_a, cont_b, options
+    """
+
+    __slots__ = ('return_value', 'bound_states_num', 'bound_states', 'disc_norm', 'disc_res',
+                 'cont_ref', 'cont', 'cont_a', 'cont_b')
+    _fields = __slots__
+
+
+class ManakovvResult(GenericResult):
+    """Result of manakovv / manakovv_wrapper, see GenericResult.
+
+    Fields (depending on options): return_value, bound_states_num, bound_states, disc_norm,
+    disc_res, cont_ref1, cont_ref2, cont_a, cont_b1, cont_b2, options
+    """
+
+    __slots__ = ('return_value', 'bound_states_num', 'bound_states', 'disc_norm', 'disc_res',
+                 'cont_ref1', 'cont_ref2', 'cont_a', 'cont_b1', 'cont_b2')
+    _fields = __slots__
+
+
+class NsepResult(GenericResult):
+    """Result of nsep / nsep_wrapper, see GenericResult.
+
+    Fields: return_value, K, main, M, aux, options
+    """
+
+    __slots__ = ('return_value', 'K', 'main', 'M', 'aux')
+    _fields = __slots__
+
+
+class NsevInverseResult(GenericResult):
+    """Result of nsev_inverse / nsev_inverse_wrapper, see GenericResult.
+
+    Fields: return_value, q, options
+    """
+
+    __slots__ = ('return_value', 'q')
+    _fields = __slots__
+
+
+class SpectrumBatch:
+    """Nonlinear spectra of a batch of signals in columnar form.
+
+    The discrete spectra of all signals (bound states, norming constants, residues) are stored in
+    flat arrays. The entries of signal i are array[offsets[i]:offsets[i+1]]. Continuous spectra
+    are stored as dense (N, M) arrays, one row per signal. Selection, filtering and concatenation
+    work on these arrays directly, without creating objects per signal.
+
+    For compatibility with the result dictionaries, all fields can be accessed as items, e.g.
+    batch['bound_states'] or batch['cont_ref']. len(batch) is the number of signals.
+
+    Arguments:
+
+    * return_value : (N,) array of FNFT return values
+    * offsets : (N + 1,) array of offsets into the flat discrete spectrum arrays
+    * discrete : dictionary of flat arrays, e.g. {'bound_states': ..., 'disc_norm': ...}
+    * continuous : dictionary of (N, M) arrays, e.g. {'cont_ref': ...}
+
+    Optional arguments:
+
+    * options : options struct used to calculate the spectra, default = None
+    * row_ids : (N,) array identifying the signals, default = 0 ... N-1. Kept by select and
+                concatenate, so the rows of derived batches can be related to the input signals.
+    * metadata : None or dictionary with additional information, default = None
+
+    """
+
+    __slots__ = ('return_value', 'offsets', 'discrete', 'continuous', 'options', 'row_ids', 'metadata')
+
+    def __init__(self, return_value, offsets, discrete, continuous, options=None, row_ids=None,
+                 metadata=None):
+        self.return_value = np.asarray(return_value)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.discrete = discrete
+        self.continuous = continuous
+        self.options = options
+        if row_ids is None:
+            row_ids = np.arange(len(self.return_value))
+        self.row_ids = np.asarray(row_ids)
+        self.metadata = metadata
+
+    @property
+    def bound_states_num(self):
+        """(N,) array holding the number of bound states of each signal"""
+        return np.diff(self.offsets)
+
+    @property
+    def bound_states(self):
+        """flat array of the bound states of all signals"""
+        return self.discrete['bound_states']
+
+    def __len__(self):
+        return len(self.return_value)
+
+    def keys(self):
+        """return the names of all fields, as for the result dictionaries"""
+        keys = ['return_value', 'bound_states_num', 'offsets', 'row_ids']
+        keys += list(self.discrete.keys()) + list(self.continuous.keys())
+        if self.options is not None:
+            keys.append('options')
+        return keys
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __getitem__(self, key):
+        if key in self.discrete:
+            return self.discrete[key]
+        if key in self.continuous:
+            return self.continuous[key]
+        if key in ('return_value', 'bound_states_num', 'offsets', 'row_ids'):
+            return getattr(self, key)
+        if key == 'options' and self.options is not None:
+            return repr(self.options)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """return the field key, or default if it is not contained"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return "SpectrumBatch(%d signals, %d bound states, fields: %s)" % (
+            len(self), self.offsets[-1], ", ".join(self.keys()))
+
+    def entry_rows(self):
+        """return the (row) index of the signal for each entry of the flat discrete spectrum arrays"""
+        return np.repeat(np.arange(len(self)), self.bound_states_num)
+
+    def row(self, i):
+        """return the spectrum of signal i as dictionary of views"""
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        rdict = {'return_value': self.return_value[i],
+                 'bound_states_num': int(stop - start),
+                 'row_id': self.row_ids[i]}
+        for key, arr in self.discrete.items():
+            rdict[key] = arr[start:stop]
+        for key, arr in self.continuous.items():
+            rdict[key] = arr[i]
+        return rdict
+
+    def select(self, rows):
+        """return a new SpectrumBatch holding only the selected signals.
+
+        Arguments:
+
+        * rows : index array, boolean mask of length N or slice selecting the signals
+
+        Returns:
+
+        * batch : SpectrumBatch
+        """
+        rows = np.arange(len(self))[rows]
+        counts = self.bound_states_num[rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        # index into the flat arrays: start of the selected row + position within the row
+        entries = np.repeat(self.offsets[rows] - offsets[:-1], counts) + np.arange(offsets[-1])
+        return SpectrumBatch(self.return_value[rows], offsets,
+                             {key: arr[entries] for key, arr in self.discrete.items()},
+                             {key: arr[rows] for key, arr in self.continuous.items()},
+                             options=self.options, row_ids=self.row_ids[rows], metadata=self.metadata)
+
+    def filter_bound_states(self, mask):
+        """return a new SpectrumBatch holding only the entries of the discrete spectrum where mask is True.
+
+        Example: batch.filter_bound_states(batch.bound_states.imag > 0.5)
+
+        Arguments:
+
+        * mask : boolean array of the length of the flat discrete spectrum arrays
+
+        Returns:
+
+        * batch : SpectrumBatch with all signals, the continuous spectra are shared (not copied)
+        """
+        mask = np.asarray(mask, dtype=bool)
+        counts = np.bincount(self.entry_rows()[mask], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return SpectrumBatch(self.return_value, offsets,
+                             {key: arr[mask] for key, arr in self.discrete.items()},
+                             self.continuous, options=self.options, row_ids=self.row_ids,
+                             metadata=self.metadata)
+
+    @staticmethod
+    def concatenate(batches):
+        """concatenate SpectrumBatches holding the same fields.
+
+        Arguments:
+
+        * batches : list of SpectrumBatch
+
+        Returns:
+
+        * batch : SpectrumBatch holding all signals in the given order. options and metadata are
+                  taken from the first batch.
+        """
+        first = batches[0]
+        for b in batches[1:]:
+            if (b.discrete.keys() != first.discrete.keys()) or (b.continuous.keys() != first.continuous.keys()):
+                raise ValueError("SpectrumBatches with different fields can not be concatenated")
+        offsets = [np.zeros(1, dtype=np.int64)]
+        start = 0
+        for b in batches:
+            offsets.append(b.offsets[1:] + start)
+            start += b.offsets[-1]
+        return SpectrumBatch(np.concatenate([b.return_value for b in batches]),
+                             np.concatenate(offsets),
+                             {key: np.concatenate([b.discrete[key] for b in batches]) for key in first.discrete},
+                             {key: np.concatenate([b.continuous[key] for b in batches]) for key in first.continuous},
+                             options=first.options, row_ids=np.concatenate([b.row_ids for b in batches]),
+                             metadata=first.metadata)
@@ -0,0 +1,107 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+
+
+def compose_ab(ab2, ab1, kappa=1):
+    """Return the scattering coefficients of two concatenated signal segments.
+
+    For real xi, the scattering matrix of a segment of the Zakharov-Shabat problem (NSE, vanishing
+    boundaries) is S = [[a, -kappa * conj(b)], [b, conj(a)]], where a and b are the scattering
+    coefficients of the segment computed on its own (absolute) time window, e.g. by nsev with
+    cst=1. The scattering matrix of the concatenated segments is S2 @ S1, it has the same form:
+
+        a = a2 * a1 - kappa * conj(b2) * b1
+        b = b2 * a1 + conj(a2) * b1
+
+    Arguments:
+
+    * ab2 : tuple (a, b) of arrays, scattering coefficients of the later segment
+    * ab1 : tuple (a, b) of arrays, scattering coefficients of the earlier segment
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+
+    Returns:
+
+    * ab : tuple (a, b) of arrays, scattering coefficients of the concatenated segments
+
+    """
+    a2, b2 = ab2
+    a1, b1 = ab1
+    return a2 * a1 - kappa * np.conj(b2) * b1, b2 * a1 + np.conj(a2) * b1
+
+
+def compose_segments(segments, kappa=1):
+    """Return the scattering coefficients of a sequence of adjacent signal segments.
+
+    The segments are combined pairwise (balanced tree), which keeps the rounding errors small.
+
+    Arguments:
+
+    * segments : list of tuples (a, b) in time order, see compose_ab
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+
+    Returns:
+
+    * ab : tuple (a, b) of arrays, scattering coefficients of the whole signal
+
+    """
+    if len(segments) == 0:
+        raise ValueError("at least one segment is needed")
+    segments = list(segments)
+    while len(segments) > 1:
+        combined = [compose_ab(segments[i + 1], segments[i], kappa) for i in range(0, len(segments) - 1, 2)]
+        if len(segments) % 2 == 1:
+            combined.append(segments[-1])
+        segments = combined
+    return segments[0]
+
+
+def segment_bounds(D, nsegments):
+    """Split the sample indices 0 ... D-1 into nsegments adjacent segments of almost equal length.
+
+    Arguments:
+
+    * D : number of samples
+    * nsegments : number of segments, each segment has at least two samples
+
+    Returns:
+
+    * bounds : list of (start, stop) index pairs
+    """
+    if (nsegments < 1) or (2 * nsegments > D):
+        raise ValueError("nsegments must be in [1, %d], got %d" % (D // 2, nsegments))
+    edges = np.linspace(0, D, nsegments + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
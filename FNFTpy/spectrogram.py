@@ -0,0 +1,139 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from numpy.lib.stride_tricks import sliding_window_view
+from .typesdef import *
+from .auxiliary import as_input_array
+from .fnft_nsev_wrapper import NsevPlan
+from .options_handling import get_nsev_options
+from .batch import run_backend
+
+# tapers available by name, see nsev_spectrogram
+_tapers = {'hann': np.hanning, 'hamming': np.hamming, 'blackman': np.blackman, 'bartlett': np.bartlett}
+
+
+def get_taper(taper, window):
+    """Return the taper applied to each window of a spectrogram.
+
+    Arguments:
+
+    * taper : None, name of a numpy window function ('hann', 'hamming', 'blackman', 'bartlett')
+              or array of window samples
+    * window : number of samples per window
+
+    Returns:
+
+    * taper : None or real numpy array of length window
+    """
+    if taper is None:
+        return None
+    if isinstance(taper, str):
+        if taper not in _tapers:
+            raise ValueError("unknown taper %r, use one of %s or an array" % (taper, ", ".join(_tapers)))
+        return _tapers[taper](window)
+    taper = np.asarray(taper)
+    if taper.shape != (window,):
+        raise ValueError("taper: expected shape (%d,), got %s" % (window, taper.shape))
+    return taper
+
+
+def nsev_spectrogram(q, tvec, window, hop, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None, bsl=None, bsg=None,
+                     niter=None, tol=None, Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, bb=None,
+                     taper=None, absolute_time=False, workers=None, backend='thread', mp_context=None,
+                     display_c_msg=True):
+    """Calculate the short-time Nonlinear Fourier Transform (NSE, vanishing boundaries) of a signal.
+
+    The signal is cut into windows of window samples, starting every hop samples. Each window is
+    (optionally) multiplied with a taper and transformed as by nsev. The windows are distributed on
+    workers as the rows of nsev_batch. Note that the NFT is nonlinear: a taper changes the
+    spectrum of a window, e.g. it can remove bound states of pulses at the window edges.
+
+    Arguments:
+
+    * q : numpy array holding the samples of the field to be analyzed
+    * tvec : time vector
+    * window : number of samples per window
+    * hop : number of samples between the starts of consecutive windows
+
+    Optional arguments:
+
+    * Xi1, Xi2, M, K, kappa, bsf, bsl, bsg, niter, tol, Dsub, dst, cst, nf, dis, ref, bb : see nsev.
+      bsg is used for every window.
+    * taper : None, name of a numpy window function ('hann', 'hamming', 'blackman', 'bartlett')
+              or array of window samples, default = None (no taper)
+    * absolute_time : if True, each window is transformed on its time positions in tvec. Otherwise
+                      all windows use the same time axis, centered around 0 (the continuous spectra
+                      of identical windows are equal, independent of their position), default = False
+    * workers, backend, mp_context : see nsev_batch. With backend='thread', untapered windows are
+      views of q (no copy of the overlapping windows); backend='process' copies all windows
+      into shared memory.
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * batch : SpectrumBatch with one row per window (see nsev_batch), e.g. batch['cont_ref'] is the
+              (n_windows, M) spectrogram. batch.metadata holds the fields
+
+        * starts : index of the first sample of each window
+        * times : time position of the center of each window
+        * xi : the M frequencies of the continuous spectrum
+
+    """
+    q = as_input_array(q, name='q')
+    tvec = np.asarray(tvec, dtype=numpy_double)
+    D = len(q)
+    if tvec.shape != (D,):
+        raise ValueError("tvec: expected %d samples, got shape %s" % (D, tvec.shape))
+    if (window < 2) or (window > D) or (hop < 1):
+        raise ValueError("window must be in [2, %d] and hop positive, got %d and %d" % (D, window, hop))
+    taper = get_taper(taper, window)
+    # each row of the strided view is a C-contiguous complex128 view of q, so the windows are
+    # passed to FNFT without copying them; only a taper needs new memory
+    frames = sliding_window_view(q, window)[::hop]
+    starts = np.arange(frames.shape[0]) * hop
+    if taper is not None:
+        frames = frames * taper
+    dt = (tvec[-1] - tvec[0]) / (D - 1)
+    T1 = -0.5 * (window - 1) * dt
+    T2 = -T1
+    time_windows = None
+    if absolute_time:
+        time_windows = np.stack([tvec[starts], tvec[starts + window - 1]], axis=1)
+    options = get_nsev_options(bsf=bsf, bsl=bsl, niter=niter, tol=tol, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis,
+                               ref=ref, bb=bb)
+    cont_fields = nsev_contspec_fields.get(options.contspec_type, [])
+    disc_fields = discspec_fields.get(options.discspec_type, [])
+    plan_args = (window, T1, T2, Xi1, Xi2, M, K, kappa, options)
+    batch = run_backend(backend, NsevPlan, plan_args, [frames], len(cont_fields), M, K, cont_fields, disc_fields,
+                        bsg, workers, mp_context, display_c_msg, time_windows=time_windows)
+    batch.options = options
+    batch.metadata = {'starts': starts,
+                      'times': 0.5 * (tvec[starts] + tvec[starts + window - 1]),
+                      'xi': np.linspace(Xi1, Xi2, M)}
+    return batch
@@ -0,0 +1,148 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+from .auxiliary import as_input_array
+from .fnft_nsev_wrapper import NsevPlan
+from .options_handling import get_nsev_options
+
+
+def stream_frames(source, frame_len, hop):
+    """Assemble consecutive frames from a stream of sample chunks.
+
+    The samples are collected in a ring buffer of frame_len samples. Whenever a frame is complete,
+    it is copied into a contiguous frame array and yielded. Both arrays are allocated once, so the
+    memory used does not depend on the length of the stream. The source is read lazily: the next
+    chunk is only requested when the consumer asks for the next frame.
+
+    Frames start every hop samples, they overlap if hop < frame_len. If hop > frame_len, the samples
+    between the frames are skipped. Samples at the end of the stream which do not complete a frame
+    are dropped.
+
+    Arguments:
+
+    * source : iterable or iterator of sample chunks (one-dimensional arrays, buffer objects or sequences)
+    * frame_len : number of samples per frame
+    * hop : number of samples between the starts of consecutive frames
+
+    Yields:
+
+    * start : index of the first sample of the frame in the stream
+    * frame : numpy array of frame_len samples. The same array is reused for all frames, it is
+              overwritten when the next frame is requested.
+
+    """
+    frame_len = int(frame_len)
+    hop = int(hop)
+    if (frame_len < 1) or (hop < 1):
+        raise ValueError("frame_len and hop must be positive, got %d and %d" % (frame_len, hop))
+    ring = np.zeros(frame_len, dtype=numpy_complex)
+    frame = np.zeros(frame_len, dtype=numpy_complex)
+    head = 0  # position of the oldest sample in the ring buffer
+    filled = 0  # number of samples in the ring buffer
+    skip = 0  # number of samples to skip before the next frame (hop > frame_len)
+    start = 0
+    for chunk in source:
+        x = as_input_array(chunk, name='chunk')
+        i = 0
+        while i < len(x):
+            if skip > 0:
+                n = min(skip, len(x) - i)
+                skip -= n
+                i += n
+                continue
+            n = min(frame_len - filled, len(x) - i)
+            pos = (head + filled) % frame_len
+            first = min(n, frame_len - pos)
+            ring[pos:pos + first] = x[i:i + first]
+            ring[0:n - first] = x[i + first:i + n]
+            filled += n
+            i += n
+            if filled == frame_len:
+                frame[0:frame_len - head] = ring[head:]
+                frame[frame_len - head:] = ring[0:head]
+                yield start, frame
+                drop = min(hop, frame_len)
+                head = (head + drop) % frame_len
+                filled -= drop
+                skip = hop - drop
+                start += hop
+
+
+def nsev_stream(source, frame_len, hop, dt, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, bsf=None, bsl=None, bsg=None,
+                niter=None, tol=None, Dsub=None, dst=None, cst=None, nf=None, dis=None, ref=None, bb=None, t0=None,
+                absolute_time=False, copy=True, display_c_msg=True):
+    """Calculate the Nonlinear Fourier Transform (NSE, vanishing boundaries) of consecutive frames of a stream.
+
+    The frames are assembled by stream_frames and transformed with a single NsevPlan, which is reused
+    for all frames. The results are generated lazily, so the source is only read as fast as the
+    results are consumed, and the memory used stays constant for streams of any length (with copy=False).
+
+    Arguments:
+
+    * source : iterable or iterator of sample chunks (one-dimensional arrays, buffer objects or sequences)
+    * frame_len : number of samples per frame (D of the transform)
+    * hop : number of samples between the starts of consecutive frames
+    * dt : sampling interval
+
+    Optional arguments:
+
+    * Xi1, Xi2, M, K, kappa, bsf, bsl, bsg, niter, tol, Dsub, dst, cst, nf, dis, ref, bb : see nsev.
+      bsg is used for every frame.
+    * t0 : time position of the first sample of each frame, default = None (frames centered around 0).
+           With absolute_time=True: time position of the first sample of the stream.
+    * absolute_time : if True, the time window of frame k is shifted by k * hop * dt, default = False
+    * copy : if False, the result arrays are views of the plan's buffers and are overwritten by the
+             next frame, default = True
+    * display_c_msg : whether or not to show messages raised by the C-library, default = True
+
+    Yields:
+
+    * res : NsevResult of each frame, see nsev. res.metadata holds the fields
+
+        * frame : index of the frame
+        * start : index of the first sample of the frame in the stream
+        * T1, T2 : time positions of the first and the last sample of the frame
+
+    """
+    if t0 is None:
+        t0 = 0.0 if absolute_time else -0.5 * (frame_len - 1) * dt
+    T1 = t0
+    T2 = t0 + (frame_len - 1) * dt
+    options = get_nsev_options(bsf=bsf, bsl=bsl, niter=niter, tol=tol, Dsub=Dsub, dst=dst, cst=cst, nf=nf, dis=dis,
+                               ref=ref, bb=bb)
+    plan = NsevPlan(frame_len, T1, T2, Xi1, Xi2, M, K, kappa, options, display_c_msg=display_c_msg)
+    for k, (start, frame) in enumerate(stream_frames(source, frame_len, hop)):
+        if absolute_time:
+            T1 = t0 + start * dt
+            T2 = T1 + (frame_len - 1) * dt
+            plan.set_time_window(T1, T2)
+        res = plan.execute(frame, bsg=bsg, copy=copy)
+        res.metadata = {'frame': k, 'start': start, 'T1': T1, 'T2': T2}
+        yield res
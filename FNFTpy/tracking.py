@@ -0,0 +1,274 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+from .auxiliary import as_input_array
+from .fnft_clib import get_fnft_clib
+from .fnft_nsev_wrapper import NsevPlan
+from .fnft_kdvv_wrapper import KdvvPlan
+from .fnft_manakovv_wrapper import ManakovvPlan
+from .options_handling import get_nsev_options, get_kdvv_options, get_manakovv_options
+
+# for each transform: options function, number of input signals, value of bound_state_localization for
+# Newton and for the default full search, function creating a plan
+_tracker_specs = {
+    'nsev': (get_nsev_options, 1, fnft_nsev_bsloc.NEWTON, fnft_nsev_bsloc.SUBSAMPLE_AND_REFINE,
+             lambda D, T1, T2, Xi1, Xi2, M, K, kappa, options: NsevPlan(D, T1, T2, Xi1, Xi2, M, K, kappa, options)),
+    'kdvv': (get_kdvv_options, 1, fnft_kdvv_bsloc.NEWTON, fnft_kdvv_bsloc.GRIDSEARCH_AND_REFINE,
+             lambda D, T1, T2, Xi1, Xi2, M, K, kappa, options: KdvvPlan(D, T1, T2, K, M, Xi1, Xi2, options)),
+    'manakovv': (get_manakovv_options, 2, fnft_manakovv_bsloc.NEWTON, fnft_manakovv_bsloc.SUBSAMPLE_AND_REFINE,
+                 lambda D, T1, T2, Xi1, Xi2, M, K, kappa, options: ManakovvPlan(D, T1, T2, Xi1, Xi2, M, K, kappa,
+                                                                                options))}
+
+
+def match_bound_states(previous, current, match_tol=None):
+    """Match two sets of bound states by distance (greedy, closest pairs first).
+
+    Arguments:
+
+    * previous : array of bound states of the previous step
+    * current : array of bound states of the current step
+
+    Optional arguments:
+
+    * match_tol : pairs further apart are not matched, default = None (no limit)
+
+    Returns:
+
+    * index : integer array of len(current), index of the matched previous bound state or -1
+    """
+    previous = np.asarray(previous)
+    current = np.asarray(current)
+    index = -np.ones(len(current), dtype=int)
+    if len(previous) == 0 or len(current) == 0:
+        return index
+    dist = np.abs(current[:, np.newaxis] - previous[np.newaxis, :])
+    used_prev = np.zeros(len(previous), dtype=bool)
+    for flat in np.argsort(dist, axis=None):
+        i, j = np.unravel_index(flat, dist.shape)
+        if (match_tol is not None) and (dist[i, j] > match_tol):
+            break
+        if index[i] < 0 and not used_prev[j]:
+            index[i] = j
+            used_prev[j] = True
+    return index
+
+
+class BoundStateTracker:
+    """Warm-started bound state localization for sequences of slowly varying signals.
+
+    Each call of step() uses the bound states of the previous step (linearly extrapolated along
+    their trajectories, if extrapolate is set) as guesses for Newton localization. The full
+    search (the localization of options, or SUBSAMPLE_AND_REFINE / GRIDSEARCH_AND_REFINE if
+    options requests Newton) is only used
+
+    * for the first step and after steps without bound states,
+    * if the Newton step fails: FNFT error, a different number of bound states than guesses,
+      two guesses converging to the same bound state, or a bound state moving further than
+      max_shift,
+    * every full_search_every steps, to detect new bound states (Newton can not find them).
+
+    The bound states keep their identities across the steps: each one gets a track id, matched
+    by distance to the previous step (see match_bound_states). The trajectories are available
+    as attribute trajectories.
+
+    All signals must have the same number of samples and time window (as for the plans).
+
+    Arguments:
+
+    * transform : 'nsev', 'kdvv' or 'manakovv'
+    * tvec : time vector
+
+    Optional arguments:
+
+    * Xi1, Xi2, M : frequency grid of the continuous spectrum, default = -2, 2, 128
+    * K : maximum number of bound states, default = 128
+    * kappa : +/- 1 for focussing/defocussing nonlinearity (nsev, manakovv), default = 1
+    * options : options for the transform (options struct or FrozenOptions), default = None (default options with the continuous
+                spectrum skipped)
+    * match_tol : maximum distance of a bound state to its predecessor on the same track,
+                  default = None (no limit)
+    * max_shift : maximum distance of a Newton result from its guess, larger shifts trigger a full
+                  search, default = None (no limit)
+    * full_search_every : number of steps after which a full search is done in any case,
+                          default = None (only on failure)
+    * extrapolate : predict the guesses linearly from the last two steps of each track, default = True
+    * merge_tol : Newton results closer than this are considered as converged to the same bound
+                  state, default = 1e-8
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    """
+
+    def __init__(self, transform, tvec, Xi1=-2, Xi2=2, M=128, K=128, kappa=1, options=None, match_tol=None,
+                 max_shift=None, full_search_every=None, extrapolate=True, merge_tol=1e-8, display_c_msg=True):
+        if transform not in _tracker_specs:
+            raise ValueError("transform must be one of %s, got %r" % (list(_tracker_specs), transform))
+        get_options, self._nsignals, newton, full, make_plan = _tracker_specs[transform]
+        if options is None:
+            options = get_options(cst=3)
+        options = options_struct(options)
+        if options.discspec_type not in (0, 1, 2):
+            raise ValueError("BoundStateTracker needs the discrete spectrum, got discspec_type %d"
+                             % options.discspec_type)
+        if not display_c_msg:
+            get_fnft_clib().suppress_c_messages()
+        self.transform = transform
+        self.match_tol = match_tol
+        self.max_shift = max_shift
+        self.full_search_every = full_search_every
+        self.extrapolate = extrapolate
+        self.merge_tol = merge_tol
+        D = len(tvec)
+        T1 = np.min(tvec)
+        T2 = np.max(tvec)
+        newton_options = type(options).from_buffer_copy(options)
+        newton_options.bound_state_localization = newton
+        full_options = type(options).from_buffer_copy(options)
+        if full_options.bound_state_localization == newton:
+            full_options.bound_state_localization = full
+        # Newton plans are created per number of guesses: with K > number of guesses, the remaining
+        # (zero) guesses would be refined as well and converge to spurious or duplicate bound states
+        self._make_newton_plan = lambda K_newton: make_plan(D, T1, T2, Xi1, Xi2, M, K_newton, kappa, newton_options)
+        self._newton_plans = {}
+        self._full_plan = make_plan(D, T1, T2, Xi1, Xi2, M, K, kappa, full_options)
+        self.steps = 0
+        self.newton_steps = 0
+        self.full_steps = 0
+        self._since_full = 0
+        self._ids = np.zeros(0, dtype=int)
+        self._values = np.zeros(0, dtype=numpy_complex)
+        self._last_id = -1
+        self._tracks = {}
+
+    def _guesses(self):
+        """Return the guesses for the next step: the last bound states, extrapolated along their tracks."""
+        guesses = self._values.copy()
+        if self.extrapolate:
+            for i, track_id in enumerate(self._ids):
+                steps, values = self._tracks[track_id]
+                if len(steps) > 1 and steps[-2] == self.steps - 2:
+                    guesses[i] = 2 * values[-1] - values[-2]
+        return guesses
+
+    def _newton_plan(self, K_newton):
+        """Return the (cached) plan for Newton localization with K_newton guesses."""
+        plan = self._newton_plans.get(K_newton)
+        if plan is None:
+            plan = self._make_newton_plan(K_newton)
+            self._newton_plans[K_newton] = plan
+        return plan
+
+    def _newton_failed(self, res, guesses):
+        if res.return_value != 0 or res.bound_states_num != len(guesses):
+            return True
+        z = res.bound_states
+        if len(z) > 1:
+            dist = np.abs(z[:, np.newaxis] - z[np.newaxis, :])
+            dist[np.diag_indices(len(z))] = np.inf
+            if np.min(dist) <= self.merge_tol:
+                return True
+        if self.max_shift is not None:
+            index = match_bound_states(guesses, z)
+            if np.any(np.abs(z - guesses[index]) > self.max_shift):
+                return True
+        return False
+
+    def step(self, *signals):
+        """Calculate the spectrum of the next signal of the sequence.
+
+        Arguments:
+
+        * signals : the samples, q for nsev, u for kdvv, q1, q2 for manakovv
+
+        Returns:
+
+        * res : result of the transform (NsevResult, KdvvResult or ManakovvResult). res.metadata
+                holds the fields step, localization ('newton' or 'full') and track_ids (array of
+                the track id of each bound state).
+
+        """
+        if len(signals) != self._nsignals:
+            raise ValueError("%s expects %d signal(s), got %d" % (self.transform, self._nsignals, len(signals)))
+        signals = [as_input_array(x) for x in signals]
+        localization = 'full'
+        res = None
+        need_full = (len(self._values) == 0) or \
+                    ((self.full_search_every is not None) and (self._since_full + 1 >= self.full_search_every))
+        if not need_full:
+            guesses = self._guesses()
+            res = self._newton_plan(len(guesses)).execute(*signals, bsg=guesses, check=False)
+            if self._newton_failed(res, guesses):
+                res = None
+            else:
+                localization = 'newton'
+                self.newton_steps += 1
+                self._since_full += 1
+        if res is None:
+            res = self._full_plan.execute(*signals)
+            self.full_steps += 1
+            self._since_full = 0
+        res.metadata = {'step': self.steps, 'localization': localization,
+                        'track_ids': self._update_tracks(res.bound_states)}
+        self.steps += 1
+        return res
+
+    def _update_tracks(self, bound_states):
+        """Assign track ids to the bound states of the current step and extend the trajectories."""
+        index = match_bound_states(self._values, bound_states, self.match_tol)
+        ids = np.empty(len(bound_states), dtype=int)
+        for i, j in enumerate(index):
+            if j >= 0:
+                track_id = int(self._ids[j])
+            else:
+                self._last_id += 1
+                track_id = self._last_id
+                self._tracks[track_id] = ([], [])
+            ids[i] = track_id
+            self._tracks[track_id][0].append(self.steps)
+            self._tracks[track_id][1].append(bound_states[i])
+        self._ids = ids
+        self._values = np.array(bound_states, dtype=numpy_complex)
+        return ids
+
+    @property
+    def trajectories(self):
+        """dictionary: track id -> (array of step numbers, array of bound states)"""
+        return {track_id: (np.array(steps), np.array(values, dtype=numpy_complex))
+                for track_id, (steps, values) in self._tracks.items()}
+
+    def reset(self):
+        """Forget the previous bound states and trajectories, the next step uses the full search."""
+        self.steps = 0
+        self.newton_steps = 0
+        self.full_steps = 0
+        self._since_full = 0
+        self._ids = np.zeros(0, dtype=int)
+        self._values = np.zeros(0, dtype=numpy_complex)
+        self._last_id = -1
+        self._tracks = {}
@@ -0,0 +1,259 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+from .auxiliary import as_input_array
+from .options_handling import get_nsev_options, get_kdvv_options, get_manakovv_options
+from .results import NsevResult, KdvvResult, ManakovvResult
+
+# number of matrix elements processed at once (samples * xi values * n * n)
+block_elements = 2 ** 21
+
+
+def _expm_2x2(h, xi, q, r):
+    """Return the elements of expm(h * [[-1j*xi, q], [r, 1j*xi]]), arrays broadcast against each other."""
+    delta = np.sqrt(-xi ** 2 + q * r + 0.0j)
+    c = np.cosh(h * delta)
+    nonzero = np.abs(delta) > 1e-300
+    s = np.where(nonzero, np.sinh(h * delta) / np.where(nonzero, delta, 1.0), h)
+    return c - 1.0j * xi * s, s * q, s * r, c + 1.0j * xi * s
+
+
+def _zs_matrices(h, xi, q, r):
+    """Per-sample transfer matrices (B, X, 2, 2) of the Zakharov-Shabat problem, exact exponentials (BO)."""
+    e11, e12, e21, e22 = _expm_2x2(h, xi[np.newaxis, :], q[:, np.newaxis], r[:, np.newaxis])
+    mats = np.empty(e11.shape + (2, 2), dtype=numpy_complex)
+    mats[..., 0, 0] = e11
+    mats[..., 0, 1] = e12
+    mats[..., 1, 0] = e21
+    mats[..., 1, 1] = e22
+    return mats
+
+
+def _manakov_matrices(h, xi, q1, q2, kappa):
+    """Per-sample transfer matrices (B, X, 3, 3) of the Manakov problem, exact exponentials (BO).
+
+    With n = sqrt(|q1|^2 + |q2|^2), the matrix acts as the scalar problem with q = n on the span
+    of (1, 0, 0) and (0, conj(q1), conj(q2)) / n, and as multiplication with 1j*xi on (0, q2, -q1) / n.
+    """
+    n = np.sqrt(np.abs(q1) ** 2 + np.abs(q2) ** 2)
+    zero = n == 0
+    n_safe = np.where(zero, 1.0, n)
+    # unit vectors: u = conj(q) / n, w = (q2, -q1) / n, fixed basis where q = 0
+    u = np.stack([np.where(zero, 1.0, np.conj(q1) / n_safe), np.where(zero, 0.0, np.conj(q2) / n_safe)], axis=-1)
+    w = np.stack([np.where(zero, 0.0, q2 / n_safe), np.where(zero, 1.0, -q1 / n_safe)], axis=-1)
+    xi = xi[np.newaxis, :]
+    e11, e12, e21, e22 = _expm_2x2(h, xi, n[:, np.newaxis], -kappa * n[:, np.newaxis])
+    phase = np.exp(1.0j * xi * h)
+    mats = np.empty(e11.shape + (3, 3), dtype=numpy_complex)
+    mats[..., 0, 0] = e11
+    for j in range(2):
+        mats[..., 0, j + 1] = e12 * np.conj(u[:, np.newaxis, j])
+        mats[..., j + 1, 0] = e21 * u[:, np.newaxis, j]
+        for k in range(2):
+            mats[..., j + 1, k + 1] = (e22 * u[:, np.newaxis, j] * np.conj(u[:, np.newaxis, k])
+                                       + phase * w[:, np.newaxis, j] * np.conj(w[:, np.newaxis, k]))
+    return mats
+
+
+def _ordered_product(mats):
+    """Return mats[B-1] @ ... @ mats[0] for a stack (B, X, n, n), multiplying pairwise."""
+    while mats.shape[0] > 1:
+        paired = mats[1:mats.shape[0] // 2 * 2:2] @ mats[0:mats.shape[0] // 2 * 2:2]
+        if mats.shape[0] % 2 == 1:
+            paired = np.concatenate([paired, mats[-1:]])
+        mats = paired
+    return mats[0]
+
+
+def transfer_matrix(make_matrices, D, X, n):
+    """Return the transfer matrices (X, n, n) of a signal of D samples for X values of xi.
+
+    The samples are processed in blocks, so that at most block_elements matrix elements are held at once.
+
+    Arguments:
+
+    * make_matrices : function (start, stop) returning the per-sample matrices (stop - start, X, n, n)
+    * D : number of samples
+    * X : number of xi values
+    * n : size of the matrices
+
+    Returns:
+
+    * T : numpy array (X, n, n)
+    """
+    block = max(1, block_elements // max(1, X * n * n))
+    T = np.broadcast_to(np.eye(n, dtype=numpy_complex), (X, n, n)).copy()
+    for start in range(0, D, block):
+        T = _ordered_product(make_matrices(start, min(D, start + block))) @ T
+    return T
+
+
+def _time_window(tvec, D):
+    T1 = np.min(tvec)
+    T2 = np.max(tvec)
+    return T1, T2, (T2 - T1) / (D - 1)
+
+
+def _scattering_coefficients(T, xi, T1, T2, h):
+    """Return a and the list of b_j from the transfer matrices, including the boundary phase factors."""
+    a = T[:, 0, 0] * np.exp(1.0j * xi * (T2 - T1 + h))
+    phase_b = np.exp(-1.0j * xi * (T1 + T2))
+    return a, [T[:, j, 0] * phase_b for j in range(1, T.shape[1])]
+
+
+def nsev_xi(q, tvec, xi, kappa=1, cst=None):
+    """Calculate the continuous spectrum (NSE, vanishing boundaries) at arbitrary values of xi.
+
+    The transfer matrix is evaluated directly for the given xi (vectorized with numpy), using the
+    exact matrix exponential for every sample (BO discretization, nsev with dis=1). The effort is
+    proportional to D * len(xi), so this is efficient for a moderate number of arbitrarily placed
+    xi. For many equally spaced values, nsev is faster.
+
+    Arguments:
+
+    * q : numpy array holding the samples of the input field
+    * tvec : time vector (equally spaced)
+    * xi : array of frequencies (real)
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+    * cst : type of continuous spectrum (0 = REFLECTION_COEFFICIENT, 1 = AB, 2 = BOTH), default = 0
+
+    Returns:
+
+    * res : NsevResult holding the fields return_value (0), cont_ref / cont_a / cont_b (depending
+            on cst). res.metadata holds the fields xi and discretization ('BO').
+
+    """
+    q = as_input_array(q)
+    xi = np.asarray(xi, dtype=numpy_double).ravel()
+    D = len(q)
+    options = get_nsev_options(cst=cst, dst=3, dis=fnft_nse_discretization.BO)
+    T1, T2, h = _time_window(tvec, D)
+    r = -kappa * np.conj(q)
+    T = transfer_matrix(lambda i, j: _zs_matrices(h, xi, q[i:j], r[i:j]), D, len(xi), 2)
+    a, (b,) = _scattering_coefficients(T, xi, T1, T2, h)
+    res = NsevResult(options)
+    res.return_value = 0
+    if options.contspec_type in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.BOTH):
+        res.cont_ref = b / a
+    if options.contspec_type in (fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+        res.cont_a = a
+        res.cont_b = b
+    res.metadata = {'xi': xi, 'discretization': 'BO'}
+    return res
+
+
+def kdvv_xi(u, tvec, xi, cst=None):
+    """Calculate the continuous spectrum (KdV, vanishing boundaries) at arbitrary values of xi.
+
+    The KdV scattering problem is evaluated as Zakharov-Shabat problem with q = u and r = -1, using
+    the exact matrix exponential for every sample (kdvv with dis=1, BO_VANILLA). See nsev_xi.
+
+    Arguments:
+
+    * u : numpy array holding the samples of the input field (real)
+    * tvec : time vector (equally spaced)
+    * xi : array of frequencies (real)
+
+    Optional arguments:
+
+    * cst : type of continuous spectrum (0 = REFLECTION_COEFFICIENT, 1 = AB, 2 = BOTH), default = 0
+
+    Returns:
+
+    * res : KdvvResult holding the fields return_value (0), cont_ref / cont_a / cont_b (depending
+            on cst). res.metadata holds the fields xi and discretization ('BO_VANILLA').
+
+    """
+    u = as_input_array(u, name='u')
+    xi = np.asarray(xi, dtype=numpy_double).ravel()
+    D = len(u)
+    options = get_kdvv_options(cst=cst, dst=3, dis=1)
+    T1, T2, h = _time_window(tvec, D)
+    r = -np.ones(D, dtype=numpy_complex)
+    T = transfer_matrix(lambda i, j: _zs_matrices(h, xi, u[i:j], r[i:j]), D, len(xi), 2)
+    a, (b,) = _scattering_coefficients(T, xi, T1, T2, h)
+    res = KdvvResult(options)
+    res.return_value = 0
+    if options.contspec_type in (fnft_kdvv_cstype.REFLECTION_COEFFICIENT, fnft_kdvv_cstype.BOTH):
+        res.cont_ref = b / a
+    if options.contspec_type in (fnft_kdvv_cstype.AB, fnft_kdvv_cstype.BOTH):
+        res.cont_a = a
+        res.cont_b = b
+    res.metadata = {'xi': xi, 'discretization': 'BO_VANILLA'}
+    return res
+
+
+def manakovv_xi(q1, q2, tvec, xi, kappa=1, cst=None):
+    """Calculate the continuous spectrum (Manakov equation, vanishing boundaries) at arbitrary values of xi.
+
+    The transfer matrix is evaluated directly for the given xi, using the exact matrix exponential
+    for every sample (manakovv with dis=12, BO). See nsev_xi.
+
+    Arguments:
+
+    * q1 : numpy array holding the samples of the first field
+    * q2 : numpy array holding the samples of the second field
+    * tvec : time vector (equally spaced)
+    * xi : array of frequencies (real)
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+    * cst : type of continuous spectrum (0 = REFLECTION_COEFFICIENT, 1 = AB, 2 = BOTH), default = 0
+
+    Returns:
+
+    * res : ManakovvResult holding the fields return_value (0), cont_ref1, cont_ref2 / cont_a,
+            cont_b1, cont_b2 (depending on cst). res.metadata holds the fields xi and
+            discretization ('BO').
+
+    """
+    q1 = as_input_array(q1, name='q1')
+    q2 = as_input_array(q2, len(q1), 'q2')
+    xi = np.asarray(xi, dtype=numpy_double).ravel()
+    D = len(q1)
+    options = get_manakovv_options(cst=cst, dst=3, dis=12)
+    T1, T2, h = _time_window(tvec, D)
+    T = transfer_matrix(lambda i, j: _manakov_matrices(h, xi, q1[i:j], q2[i:j], kappa), D, len(xi), 3)
+    a, (b1, b2) = _scattering_coefficients(T, xi, T1, T2, h)
+    res = ManakovvResult(options)
+    res.return_value = 0
+    if options.contspec_type in (fnft_manakovv_cstype.REFLECTION_COEFFICIENT, fnft_manakovv_cstype.BOTH):
+        res.cont_ref1 = b1 / a
+        res.cont_ref2 = b2 / a
+    if options.contspec_type in (fnft_manakovv_cstype.AB, fnft_manakovv_cstype.BOTH):
+        res.cont_a = a
+        res.cont_b1 = b1
+        res.cont_b2 = b2
+    res.metadata = {'xi': xi, 'discretization': 'BO'}
+    return res
@@ -77,6 +77,98 @@ class GenericOptionsStruct(ctypes.Structure):
         s = self.__repr__().replace(',', '\n')
         return s
 
+    def freeze(self):
+        """return an immutable, hashable copy of the options as FrozenOptions"""
+        return FrozenOptions(self)
+
+
+class FrozenOptions:
+    """Immutable and hashable options for the FNFT wrappers.
+
+    Holds a private copy of an options struct (e.g. NsevOptionsStruct). FrozenOptions can be passed
+    to all wrappers and plans instead of the options struct, shared between threads and used as
+    dictionary key. Two FrozenOptions are equal if they are of the same struct type and all fields
+    are equal (NaN entries, e.g. of the bounding box, compare equal to each other).
+
+    The fields can be read as attributes (array fields as tuples). FrozenOptions.struct returns a copy
+    of the ctypes struct, the wrappers pass the private struct to FNFT without copying it.
+
+    Arguments:
+
+    * options : options struct, e.g. created by get_nsev_options()
+
+    """
+
+    __slots__ = ('_struct', '_key', '_hash')
+
+    def __init__(self, options):
+        options = type(options).from_buffer_copy(options)
+        key = [type(options).__name__]
+        for f in options._fields_:
+            value = getattr(options, f[0])
+            if isinstance(value, ctypes.Array):
+                value = tuple(value)
+            else:
+                value = (value,)
+            # NaN != NaN: replace by None so equal options have equal keys
+            key.append(tuple(None if v != v else v for v in value))
+        object.__setattr__(self, '_struct', options)
+        object.__setattr__(self, '_key', tuple(key))
+        object.__setattr__(self, '_hash', hash(self._key))
+
+    @property
+    def struct(self):
+        """a copy of the ctypes options struct (modifying it does not change the FrozenOptions)"""
+        return type(self._struct).from_buffer_copy(self._struct)
+
+    @property
+    def key(self):
+        """tuple identifying the options: struct name and all field values"""
+        return self._key
+
+    def __getattr__(self, name):
+        if name in self._struct.__class__.__dict__:
+            value = getattr(self._struct, name)
+            if isinstance(value, ctypes.Array):  # return a copy of arrays, e.g. bounding_box
+                value = tuple(value)
+            return value
+        raise AttributeError("%s has no field %s" % (type(self._struct).__name__, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenOptions can not be modified, use thaw() to get a mutable copy")
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenOptions):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return FrozenOptions, (self.thaw(),)
+
+    def __repr__(self):
+        return repr(self._struct)
+
+    def __str__(self):
+        return str(self._struct)
+
+    def thaw(self):
+        """return a mutable copy of the options struct"""
+        return type(self._struct).from_buffer_copy(self._struct)
+
+
+def options_struct(options):
+    """Return the ctypes options struct of options (options struct or FrozenOptions).
+
+    For FrozenOptions the private struct is returned without copying it, it must not be modified.
+    """
+    if isinstance(options, FrozenOptions):
+        return options._struct
+    return options
+
+
 class KdvvOptionsStruct(GenericOptionsStruct):
     """Ctypes options struct for interfacing fnft_kdvv.
 
@@ -249,6 +341,17 @@ class fnft_nse_discretization(IntEnum):
     ES4 = 26
 
 
+# names of the discrete spectrum result fields for each discspec_type (NORMING_CONSTANTS, RESIDUES,
+# BOTH), the same for nsev, kdvv and manakovv; other values (SKIP) have no discrete spectrum fields
+discspec_fields = {0: ['disc_norm'], 1: ['disc_res'], 2: ['disc_norm', 'disc_res']}
+
+# names of the continuous spectrum result fields, in the order FNFT writes them, for each contspec_type
+# (nsev_contspec_fields also holds for kdvv); other values (SKIP) have no continuous spectrum fields
+nsev_contspec_fields = {0: ['cont_ref'], 1: ['cont_a', 'cont_b'], 2: ['cont_ref', 'cont_a', 'cont_b']}
+manakovv_contspec_fields = {0: ['cont_ref1', 'cont_ref2'], 1: ['cont_a', 'cont_b1', 'cont_b2'],
+                            2: ['cont_ref1', 'cont_ref2', 'cont_a', 'cont_b1', 'cont_b2']}
+
+
 class fnft_nsev_bsloc(IntEnum):
     FAST_EIGENVALUE = 0
     NEWTON = 1
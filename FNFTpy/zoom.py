@@ -0,0 +1,227 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .typesdef import *
+from .auxiliary import as_input_array
+from .options_handling import get_nsev_options
+from .results import NsevResult
+from .transfer_matrix import _expm_2x2, _time_window, _scattering_coefficients
+from .fnft_nsev_wrapper import nsev_wrapper
+
+
+def _fft_size(n):
+    """Return the smallest power of two >= n."""
+    return 1 << max(0, int(n - 1).bit_length())
+
+
+def chirpz(c, M, phi0, dphi):
+    """Evaluate polynomials at M points on an arc of the unit circle (chirp-z transform, Bluestein).
+
+    Calculates X[..., m] = sum_k c[..., k] * z_m**k with z_m = exp(1j * (phi0 + m * dphi)) for
+    m = 0, ..., M-1 using three FFTs of length >= N + M - 1, where N is the number of coefficients.
+
+    Arguments:
+
+    * c : numpy array of polynomial coefficients, lowest order first, along the last axis
+    * M : number of evaluation points
+    * phi0 : angle of the first point
+    * dphi : angle between neighbouring points
+
+    Returns:
+
+    * X : numpy array (..., M)
+    """
+    c = np.asarray(c, dtype=numpy_complex)
+    N = c.shape[-1]
+    L = _fft_size(N + M - 1)
+    k = np.arange(N)
+    # the chirp angles are computed from the integer squares to keep them exact for large k, m
+    y = c * np.exp(1.0j * (phi0 * k + 0.5 * dphi * (k * k)))
+    n = np.arange(-(N - 1), M)
+    v = np.zeros(L, dtype=numpy_complex)
+    v[n % L] = np.exp(-0.5j * dphi * (n * n))
+    X = np.fft.ifft(np.fft.fft(y, L) * np.fft.fft(v), axis=-1)[..., :M]
+    m = np.arange(M)
+    return X * np.exp(0.5j * dphi * (m * m))
+
+
+def _polymatmul(A, B):
+    """Return the products A[p] @ B[p] of stacks of polynomial matrices (P, n, n, degree + 1) via FFT."""
+    nc = A.shape[-1] + B.shape[-1] - 1
+    L = _fft_size(nc)
+    C = np.einsum('pijl,pjkl->pikl', np.fft.fft(A, L), np.fft.fft(B, L))
+    return np.fft.ifft(C, axis=-1)[..., :nc]
+
+
+def _polymat_product(mats):
+    """Return mats[D-1] @ ... @ mats[0] for a stack of polynomial matrices (D, n, n, degree + 1)."""
+    while mats.shape[0] > 1:
+        npairs = mats.shape[0] // 2
+        paired = _polymatmul(mats[1:2 * npairs:2], mats[0:2 * npairs:2])
+        if mats.shape[0] % 2 == 1:
+            # pad the unpaired matrix to the degree of the products
+            last = np.zeros((1,) + paired.shape[1:], dtype=numpy_complex)
+            last[..., :mats.shape[-1]] = mats[-1]
+            paired = np.concatenate([paired, last])
+        mats = paired
+    return mats[0]
+
+
+class NsevZoom:
+    """Zoomed evaluation of the continuous spectrum (NSE, vanishing boundaries) in narrow frequency bands.
+
+    The transfer matrix of the signal is calculated once as a polynomial in w = exp(2j*xi*dt),
+    using the second order symmetric splitting exp(-1j*xi*dt/2*sigma3) expm(dt*Q_n) exp(-1j*xi*dt/2*sigma3)
+    of every sample. Equally spaced xi map to points on an arc of the unit circle in w, so each
+    call of evaluate() calculates M points in any band [Xi1, Xi2] by a chirp-z transform with
+    an effort of O((D + M) log(D + M)), independent of the width of the band. A dense grid in a
+    narrow band does not cost more than a coarse one.
+
+    Setting up the polynomial needs O(D log^2 D) operations. The accuracy is of second order
+    in dt, comparable to nsev with dis=4 (2SPLIT2A).
+
+    Arguments:
+
+    * q : numpy array holding the samples of the input field
+    * tvec : time vector (equally spaced)
+
+    Optional arguments:
+
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+
+    """
+
+    def __init__(self, q, tvec, kappa=1):
+        q = as_input_array(q)
+        self.D = len(q)
+        if self.D < 2:
+            raise ValueError("NsevZoom needs at least two samples, got %d" % self.D)
+        self.kappa = kappa
+        self.T1, self.T2, self.dt = _time_window(tvec, self.D)
+        e11, e12, e21, e22 = _expm_2x2(self.dt, 0.0, q, -kappa * np.conj(q))
+        # diag(1, w) @ expm(dt*Q_n): first row constant, second row linear in w
+        mats = np.zeros((self.D, 2, 2, 2), dtype=numpy_complex)
+        mats[:, 0, 0, 0] = e11
+        mats[:, 0, 1, 0] = e12
+        mats[:, 1, 0, 1] = e21
+        mats[:, 1, 1, 1] = e22
+        # only the first column of the product is needed
+        self._poly = _polymat_product(mats)[:, 0, :]
+
+    def xi(self, Xi1, Xi2, M):
+        """Return the M equally spaced values of xi in [Xi1, Xi2] used by evaluate (as nsev)."""
+        return np.linspace(Xi1, Xi2, M)
+
+    def evaluate(self, Xi1, Xi2, M, cst=None):
+        """Calculate the continuous spectrum at M equally spaced values of xi in [Xi1, Xi2].
+
+        Arguments:
+
+        * Xi1, Xi2 : min and max frequency of the band
+        * M : number of values to calculate
+
+        Optional arguments:
+
+        * cst : type of continuous spectrum (0 = REFLECTION_COEFFICIENT, 1 = AB, 2 = BOTH), default = 0
+
+        Returns:
+
+        * res : NsevResult holding the fields return_value (0), cont_ref / cont_a / cont_b (depending
+                on cst). res.metadata holds the fields xi and discretization ('2SPLIT2_SYMMETRIC').
+
+        """
+        if M < 1:
+            raise ValueError("M must be positive, got %d" % M)
+        options = get_nsev_options(cst=cst, dst=3)
+        xi = self.xi(Xi1, Xi2, M)
+        dxi = (Xi2 - Xi1) / (M - 1) if M > 1 else 0.0
+        P = chirpz(self._poly, M, 2 * self.dt * Xi1, 2 * self.dt * dxi)
+        # undo the factor z**(D+1) (z = exp(1j*xi*dt)) of the polynomial form
+        T = np.empty((M, 2, 1), dtype=numpy_complex)
+        T[:, 0, 0] = P[0] * np.exp(-1.0j * self.D * self.dt * xi)
+        T[:, 1, 0] = P[1] * np.exp(-1.0j * (self.D + 1) * self.dt * xi)
+        a, (b,) = _scattering_coefficients(T, xi, self.T1, self.T2, self.dt)
+        res = NsevResult(options)
+        res.return_value = 0
+        if options.contspec_type in (fnft_nsev_cstype.REFLECTION_COEFFICIENT, fnft_nsev_cstype.BOTH):
+            res.cont_ref = b / a
+        if options.contspec_type in (fnft_nsev_cstype.AB, fnft_nsev_cstype.BOTH):
+            res.cont_a = a
+            res.cont_b = b
+        res.metadata = {'xi': xi, 'discretization': '2SPLIT2_SYMMETRIC'}
+        return res
+
+
+def nsev_zoom(q, tvec, Xi1, Xi2, M, K=128, kappa=1, cst=None, dst=3, dis=None, display_c_msg=True):
+    """Calculate the continuous spectrum (NSE, vanishing boundaries) densely in a narrow band [Xi1, Xi2].
+
+    The continuous spectrum is calculated by NsevZoom (chirp-z evaluation of the transfer matrix
+    polynomial), so the effort does not grow with the ratio of the full bandwidth of the signal
+    and the width of the band. If requested, the discrete spectrum is calculated by nsev_wrapper
+    (with cst = 3, skip continuous spectrum).
+
+    Arguments:
+
+    * q : numpy array holding the samples of the input field
+    * tvec : time vector (equally spaced)
+    * Xi1, Xi2 : min and max frequency of the band
+    * M : number of values for the continuous spectrum to calculate
+
+    Optional arguments:
+
+    * K : maximum number of bound states to calculate, default = 128
+    * kappa : +/- 1 for focussing/defocussing nonlinearity, default = 1
+    * cst : type of continuous spectrum (0 = REFLECTION_COEFFICIENT, 1 = AB, 2 = BOTH), default = 0
+    * dst : type of discrete spectrum, see nsev, default = 3 (skip)
+    * dis : discretization used for the discrete spectrum, see nsev, default = 11
+    * display_c_msg : whether to show messages raised by the C-library, default = True
+
+    Returns:
+
+    * res : NsevResult holding the fields return_value, cont_ref / cont_a / cont_b (depending on
+            cst) and bound_states_num, bound_states, disc_norm / disc_res (depending on dst).
+            res.metadata holds the fields xi and discretization of the continuous spectrum.
+
+    """
+    q = as_input_array(q)
+    zoomed = NsevZoom(q, tvec, kappa=kappa).evaluate(Xi1, Xi2, M, cst=cst)
+    if dst is None or dst != 3:
+        options = get_nsev_options(cst=3, dst=dst, dis=dis)
+        D = len(q)
+        res = nsev_wrapper(D, q, np.min(tvec), np.max(tvec), Xi1, Xi2, M, K, kappa, options,
+                           display_c_msg=display_c_msg)
+        for k in ('cont_ref', 'cont_a', 'cont_b'):
+            if k in zoomed:
+                res[k] = zoomed[k]
+        if res.return_value == 0:
+            res.return_value = zoomed.return_value
+        res.options = get_nsev_options(cst=cst, dst=dst, dis=dis)
+        res.metadata = zoomed.metadata
+        return res
+    return zoomed
@@ -0,0 +1,41 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+from .clib_benchmarks import clib_overhead_benchmark
+from .thread_benchmarks import thread_scaling_benchmark
+from .results_benchmarks import result_overhead_benchmark
+from .memory_benchmarks import retained_memory_benchmark
+from .spectrogram_benchmarks import spectrogram_benchmark
+from .segment_benchmarks import segment_scaling_benchmark
+from .xi_benchmarks import xi_points_benchmark
+from .zoom_benchmarks import zoom_benchmark
+from .bound_state_benchmarks import partitioned_bound_states_benchmark
+from .tracking_benchmarks import tracking_benchmark
+from .coarse_benchmarks import coarse_to_fine_benchmark
+from .padding_benchmarks import padding_benchmark
@@ -0,0 +1,89 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import time
+import numpy as np
+from FNFTpy import nsev, get_fnft_clib
+
+
+def multi_soliton_signal(nsol, dt=0.05, spacing=10.0, seed=1):
+    """Return (tvec, q, bound_states) of nsol separated NSE solitons with random bound states."""
+    rng = np.random.default_rng(seed)
+    xi = rng.uniform(-1, 1, nsol)
+    eta = rng.uniform(0.3, 0.6, nsol)
+    t0 = spacing * (np.arange(nsol) - (nsol - 1) / 2)
+    tvec = np.arange(t0[0] - 2 * spacing, t0[-1] + 2 * spacing, dt)
+    q = np.zeros(len(tvec), dtype=np.complex128)
+    for x, e, t in zip(xi, eta, t0):
+        q += 2 * e / np.cosh(2 * e * (tvec - t)) * np.exp(-2.0j * x * tvec)
+    return tvec, q, xi + 1.0j * eta
+
+
+def partitioned_bound_states_benchmark(nsolitons=(8, 32, 64), nboxes=(1, 2, 4, 8), verbose=True):
+    """Compare nsev with and without partitioned bound state search on multi-soliton signals.
+
+    nboxes=1 is a plain call of nsev (default filtering), the others use bound_state_boxes.
+
+    Optional arguments:
+
+    * nsolitons : list of numbers of solitons of the test signals
+    * nboxes : list of numbers of boxes
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * nsolitons : list of numbers of solitons
+        * nboxes : list of numbers of boxes
+        * runtime : array (len(nsolitons), len(nboxes)) of runtimes in seconds
+        * found : array (len(nsolitons), len(nboxes)) of numbers of bound states found
+
+    """
+    get_fnft_clib().suppress_c_messages()
+    runtime = np.zeros((len(nsolitons), len(nboxes)))
+    found = np.zeros((len(nsolitons), len(nboxes)), dtype=int)
+    for i, nsol in enumerate(nsolitons):
+        tvec, q, _ = multi_soliton_signal(nsol)
+        for j, n in enumerate(nboxes):
+            t0 = time.perf_counter()
+            res = nsev(q, tvec, M=1024, K=2 * nsol, bound_state_boxes=n if n > 1 else None)
+            runtime[i, j] = time.perf_counter() - t0
+            found[i, j] = res['bound_states_num']
+    if verbose:
+        print("\n\npartitioned bound state search (multi-soliton signals)")
+        print("  solitons  D       " + "".join(["boxes=%-2d          " % n for n in nboxes]))
+        for i, nsol in enumerate(nsolitons):
+            D = len(multi_soliton_signal(nsol)[0])
+            print("  %-8d  %-6d  " % (nsol, D)
+                  + "".join(["%8.4f s (%3d)  " % (runtime[i, j], found[i, j]) for j in range(len(nboxes))]))
+    return {'nsolitons': list(nsolitons),
+            'nboxes': list(nboxes),
+            'runtime': runtime,
+            'found': found}
@@ -0,0 +1,103 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import ctypes
+import timeit
+import numpy as np
+from FNFTpy import nsev_wrapper, get_nsev_options, get_fnft_clib
+from FNFTpy.auxiliary import get_winmode_param
+from FNFTpy.typesdef import *
+
+
+def _legacy_nsev_setup():
+    """Per-call library setup as done by the wrappers before the library handle was cached."""
+    fnft_clib = ctypes.CDLL(get_fnft_clib().libpath, winmode=get_winmode_param())
+    clib_nsev_func = fnft_clib.fnft_nsev
+    clib_nsev_func.restype = ctypes_int
+    clib_nsev_func.argtypes = [
+        ctypes_uint,  # D
+        numpy_complex_arr_ptr,  # q
+        numpy_double_arr_ptr,  # t
+        ctypes_uint,  # M
+        numpy_complex_arr_ptr,  # cont
+        numpy_double_arr_ptr,  # xi
+        ctypes.POINTER(ctypes_uint),  # K_ptr
+        numpy_complex_arr_ptr,  # boundstates
+        numpy_complex_arr_ptr,  # normconst res
+        ctypes_int,  # kappa
+        ctypes.POINTER(NsevOptionsStruct)]  # options ptr
+    return clib_nsev_func
+
+
+def _cached_nsev_setup():
+    """Per-call library setup using the cached library handle."""
+    return get_fnft_clib().prototype('fnft_nsev', True, True)
+
+
+def clib_overhead_benchmark(Dlist=(256, 1024, 2048), M=128, K=128, repeats=2000, verbose=True):
+    """Compare the per-call library setup overhead with the duration of a complete nsev_wrapper call.
+
+    Optional arguments:
+
+    * Dlist : numbers of samples for which a complete call of nsev_wrapper is timed
+    * M : number of points of the continuous spectrum
+    * K : maximum number of bound states
+    * repeats : number of repetitions for each timing
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields (all durations in seconds per call)
+
+        * setup_legacy : library loading and prototype setup per call (previous behavior)
+        * setup_cached : prototype lookup from the cached library handle
+        * nsev_wrapper : list of durations of nsev_wrapper calls, one for each D in Dlist
+
+    """
+    get_fnft_clib()  # load once, so that loading is not part of the timings
+    setup_legacy = timeit.timeit(_legacy_nsev_setup, number=repeats) / repeats
+    setup_cached = timeit.timeit(_cached_nsev_setup, number=repeats) / repeats
+    options = get_nsev_options()
+    wrapper_times = []
+    for D in Dlist:
+        tvec = np.linspace(-10, 10, D)
+        q = 1.2 / np.cosh(tvec) + 0.0j
+        wrapper_times.append(timeit.timeit(
+            lambda: nsev_wrapper(D, q, tvec[0], tvec[-1], -2, 2, M, K, 1, options),
+            number=max(1, repeats // 10)) / max(1, repeats // 10))
+    if verbose:
+        print("\n\nlibrary setup overhead per call")
+        print("  legacy (CDLL + argtypes) : %.2f us" % (setup_legacy * 1e6))
+        print("  cached prototypes        : %.2f us" % (setup_cached * 1e6))
+        for D, tw in zip(Dlist, wrapper_times):
+            print("  nsev_wrapper D=%5d     : %.2f us per call, legacy setup would add %.1f %%" % (
+                D, tw * 1e6, 100 * (setup_legacy - setup_cached) / tw))
+    return {'setup_legacy': setup_legacy,
+            'setup_cached': setup_cached,
+            'nsev_wrapper': wrapper_times}
@@ -0,0 +1,118 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import time
+import numpy as np
+from FNFTpy import nsev, get_fnft_clib
+from .bound_state_benchmarks import multi_soliton_signal
+
+
+def coarse_test_signals(D=2 ** 14):
+    """Return a list of (name, tvec, q, bound_states) of the test signals, bound_states None if not known.
+
+    * rectangle : signal of nsev_example (amplitude 2 on [-1, 1])
+    * sech : signal of the mex4 example (5.4 sech(t) exp(-6it), 5 bound states)
+    * multi-soliton : 32 separated solitons, see multi_soliton_signal
+    """
+    tvec = np.linspace(-1, 1, D)
+    rectangle = np.full(D, 2.0 + 0.0j)
+    tvec2 = np.linspace(-32, 32, D)
+    qo = 5.4
+    sech = qo / np.cosh(tvec2) * np.exp(-6.0j * tvec2)
+    sech_exact = 3.0 + 1.0j * (qo + 0.5 - np.floor(np.arange(qo + 0.5, 1, -1)))
+    tvec3, multi, multi_exact = multi_soliton_signal(32)
+    return [('rectangle', tvec, rectangle, None),
+            ('sech', tvec2, sech, sech_exact),
+            ('multi-soliton', tvec3, multi, multi_exact)]
+
+
+def bound_state_error(found, reference):
+    """Return the largest distance of a reference bound state to the nearest bound state found (inf if none)."""
+    if len(reference) == 0:
+        return 0.0
+    if len(found) == 0:
+        return np.inf
+    return np.max(np.min(np.abs(reference[:, None] - found[None, :]), axis=1))
+
+
+def coarse_to_fine_benchmark(decimations=(2, 4, 8), D=2 ** 14, repeat=3, verbose=True):
+    """Compare the single-stage default bound state search of nsev with the coarse-to-fine search.
+
+    The error is measured against the exact bound states where known, otherwise against the
+    result of the single-stage search. The continuous spectrum is not calculated (cst=3).
+
+    Optional arguments:
+
+    * decimations : list of decimation factors of the coarse stage
+    * D : number of samples of the rectangle and sech signal
+    * repeat : number of repetitions, the best runtime is reported, default = 3
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * signals : list of signal names
+        * decimations : list of decimation factors, 1 denotes the single-stage search
+        * runtime : array (len(signals), len(decimations) + 1) of runtimes in seconds
+        * found : array (len(signals), len(decimations) + 1) of numbers of bound states found
+        * error : array (len(signals), len(decimations) + 1) of bound state errors
+
+    """
+    get_fnft_clib().suppress_c_messages()
+    signals = coarse_test_signals(D)
+    factors = [1] + list(decimations)
+    runtime = np.zeros((len(signals), len(factors)))
+    found = np.zeros((len(signals), len(factors)), dtype=int)
+    error = np.zeros((len(signals), len(factors)))
+    for i, (name, tvec, q, exact) in enumerate(signals):
+        reference = exact
+        for j, f in enumerate(factors):
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                res = nsev(q, tvec, K=len(q), cst=3, coarse_decimation=f if f > 1 else None)
+                times.append(time.perf_counter() - t0)
+            runtime[i, j] = min(times)
+            found[i, j] = res['bound_states_num']
+            if reference is None:
+                reference = res['bound_states']
+            error[i, j] = bound_state_error(res['bound_states'], reference)
+    if verbose:
+        print("\n\ncoarse-to-fine bound state search (decimation 1 = single-stage default)")
+        print("  signal         D       " + "".join(["decimation=%-2d                   " % f for f in factors]))
+        for i, (name, tvec, q, exact) in enumerate(signals):
+            print("  %-13s  %-6d  " % (name, len(q))
+                  + "".join(["%8.4f s (%3d) err %8.2e  " % (runtime[i, j], found[i, j], error[i, j])
+                             for j in range(len(factors))]))
+    return {'signals': [s[0] for s in signals],
+            'decimations': factors,
+            'runtime': runtime,
+            'found': found,
+            'error': error}
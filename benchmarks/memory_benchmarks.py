@@ -0,0 +1,89 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import tracemalloc
+import numpy as np
+from FNFTpy import nsev, nsep, get_fnft_clib
+
+
+def retained_bytes(res):
+    """Return the number of bytes kept alive by the numpy arrays of a result.
+
+    Views are attributed the size of the buffer they belong to; each buffer is counted once.
+    """
+    buffers = {}
+    for value in res.values():
+        if isinstance(value, np.ndarray):
+            base = value
+            while isinstance(base.base, np.ndarray):
+                base = base.base
+            buffers[id(base)] = base.nbytes
+    return sum(buffers.values())
+
+
+def retained_memory_benchmark(nresults=1000, D=256, M=16, verbose=True):
+    """Measure the memory retained per result when many results of nsev and nsep are kept.
+
+    Optional arguments:
+
+    * nresults : number of results kept for each transform
+    * D : number of samples of the test signal
+    * M : number of points of the continuous spectrum (nsev)
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields (all sizes in bytes per result)
+
+        * nsev_buffers : size of the buffers referenced by a nsev result
+        * nsev_traced : memory allocated and still in use per kept nsev result (tracemalloc)
+        * nsep_buffers : size of the buffers referenced by a nsep result
+        * nsep_traced : memory allocated and still in use per kept nsep result (tracemalloc)
+
+    """
+    get_fnft_clib()  # load once, so that loading is not part of the measurement
+    tvec = np.linspace(-10, 10, D)
+    q = 1.2 / np.cosh(tvec) + 0.0j
+    rdict = {}
+    for name, call in [('nsev', lambda: nsev(q, tvec, M=M)),
+                       ('nsep', lambda: nsep(q, tvec[0], tvec[-1]))]:
+        call()  # warm up, e.g. caches of default options
+        tracemalloc.start()
+        start, _ = tracemalloc.get_traced_memory()
+        kept = [call() for _ in range(nresults)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rdict[name + '_buffers'] = retained_bytes(kept[0])
+        rdict[name + '_traced'] = (current - start) / nresults
+    if verbose:
+        print("\n\nmemory retained per result (D=%d, %d results kept)" % (D, nresults))
+        for name in ['nsev', 'nsep']:
+            print("  %s : %8d bytes in referenced buffers, %10.1f bytes traced" % (
+                name, rdict[name + '_buffers'], rdict[name + '_traced']))
+    return rdict
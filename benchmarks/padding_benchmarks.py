@@ -0,0 +1,82 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import time
+import numpy as np
+from FNFTpy import nsev, kdvv, manakovv, get_fnft_clib
+
+
+def padding_benchmark(lengths=(3000, 100000), M=1024, repeat=3, verbose=True):
+    """Compare the runtime of nsev, kdvv and manakovv with and without zero-padding (pad=True).
+
+    The test signals are sech pulses with a number of samples which is not a power of two.
+    The bound state search is skipped (dst=3), so only the continuous spectrum is calculated.
+
+    Optional arguments:
+
+    * lengths : list of numbers of samples
+    * M : number of points of the continuous spectrum
+    * repeat : number of repetitions, the best runtime is reported, default = 3
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * lengths : list of numbers of samples
+        * transforms : list of transform names
+        * runtime : array (len(transforms), len(lengths), 2) of runtimes in seconds without / with padding
+
+    """
+    get_fnft_clib().suppress_c_messages()
+    calls = {'nsev': lambda q, t, pad: nsev(q, t, M=M, dst=3, pad=pad),
+             'kdvv': lambda q, t, pad: kdvv(q.real ** 2, t, M=M, dst=3, pad=pad),
+             'manakovv': lambda q, t, pad: manakovv(q, 0.5 * q, t, M=M, dst=3, pad=pad)}
+    runtime = np.zeros((len(calls), len(lengths), 2))
+    for j, D in enumerate(lengths):
+        tvec = np.linspace(-20, 20, D)
+        q = 1.3 / np.cosh(tvec) * np.exp(0.4j * tvec)
+        for i, call in enumerate(calls.values()):
+            for k, pad in enumerate([False, True]):
+                times = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    call(q, tvec, pad)
+                    times.append(time.perf_counter() - t0)
+                runtime[i, j, k] = min(times)
+    if verbose:
+        print("\n\nzero-padding to a power of two (pad=True), M=%d" % M)
+        print("  transform  D        no padding    padded        speedup")
+        for i, name in enumerate(calls):
+            for j, D in enumerate(lengths):
+                print("  %-9s  %-7d  %8.4f s    %8.4f s    %6.2f" % (name, D, runtime[i, j, 0], runtime[i, j, 1],
+                                                                   runtime[i, j, 0] / runtime[i, j, 1]))
+    return {'lengths': list(lengths),
+            'transforms': list(calls),
+            'runtime': runtime}
@@ -0,0 +1,102 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import timeit
+import numpy as np
+from FNFTpy import nsev_wrapper, get_nsev_options, get_fnft_clib, NsevResult
+
+
+def _legacy_result(rv, bound_states, disc, cont, options):
+    """Result dictionary as built by the wrappers before the result objects were introduced."""
+    rdict = {
+        'return_value': rv,
+        'bound_states_num': len(bound_states),
+        'bound_states': bound_states,
+        'disc_norm': disc}
+    rdict['cont_ref'] = cont
+    rdict['options'] = repr(options)
+    return rdict
+
+
+def _slots_result(rv, bound_states, disc, cont, options):
+    """Result object with lazy options representation."""
+    res = NsevResult(options)
+    res.return_value = rv
+    res.bound_states_num = len(bound_states)
+    res.bound_states = bound_states
+    res.disc_norm = disc
+    res.cont_ref = cont
+    return res
+
+
+def result_overhead_benchmark(Dlist=(16, 64, 256, 1024), M=16, K=16, repeats=5000, verbose=True):
+    """Compare the cost of building the result (dictionary with options repr vs. result object).
+
+    Optional arguments:
+
+    * Dlist : numbers of samples for which a complete call of nsev_wrapper is timed
+    * M : number of points of the continuous spectrum
+    * K : maximum number of bound states
+    * repeats : number of repetitions for each timing
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields (all durations in seconds per call)
+
+        * result_dict : building the result dictionary incl. repr(options) (previous behavior)
+        * result_object : building a NsevResult
+        * nsev_wrapper : list of durations of nsev_wrapper calls, one for each D in Dlist
+
+    """
+    get_fnft_clib()  # load once, so that loading is not part of the timings
+    options = get_nsev_options()
+    bound_states = np.zeros(K, dtype=np.complex128)
+    cont = np.zeros(M, dtype=np.complex128)
+    result_dict = timeit.timeit(lambda: _legacy_result(0, bound_states, bound_states, cont, options),
+                                number=repeats) / repeats
+    result_object = timeit.timeit(lambda: _slots_result(0, bound_states, bound_states, cont, options),
+                                  number=repeats) / repeats
+    wrapper_times = []
+    for D in Dlist:
+        tvec = np.linspace(-10, 10, D)
+        q = 1.2 / np.cosh(tvec) + 0.0j
+        wrapper_times.append(timeit.timeit(
+            lambda: nsev_wrapper(D, q, tvec[0], tvec[-1], -2, 2, M, K, 1, options),
+            number=max(1, repeats // 10)) / max(1, repeats // 10))
+    if verbose:
+        print("\n\nresult construction per call")
+        print("  dictionary + repr(options) : %.2f us" % (result_dict * 1e6))
+        print("  NsevResult (lazy repr)     : %.2f us" % (result_object * 1e6))
+        for D, tw in zip(Dlist, wrapper_times):
+            print("  nsev_wrapper D=%5d       : %.2f us per call, saved %.1f %%" % (
+                D, tw * 1e6, 100 * (result_dict - result_object) / (tw + result_dict - result_object)))
+    return {'result_dict': result_dict,
+            'result_object': result_object,
+            'nsev_wrapper': wrapper_times}
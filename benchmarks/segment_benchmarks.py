@@ -0,0 +1,84 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import time
+import numpy as np
+from FNFTpy import nsev, get_fnft_clib
+
+
+def segment_scaling_benchmark(D=2 ** 20, M=256, segments=None, verbose=True):
+    """Measure the runtime of nsev with segment-parallel continuous spectrum.
+
+    Only the continuous spectrum is calculated (dst=3), so the runtime is that of the segments
+    and their composition. The deviation from the single call (parallel_segments=None) is reported
+    as relative norm of the reflection coefficients.
+
+    Optional arguments:
+
+    * D : number of samples of the test signal
+    * M : number of points of the continuous spectrum
+    * segments : list of segment counts, default = [1, 2, 4, ..., os.cpu_count()]
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * segments : list of segment counts
+        * runtime : list of runtimes in seconds
+        * speedup : list of speedups relative to the single call
+        * deviation : list of relative deviations of cont_ref from the single call
+
+    """
+    if segments is None:
+        ncpu = os.cpu_count() or 1
+        segments = [1] + [2 ** k for k in range(1, 16) if 2 ** k <= ncpu]
+    tvec = np.linspace(-D / 2048, D / 2048, D)
+    q = 1.7 / np.cosh(tvec) * np.exp(0.3j * tvec)
+    get_fnft_clib().suppress_c_messages()
+    runtime = []
+    deviation = []
+    reference = None
+    for nseg in segments:
+        t0 = time.perf_counter()
+        res = nsev(q, tvec, M=M, dst=3, parallel_segments=nseg, workers=nseg)
+        runtime.append(time.perf_counter() - t0)
+        if reference is None:
+            reference = res['cont_ref']
+        deviation.append(np.linalg.norm(res['cont_ref'] - reference) / np.linalg.norm(reference))
+    speedup = [runtime[0] / rt for rt in runtime]
+    if verbose:
+        print("\n\nsegment-parallel nsev, D=%d, M=%d" % (D, M))
+        for nseg, rt, sp, dev in zip(segments, runtime, speedup, deviation):
+            print("  %3d segments : %8.3f s   speedup %5.2f   deviation %.1e" % (nseg, rt, sp, dev))
+    return {'segments': segments,
+            'runtime': runtime,
+            'speedup': speedup,
+            'deviation': deviation}
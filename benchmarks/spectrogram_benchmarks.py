@@ -0,0 +1,73 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import time
+import numpy as np
+from FNFTpy import nsev_spectrogram, get_fnft_clib
+
+
+def spectrogram_benchmark(D=2 ** 16, window=1024, hop=512, M=256, workers=None, verbose=True):
+    """Measure the throughput of nsev_spectrogram in input samples per second.
+
+    Optional arguments:
+
+    * D : number of samples of the test trace
+    * window : number of samples per window
+    * hop : number of samples between consecutive windows
+    * M : number of points of the continuous spectrum
+    * workers : list of worker counts, default = [1, os.cpu_count()]
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * workers : list of worker counts
+        * samples_per_second : list of throughputs, one for each worker count
+
+    """
+    if workers is None:
+        workers = sorted({1, os.cpu_count() or 1})
+    tvec = np.linspace(-D / 64, D / 64, D)
+    rng = np.random.default_rng(1)
+    centers = rng.uniform(tvec[0], tvec[-1], D // 512)
+    q = sum(1.2 / np.cosh(tvec - c) for c in centers) + 0.0j
+    get_fnft_clib().suppress_c_messages()
+    samples_per_second = []
+    for nworkers in workers:
+        t0 = time.perf_counter()
+        nsev_spectrogram(q, tvec, window, hop, M=M, taper='hann', workers=nworkers)
+        samples_per_second.append(D / (time.perf_counter() - t0))
+    if verbose:
+        print("\n\nnsev_spectrogram, D=%d, window=%d, hop=%d, M=%d" % (D, window, hop, M))
+        for nworkers, sps in zip(workers, samples_per_second):
+            print("  %2d workers : %.3g samples/s" % (nworkers, sps))
+    return {'workers': workers,
+            'samples_per_second': samples_per_second}
@@ -0,0 +1,87 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from FNFTpy import nsev, get_fnft_clib
+
+
+def thread_scaling_benchmark(D=4096, M=1024, ncalls=64, max_threads=None, verbose=True):
+    """Measure the throughput of concurrent nsev calls for 1 ... max_threads threads.
+
+    Calls alternate between different continuous / discrete spectrum types, so that
+    concurrently running calls use different prototypes of fnft_nsev.
+
+    Optional arguments:
+
+    * D : number of samples of the test signal
+    * M : number of points of the continuous spectrum
+    * ncalls : number of nsev calls for each thread count
+    * max_threads : maximum number of threads, default = os.cpu_count()
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * threads : list of thread counts
+        * throughput : list of calls per second, one for each thread count
+        * speedup : list of throughput relative to one thread
+
+    """
+    if max_threads is None:
+        max_threads = os.cpu_count()
+    tvec = np.linspace(-16, 16, D)
+    q = 2.2 / np.cosh(tvec) + 0.0j
+    settings = [(0, 0), (1, 1), (2, 2), (3, 0), (0, 3)]  # (cst, dst) pairs
+    get_fnft_clib().suppress_c_messages()
+
+    def single_call(ii):
+        cst, dst = settings[ii % len(settings)]
+        return nsev(q, tvec, M=M, cst=cst, dst=dst)['return_value']
+
+    threads = list(range(1, max_threads + 1))
+    throughput = []
+    for nthreads in threads:
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            t0 = time.perf_counter()
+            rvs = list(executor.map(single_call, range(ncalls)))
+            throughput.append(ncalls / (time.perf_counter() - t0))
+        if any(rvs):
+            print("warning: some calls returned an error code")
+    speedup = [tp / throughput[0] for tp in throughput]
+    if verbose:
+        print("\n\nthread scaling of nsev, D=%d, M=%d, %d calls" % (D, M, ncalls))
+        for nthreads, tp, sp in zip(threads, throughput, speedup):
+            print("  %2d threads : %8.1f calls/s   speedup %.2f" % (nthreads, tp, sp))
+    return {'threads': threads,
+            'throughput': throughput,
+            'speedup': speedup}
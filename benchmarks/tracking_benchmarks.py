@@ -0,0 +1,85 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import time
+import numpy as np
+from FNFTpy import nsev, BoundStateTracker, get_fnft_clib
+from .bound_state_benchmarks import multi_soliton_signal
+
+
+def tracking_benchmark(nsol=16, nsteps=50, sweep=0.05, verbose=True):
+    """Compare the discrete spectrum of a slowly varying sequence: full search in every step vs. BoundStateTracker.
+
+    The sequence is a multi-soliton signal whose amplitude grows by sweep (relative) over nsteps steps.
+
+    Optional arguments:
+
+    * nsol : number of solitons of the test signal
+    * nsteps : number of steps
+    * sweep : relative change of the amplitude over all steps
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * runtime_full : runtime of the full search in all steps in seconds
+        * runtime_tracker : runtime of the tracker in seconds
+        * newton_steps, full_steps : number of steps of the tracker with Newton / full search
+        * max_deviation : maximum distance between the bound states of both
+
+    """
+    tvec, q, _ = multi_soliton_signal(nsol)
+    K = 2 * nsol
+    get_fnft_clib().suppress_c_messages()
+    factors = 1 + sweep * np.arange(nsteps) / max(1, nsteps - 1)
+    t0 = time.perf_counter()
+    full = [nsev(f * q, tvec, K=K, cst=3)['bound_states'] for f in factors]
+    runtime_full = time.perf_counter() - t0
+    tracker = BoundStateTracker('nsev', tvec, K=K)
+    t0 = time.perf_counter()
+    tracked = [tracker.step(f * q)['bound_states'] for f in factors]
+    runtime_tracker = time.perf_counter() - t0
+    max_deviation = 0.0
+    for z_full, z_tracked in zip(full, tracked):
+        if len(z_full) != len(z_tracked):
+            max_deviation = np.inf
+        elif len(z_full) > 0:
+            max_deviation = max(max_deviation, np.max(np.abs(np.sort_complex(z_full) - np.sort_complex(z_tracked))))
+    if verbose:
+        print("\n\nbound state tracking, %d solitons, %d steps" % (nsol, nsteps))
+        print("  full search in every step : %8.4f s" % runtime_full)
+        print("  BoundStateTracker         : %8.4f s  (%d Newton, %d full steps)" % (
+            runtime_tracker, tracker.newton_steps, tracker.full_steps))
+        print("  max. deviation            : %.2e" % max_deviation)
+    return {'runtime_full': runtime_full,
+            'runtime_tracker': runtime_tracker,
+            'newton_steps': tracker.newton_steps,
+            'full_steps': tracker.full_steps,
+            'max_deviation': max_deviation}
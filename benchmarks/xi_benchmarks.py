@@ -0,0 +1,74 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import time
+import numpy as np
+from FNFTpy import nsev, nsev_xi, get_fnft_clib
+
+
+def xi_points_benchmark(D=4096, npoints=(10, 100, 300, 1000), M_dense=2 ** 16, verbose=True):
+    """Compare nsev_xi at arbitrary xi with nsev on a dense grid.
+
+    Optional arguments:
+
+    * D : number of samples of the test signal
+    * npoints : list of numbers of random xi values for nsev_xi
+    * M_dense : number of grid points of the dense nsev call (BO discretization)
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * npoints : list of numbers of xi values
+        * runtime : list of runtimes of nsev_xi in seconds
+        * runtime_dense : runtime of nsev with M_dense grid points in seconds
+
+    """
+    tvec = np.linspace(-16, 16, D)
+    q = 1.7 / np.cosh(tvec) * np.exp(0.3j * tvec)
+    rng = np.random.default_rng(1)
+    get_fnft_clib().suppress_c_messages()
+    t0 = time.perf_counter()
+    nsev(q, tvec, M=M_dense, dst=3, dis=1)
+    runtime_dense = time.perf_counter() - t0
+    runtime = []
+    for n in npoints:
+        xi = rng.uniform(-2, 2, n)
+        t0 = time.perf_counter()
+        nsev_xi(q, tvec, xi)
+        runtime.append(time.perf_counter() - t0)
+    if verbose:
+        print("\n\ncontinuous spectrum at arbitrary xi, D=%d" % D)
+        print("  nsev, dense grid M=%d : %8.4f s" % (M_dense, runtime_dense))
+        for n, rt in zip(npoints, runtime):
+            print("  nsev_xi, %5d points   : %8.4f s" % (n, rt))
+    return {'npoints': list(npoints),
+            'runtime': runtime,
+            'runtime_dense': runtime_dense}
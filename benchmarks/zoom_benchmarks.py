@@ -0,0 +1,91 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import time
+import numpy as np
+from FNFTpy import nsev, nsev_xi, NsevZoom, get_fnft_clib
+
+
+def zoom_benchmark(D=4096, M=2 ** 16, band=(0.3, 0.32), nref=64, verbose=True):
+    """Compare the zoomed continuous spectrum (NsevZoom) with nsev on the same narrow band.
+
+    The accuracy of both is measured against nsev_xi (BO, exact exponentials) at nref points of the band.
+    nsev is called with dis=4 (2SPLIT2A, second order as NsevZoom) and with its default discretization.
+
+    Optional arguments:
+
+    * D : number of samples of the test signal
+    * M : number of points in the band
+    * band : tuple (Xi1, Xi2)
+    * nref : number of reference points
+    * verbose : print results, default = True
+
+    Returns:
+
+    * rdict : dictionary holding the fields
+
+        * runtime_setup : runtime of the setup of NsevZoom in seconds
+        * runtime_zoom : runtime of NsevZoom.evaluate in seconds
+        * runtime_nsev : dictionary: runtime of nsev in seconds for each discretization
+        * error_zoom : max. abs. error of the reflection coefficient of NsevZoom
+        * error_nsev : dictionary: max. abs. error of the reflection coefficient of nsev
+
+    """
+    tvec = np.linspace(-16, 16, D)
+    q = 1.7 / np.cosh(tvec) * np.exp(0.3j * tvec)
+    Xi1, Xi2 = band
+    get_fnft_clib().suppress_c_messages()
+    idx = np.linspace(0, M - 1, nref).astype(int)
+    ref = nsev_xi(q, tvec, np.linspace(Xi1, Xi2, M)[idx])['cont_ref']
+    t0 = time.perf_counter()
+    zoom = NsevZoom(q, tvec)
+    runtime_setup = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    res = zoom.evaluate(Xi1, Xi2, M)
+    runtime_zoom = time.perf_counter() - t0
+    error_zoom = np.max(np.abs(res['cont_ref'][idx] - ref))
+    runtime_nsev = {}
+    error_nsev = {}
+    for dis in [4, None]:
+        t0 = time.perf_counter()
+        res = nsev(q, tvec, Xi1=Xi1, Xi2=Xi2, M=M, dst=3, dis=dis)
+        runtime_nsev[dis] = time.perf_counter() - t0
+        error_nsev[dis] = np.max(np.abs(res['cont_ref'][idx] - ref))
+    if verbose:
+        print("\n\nzoomed continuous spectrum, D=%d, M=%d, band [%g, %g]" % (D, M, Xi1, Xi2))
+        print("  NsevZoom setup         : %8.4f s" % runtime_setup)
+        print("  NsevZoom evaluate      : %8.4f s   error %.2e" % (runtime_zoom, error_zoom))
+        for dis in runtime_nsev:
+            print("  nsev, dis=%-12s : %8.4f s   error %.2e" % ('default' if dis is None else dis, runtime_nsev[dis],
+                                                            error_nsev[dis]))
+    return {'runtime_setup': runtime_setup,
+            'runtime_zoom': runtime_zoom,
+            'runtime_nsev': runtime_nsev,
+            'error_zoom': error_zoom,
+            'error_nsev': error_nsev}
@@ -37,10 +37,18 @@ from testfunctions import KdvvExampleTest, KdvvExampleTestProvideBoundStateGuess
     NsepExampleTest, NsevExampleTest, NsevExampleTestBoundStateGuesses, NsevExampleTestBoundStateGuessesMex4, \
     NsevExampleTestRF, \
     NsevDstCstInputTest, NsevInverseExample, NsevInverseExample2, NsevInverseExampleMex1, NsevInverseExampleMex3, \
-    NsevInverseInputVariation, FnftpyOptionsTest
+    NsevInverseInputVariation, FnftpyOptionsTest, NsevThreadSafetyTest, NsevPlanTest, NsevOutputArrayTest, \
+    NsevInputArrayTest, FrozenOptionsTest, ResultsDictInterfaceTest, NsevBatchTest, KdvvManakovvBatchTest, \
+    SpectrumBatchTest, ProcessBatchTest, AsyncTransformTest, \
+    StreamFramesTest, NsevStreamTest, NsevSpectrogramTest, NsevParallelSegmentsTest, IncrementalNsevTest, \
+    ContinuousSpectrumXiTest, NsevZoomTest, ChunkedXiTest, NsevPartitionedBoundStatesTest, \
+    BoundStateTrackerTest, NsevCoarseToFineTest, DiscreteSpectrumSkipTest, AdaptiveResolutionTest, \
+    PadPow2Test
 from FNFTpy import print_fnft_version
 
 options_suite = unittest.TestLoader().loadTestsFromTestCase(FnftpyOptionsTest)
+frozen_options_suite = unittest.TestLoader().loadTestsFromTestCase(FrozenOptionsTest)
+results_suite = unittest.TestLoader().loadTestsFromTestCase(ResultsDictInterfaceTest)
 
 kdvv_suite = unittest.TestLoader().loadTestsFromTestCase(KdvvExampleTest)
 kdvv_bound_states_mex4 = unittest.TestLoader().loadTestsFromTestCase(KdvvExampleTestMex4BoundStates)
@@ -59,6 +67,13 @@ nsev_suite2 = unittest.TestLoader().loadTestsFromTestCase(NsevDstCstInputTest)
 nsev_suite3 = unittest.TestLoader().loadTestsFromTestCase(NsevExampleTestBoundStateGuesses)
 nsev_suite4 = unittest.TestLoader().loadTestsFromTestCase(NsevExampleTestBoundStateGuessesMex4)
 nsev_suite5 = unittest.TestLoader().loadTestsFromTestCase(NsevExampleTestRF)
+nsev_suite6 = unittest.TestLoader().loadTestsFromTestCase(NsevThreadSafetyTest)
+nsev_suite7 = unittest.TestLoader().loadTestsFromTestCase(NsevPlanTest)
+nsev_suite8 = unittest.TestLoader().loadTestsFromTestCase(NsevOutputArrayTest)
+nsev_suite9 = unittest.TestLoader().loadTestsFromTestCase(NsevInputArrayTest)
+nsev_suite10 = unittest.TestLoader().loadTestsFromTestCase(NsevParallelSegmentsTest)
+nsev_suite11 = unittest.TestLoader().loadTestsFromTestCase(NsevPartitionedBoundStatesTest)
+nsev_suite12 = unittest.TestLoader().loadTestsFromTestCase(NsevCoarseToFineTest)
 
 nsev_inverse_suite1 = unittest.TestLoader().loadTestsFromTestCase(NsevInverseExample)
 nsev_inverse_suite2 = unittest.TestLoader().loadTestsFromTestCase(NsevInverseExample2)
@@ -66,8 +81,27 @@ nsev_inverse_suite3 = unittest.TestLoader().loadTestsFromTestCase(NsevInverseExa
 nsev_inverse_suite4 = unittest.TestLoader().loadTestsFromTestCase(NsevInverseExampleMex3)
 nsev_inverse_suite5 = unittest.TestLoader().loadTestsFromTestCase(NsevInverseInputVariation)
 
+batch_suite1 = unittest.TestLoader().loadTestsFromTestCase(NsevBatchTest)
+batch_suite2 = unittest.TestLoader().loadTestsFromTestCase(KdvvManakovvBatchTest)
+batch_suite3 = unittest.TestLoader().loadTestsFromTestCase(SpectrumBatchTest)
+batch_suite4 = unittest.TestLoader().loadTestsFromTestCase(ProcessBatchTest)
+async_suite = unittest.TestLoader().loadTestsFromTestCase(AsyncTransformTest)
+streaming_suite1 = unittest.TestLoader().loadTestsFromTestCase(StreamFramesTest)
+streaming_suite2 = unittest.TestLoader().loadTestsFromTestCase(NsevStreamTest)
+spectrogram_suite = unittest.TestLoader().loadTestsFromTestCase(NsevSpectrogramTest)
+incremental_suite = unittest.TestLoader().loadTestsFromTestCase(IncrementalNsevTest)
+transfer_matrix_suite = unittest.TestLoader().loadTestsFromTestCase(ContinuousSpectrumXiTest)
+zoom_suite = unittest.TestLoader().loadTestsFromTestCase(NsevZoomTest)
+chunked_suite = unittest.TestLoader().loadTestsFromTestCase(ChunkedXiTest)
+tracking_suite = unittest.TestLoader().loadTestsFromTestCase(BoundStateTrackerTest)
+bound_states_suite = unittest.TestLoader().loadTestsFromTestCase(DiscreteSpectrumSkipTest)
+adaptive_suite = unittest.TestLoader().loadTestsFromTestCase(AdaptiveResolutionTest)
+padding_suite = unittest.TestLoader().loadTestsFromTestCase(PadPow2Test)
+
 suite = unittest.TestSuite([
                             options_suite,
+                            frozen_options_suite,
+                            results_suite,
                             kdvv_suite,
                             kdvv_bound_states_mex4,
                             kdvv_newton_bound_suite,
@@ -82,11 +116,34 @@ suite = unittest.TestSuite([
                             nsev_suite3,
                             nsev_suite4,
                             nsev_suite5,
+                            nsev_suite6,
+                            nsev_suite7,
+                            nsev_suite8,
+                            nsev_suite9,
+                            nsev_suite10,
+                            nsev_suite11,
+                            nsev_suite12,
                             nsev_inverse_suite1,
                             nsev_inverse_suite2,
                             nsev_inverse_suite3,
                             nsev_inverse_suite4,
-                            nsev_inverse_suite5
+                            nsev_inverse_suite5,
+                            batch_suite1,
+                            batch_suite2,
+                            batch_suite3,
+                            batch_suite4,
+                            async_suite,
+                            streaming_suite1,
+                            streaming_suite2,
+                            spectrogram_suite,
+                            incremental_suite,
+                            transfer_matrix_suite,
+                            zoom_suite,
+                            chunked_suite,
+                            tracking_suite,
+                            bound_states_suite,
+                            adaptive_suite,
+                            padding_suite
                             ])
 
 print_fnft_version()
@@ -42,7 +42,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/xmhk/FNFTpy",
-    packages=find_packages(exclude=('examples', 'testfunctions')),
+    packages=find_packages(exclude=('examples', 'testfunctions', 'benchmarks')),
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
@@ -28,10 +28,25 @@ Christoph Mahnke, 2018-2023
 """
 
 from .kdvv_tests import KdvvExampleTest, KdvvExampleTestMex4BoundStates, KdvvExampleTestProvideBoundStateGuesses
-from .nsev_tests import NsevExampleTest, NsevDstCstInputTest, NsevExampleTestBoundStateGuesses, NsevExampleTestBoundStateGuessesMex4, NsevExampleTestRF
+from .nsev_tests import NsevExampleTest, NsevDstCstInputTest, NsevExampleTestBoundStateGuesses, NsevExampleTestBoundStateGuessesMex4, NsevExampleTestRF, \
+    NsevThreadSafetyTest, NsevPlanTest, NsevOutputArrayTest, NsevInputArrayTest, NsevParallelSegmentsTest, \
+    NsevPartitionedBoundStatesTest, NsevCoarseToFineTest
 from .nsep_tests import NsepExampleTest, NsepExampleTest_priorNewton, NsepExampleTestNewtonProvideGuesses
 from .manakovv_tests import ManakovvExampleTest, ManakovvMexExampleTest, ManakovvProvideBoundStateGuessesTest
 from .nsep_tests import NsepExampleTest
 from .nsev_inverse_tests import NsevInverseExample, NsevInverseExample2, NsevInverseExampleMex1,NsevInverseExampleMex3, NsevInverseInputVariation
-from .options_tests import FnftpyOptionsTest
+from .options_tests import FnftpyOptionsTest, FrozenOptionsTest
+from .results_tests import ResultsDictInterfaceTest
+from .batch_tests import NsevBatchTest, KdvvManakovvBatchTest, SpectrumBatchTest, ProcessBatchTest
+from .async_tests import AsyncTransformTest
+from .streaming_tests import StreamFramesTest, NsevStreamTest
+from .spectrogram_tests import NsevSpectrogramTest
+from .incremental_tests import IncrementalNsevTest
+from .transfer_matrix_tests import ContinuousSpectrumXiTest
+from .zoom_tests import NsevZoomTest
+from .chunked_tests import ChunkedXiTest
+from .tracking_tests import BoundStateTrackerTest
+from .bound_states_tests import DiscreteSpectrumSkipTest
+from .adaptive_tests import AdaptiveResolutionTest
+from .padding_tests import PadPow2Test
 from .array_test import relnorm
@@ -0,0 +1,117 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, nsev_adaptive, kdvv_adaptive, manakovv_adaptive, NsevResult, get_nsev_options
+from FNFTpy.adaptive import resample, _adaptive
+
+
+class AdaptiveResolutionTest(unittest.TestCase):
+    """Testcase for the adaptive choice of the number of samples."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-20, 20, 1000)
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+
+    def test_resample(self):
+        t = np.linspace(-10, 10, 256)
+        q = np.exp(-t ** 2) * np.exp(1.0j * t)
+        for D in [512, 1000, 128]:
+            with self.subTest(D=D):
+                tr = -10 + np.arange(D) * (256 * (t[1] - t[0]) / D)
+                self.assertTrue(np.max(np.abs(resample(q, D) - np.exp(-tr ** 2) * np.exp(1.0j * tr))) < 1e-12)
+        self.assertTrue(np.allclose(resample(resample(q, 1024), 256), q, rtol=0, atol=1e-14))
+
+    def test_nsev_adaptive(self):
+        rtol = 1e-5
+        res = nsev_adaptive(self.q, self.tvec, rtol=rtol, M=32, cst=2, richardson=False)
+        meta = res.metadata
+        self.assertTrue(meta['converged'])
+        self.assertEqual(len(meta['error_xi']), 32)
+        self.assertEqual(len(meta['error_bound_states']), res['bound_states_num'])
+        self.assertEqual(len(res['cont_ref']), 32)
+        # compare with a reference of much higher resolution
+        D_ref = 16 * meta['D']
+        t_ref = self.tvec[0] + np.arange(D_ref) * (1000 * (self.tvec[1] - self.tvec[0]) / D_ref)
+        ref = nsev(resample(self.q, D_ref), t_ref, M=32, cst=2)
+        scale = max(np.max(np.abs(res[k])) for k in ['cont_ref', 'cont_a', 'cont_b'])
+        for k in ['cont_ref', 'cont_a', 'cont_b']:
+            self.assertTrue(np.max(np.abs(res[k] - ref[k])) < 2 * rtol * scale, "%s not within tolerance" % k)
+
+    def test_shrink(self):
+        t = np.linspace(-20, 20, 8192)
+        q = 1.3 / np.cosh(t)
+        res = nsev_adaptive(q, t, rtol=1e-3, M=16, richardson=False)
+        self.assertTrue(res.metadata['converged'])
+        self.assertTrue(res.metadata['D'] < 8192)
+        levels = [level['D'] for level in res.metadata['levels']]
+        self.assertEqual(levels[0], 8192)
+        res2 = nsev_adaptive(q, t, rtol=1e-3, M=16, richardson=False, shrink=False)
+        self.assertEqual(res2.metadata['D'], 8192)
+
+    def test_kdvv_manakovv(self):
+        res = kdvv_adaptive(1.5 / np.cosh(self.tvec) ** 2, self.tvec, rtol=1e-6, cst=3)
+        self.assertTrue(res.metadata['converged'])
+        self.assertEqual(len(res.metadata['error_bound_states']), res['bound_states_num'])
+        res = manakovv_adaptive(self.q, 0.5 * self.q, self.tvec, rtol=1e-6, cst=3)
+        self.assertTrue(res.metadata['converged'])
+        self.assertEqual(len(res.metadata['error_xi']), 0)
+
+    def test_metadata_kept(self):
+        res = nsev_adaptive(0.3 * self.q, self.tvec, rtol=1e-4, M=16, pad=True)
+        self.assertTrue(res.metadata['discrete_spectrum']['skipped'])
+        self.assertIn('padding', res.metadata)
+        self.assertIn('error_xi', res.metadata)
+
+    def test_richardson_without_gain(self):
+        # Richardson extrapolation gaining no order (error ~ 1 / D**2 with and without it) must
+        # not be chosen for its smaller assumed error, nor stop the refinement early
+        exact = np.linspace(0.1, 1, 8)
+
+        def call(signals, t, ref):
+            D = len(signals[0])
+            res = NsevResult(get_nsev_options())
+            res.return_value = 0
+            res.cont_ref = exact + 100.0 / D ** 2
+            res.bound_states = np.array([0.5j + 100.0 / D ** 2])
+            return res
+
+        res = _adaptive('nsev', call, [self.q], self.tvec, 1e-6, 0.0, None, 2, 64, 2 ** 20, True)
+        meta = res.metadata
+        self.assertFalse(meta['richardson'])
+        self.assertTrue(meta['converged'])
+        self.assertTrue(np.max(np.abs(res.cont_ref - exact)) <= 1e-6 * np.max(np.abs(res.cont_ref)))
+        self.assertEqual([level['order'] for level in meta['levels'] if level['richardson']], [2.0])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            nsev_adaptive(self.q, self.tvec, ref=1)
+        with self.assertRaises(ValueError):
+            nsev_adaptive(self.q, self.tvec, rtol=0, atol=0)
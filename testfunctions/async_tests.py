@@ -0,0 +1,85 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import asyncio
+import threading
+import unittest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from FNFTpy import nsev, nsev_async, kdvv, kdvv_async, manakovv, manakovv_async, nsep, nsep_async, \
+    nsev_inverse_async, set_async_concurrency
+
+
+class AsyncTransformTest(unittest.IsolatedAsyncioTestCase):
+    """Testcase for the asyncio front-end: results must equal the synchronous calls."""
+
+    def setUp(self):
+        D = 256
+        self.tvec = np.linspace(-10, 10, D)
+        self.signals = [a / np.cosh(self.tvec) + 0.0j for a in [0.5, 1.3, 2.4, 3.1]]
+
+    def assertResultsEqual(self, r1, r2):
+        self.assertEqual(sorted(r1.keys()), sorted(r2.keys()))
+        for k in r1.keys():
+            if k != 'options':
+                self.assertTrue(np.array_equal(r1[k], r2[k]), "%s differs" % k)
+
+    async def test_gather(self):
+        res = await asyncio.gather(*[nsev_async(q, self.tvec, M=32, dst=2) for q in self.signals])
+        for q, r in zip(self.signals, res):
+            self.assertResultsEqual(r, nsev(q, self.tvec, M=32, dst=2))
+
+    async def test_other_transforms(self):
+        q = self.signals[1]
+        self.assertResultsEqual(await kdvv_async(q.real, self.tvec, M=32), kdvv(q.real, self.tvec, M=32))
+        self.assertResultsEqual(await manakovv_async(q, 0.5 * q, self.tvec, M=32),
+                                manakovv(q, 0.5 * q, self.tvec, M=32))
+        self.assertResultsEqual(await nsep_async(q, 0, 10, K=10, M=10), nsep(q, 0, 10, K=10, M=10))
+        xivec = np.linspace(-2, 2, 64)
+        res = await nsev_inverse_async(xivec, self.tvec, np.zeros(64, dtype=np.complex128), None, None, cst=0)
+        self.assertEqual(res['q'].shape, self.tvec.shape)
+
+    async def test_cancel_queued(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        blocker = threading.Event()
+        executor.submit(blocker.wait)  # occupy the only thread
+        task = asyncio.ensure_future(nsev_async(self.signals[0], self.tvec, executor=executor))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        blocker.set()
+        executor.shutdown(wait=True)
+
+    async def test_concurrency_limit(self):
+        set_async_concurrency(2)
+        res = await asyncio.gather(*[nsev_async(q, self.tvec, M=32) for q in self.signals])
+        self.assertEqual(len(res), len(self.signals))
+        with self.assertRaises(ValueError):
+            set_async_concurrency(0)
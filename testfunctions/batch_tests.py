@@ -0,0 +1,172 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, nsev_batch, kdvv, kdvv_batch, manakovv, manakovv_batch, SpectrumBatch
+
+
+class NsevBatchTest(unittest.TestCase):
+    """Testcase for nsev_batch: results must equal row-wise calls of nsev."""
+
+    def setUp(self):
+        D = 256
+        self.tvec = np.linspace(-10, 10, D)
+        # sech pulses with different numbers of bound states (0 ... 3)
+        self.amplitudes = [0.3, 1.2, 2.4, 3.6, 0.8, 1.7]
+        self.Q = np.array([a / np.cosh(self.tvec) for a in self.amplitudes], dtype=np.complex128)
+        self.res_batch = nsev_batch(self.Q, self.tvec, M=32, dst=2, cst=2, workers=3)
+        self.res_single = [nsev(q, self.tvec, M=32, dst=2, cst=2, skip_empty_disc=False) for q in self.Q]
+
+    def test_nsev_batch(self):
+        offsets = self.res_batch['offsets']
+        for i, res in enumerate(self.res_single):
+            with self.subTest(row=i):
+                self.assertEqual(self.res_batch['return_value'][i], res['return_value'])
+                self.assertEqual(self.res_batch['bound_states_num'][i], res['bound_states_num'])
+                for k in ['bound_states', 'disc_norm', 'disc_res']:
+                    self.assertTrue(np.array_equal(self.res_batch[k][offsets[i]:offsets[i + 1]], res[k]),
+                                    "%s differs" % k)
+                for k in ['cont_ref', 'cont_a', 'cont_b']:
+                    self.assertTrue(np.array_equal(self.res_batch[k][i], res[k]), "%s differs" % k)
+
+    def test_nsev_batch_sequential(self):
+        res_seq = nsev_batch(self.Q, self.tvec, M=32, dst=2, cst=2, workers=1)
+        for k in ['return_value', 'offsets', 'bound_states', 'disc_norm', 'cont_ref']:
+            self.assertTrue(np.array_equal(res_seq[k], self.res_batch[k]), "%s differs" % k)
+
+
+class KdvvManakovvBatchTest(unittest.TestCase):
+    """Testcase for kdvv_batch and manakovv_batch: results must equal row-wise calls."""
+
+    def setUp(self):
+        D = 256
+        self.tvec = np.linspace(-10, 10, D)
+        self.U = np.array([a / np.cosh(self.tvec) ** 2 for a in [0.5, 2.0, 4.5]])
+        self.Q1 = np.array([a / np.cosh(self.tvec) for a in [0.5, 1.5, 2.5]], dtype=np.complex128)
+        self.Q2 = 0.5 * self.Q1
+
+    def test_kdvv_batch(self):
+        res_batch = kdvv_batch(self.U, self.tvec, M=32, workers=2)
+        offsets = res_batch['offsets']
+        for i, u in enumerate(self.U):
+            res = kdvv(u, self.tvec, M=32)
+            self.assertTrue(np.array_equal(res_batch['cont_ref'][i], res['cont_ref']))
+            self.assertTrue(np.array_equal(res_batch['bound_states'][offsets[i]:offsets[i + 1]], res['bound_states']))
+
+    def test_manakovv_batch(self):
+        res_batch = manakovv_batch(self.Q1, self.Q2, self.tvec, M=32, workers=2)
+        offsets = res_batch['offsets']
+        for i in range(len(self.Q1)):
+            res = manakovv(self.Q1[i], self.Q2[i], self.tvec, M=32)
+            self.assertTrue(np.array_equal(res_batch['cont_ref1'][i], res['cont_ref1']))
+            self.assertTrue(np.array_equal(res_batch['cont_ref2'][i], res['cont_ref2']))
+            self.assertTrue(np.array_equal(res_batch['bound_states'][offsets[i]:offsets[i + 1]], res['bound_states']))
+
+
+class SpectrumBatchTest(unittest.TestCase):
+    """Testcase for SpectrumBatch: selection, filtering and concatenation of ragged spectra."""
+
+    def setUp(self):
+        # 4 signals with 2, 0, 3, 1 bound states, M = 5
+        counts = np.array([2, 0, 3, 1])
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        bound_states = np.arange(6) * (0.1 + 0.5j)
+        disc_norm = np.arange(6) + 100.0j
+        cont_ref = np.arange(20, dtype=np.complex128).reshape(4, 5)
+        self.batch = SpectrumBatch(np.array([0, 0, 1, 0]), offsets,
+                                   {'bound_states': bound_states, 'disc_norm': disc_norm},
+                                   {'cont_ref': cont_ref})
+        self.rows = [{'bound_states': bound_states[offsets[i]:offsets[i + 1]],
+                      'disc_norm': disc_norm[offsets[i]:offsets[i + 1]],
+                      'cont_ref': cont_ref[i]} for i in range(4)]
+
+    def assertRowsEqual(self, batch, rows):
+        self.assertEqual(len(batch), len(rows))
+        for i, row in enumerate(rows):
+            res = batch.row(i)
+            self.assertEqual(res['bound_states_num'], len(row['bound_states']))
+            for k in ['bound_states', 'disc_norm', 'cont_ref']:
+                self.assertTrue(np.array_equal(res[k], row[k]), "%s differs in row %d" % (k, i))
+
+    def test_dict_interface(self):
+        self.assertTrue(np.array_equal(self.batch['bound_states_num'], [2, 0, 3, 1]))
+        self.assertTrue(self.batch['cont_ref'] is self.batch.continuous['cont_ref'])
+        self.assertTrue('disc_norm' in self.batch)
+        self.assertFalse('disc_res' in self.batch)
+        with self.assertRaises(KeyError):
+            self.batch['disc_res']
+        self.assertTrue(np.array_equal(self.batch.entry_rows(), [0, 0, 2, 2, 2, 3]))
+
+    def test_select(self):
+        self.assertRowsEqual(self.batch.select([2, 0]), [self.rows[2], self.rows[0]])
+        selected = self.batch.select(self.batch.return_value == 0)
+        self.assertRowsEqual(selected, [self.rows[0], self.rows[1], self.rows[3]])
+        self.assertTrue(np.array_equal(selected.row_ids, [0, 1, 3]))
+        self.assertEqual(len(self.batch.select([])), 0)
+
+    def test_filter_bound_states(self):
+        filtered = self.batch.filter_bound_states(self.batch.bound_states.imag > 1.2)
+        self.assertTrue(np.array_equal(filtered.bound_states_num, [0, 0, 2, 1]))
+        self.assertTrue(np.array_equal(filtered.row(2)['disc_norm'], self.rows[2]['disc_norm'][1:]))
+        self.assertTrue(filtered['cont_ref'] is self.batch['cont_ref'])
+
+    def test_concatenate(self):
+        joined = SpectrumBatch.concatenate([self.batch.select([3]), self.batch, self.batch.select([1, 2])])
+        self.assertRowsEqual(joined, [self.rows[3]] + self.rows + [self.rows[1], self.rows[2]])
+        self.assertTrue(np.array_equal(joined.row_ids, [3, 0, 1, 2, 3, 1, 2]))
+        other = SpectrumBatch(np.zeros(1), [0, 0], {'bound_states': np.zeros(0)}, {})
+        with self.assertRaises(ValueError):
+            SpectrumBatch.concatenate([self.batch, other])
+
+
+class ProcessBatchTest(unittest.TestCase):
+    """Testcase for the process pool backend: results must equal the thread pool backend."""
+
+    def setUp(self):
+        D = 256
+        self.tvec = np.linspace(-10, 10, D)
+        self.Q = np.array([a / np.cosh(self.tvec) for a in [0.3, 1.2, 2.4, 3.6, 1.7]], dtype=np.complex128)
+        self.res_thread = nsev_batch(self.Q, self.tvec, M=32, dst=2, cst=2, workers=2)
+
+    def check_backend(self, mp_context):
+        res = nsev_batch(self.Q, self.tvec, M=32, dst=2, cst=2, workers=2, backend='process', mp_context=mp_context)
+        for k in ['return_value', 'offsets', 'bound_states', 'disc_norm', 'disc_res', 'cont_ref', 'cont_a',
+                  'cont_b']:
+            self.assertTrue(np.array_equal(res[k], self.res_thread[k]), "%s differs" % k)
+
+    def test_fork(self):
+        self.check_backend('fork')
+
+    def test_spawn(self):
+        self.check_backend('spawn')
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            nsev_batch(self.Q, self.tvec, backend='gpu')
@@ -0,0 +1,94 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, kdvv, manakovv
+from FNFTpy.bound_states import discrete_spectrum_check
+
+
+class DiscreteSpectrumSkipTest(unittest.TestCase):
+    """Testcase for skipping the bound state search of signals which provably have no bound states."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-20, 20, 1024)
+        self.sech = 1 / np.cosh(self.tvec)
+
+    def check_skipped(self, res, reason, fields):
+        self.assertEqual(res['bound_states_num'], 0)
+        for k in ['bound_states'] + fields:
+            self.assertEqual(len(res[k]), 0, "%s not empty" % k)
+        self.assertTrue(res.metadata['discrete_spectrum']['skipped'])
+        self.assertEqual(res.metadata['discrete_spectrum']['reason'], reason)
+
+    def test_check(self):
+        dt = self.tvec[1] - self.tvec[0]
+        for amplitude, skipped in [(0.4, True), (0.6, False)]:
+            with self.subTest(amplitude=amplitude):
+                decision = discrete_spectrum_check('nsev', (amplitude * self.sech,), -20, 20)
+                self.assertEqual(decision['skipped'], skipped)
+                self.assertAlmostEqual(decision['l1_norm'], amplitude * np.pi, delta=dt)
+        self.assertEqual(discrete_spectrum_check('nsev', (self.sech,), -20, 20, kappa=-1)['reason'], 'defocusing')
+        self.assertEqual(discrete_spectrum_check('kdvv', (-self.sech,), -20, 20)['reason'], 'nonpositive')
+        self.assertFalse(discrete_spectrum_check('kdvv', (self.sech,), -20, 20)['skipped'])
+        with self.assertRaises(ValueError):
+            discrete_spectrum_check('nsep', (self.sech,), -20, 20)
+
+    def test_nsev(self):
+        for kappa, amplitude, reason in [(-1, 1.3, 'defocusing'), (1, 0.3, 'l1_norm')]:
+            with self.subTest(kappa=kappa, amplitude=amplitude):
+                q = amplitude * self.sech
+                res1 = nsev(q, self.tvec, M=64, kappa=kappa, dst=2, cst=2)
+                self.check_skipped(res1, reason, ['disc_norm', 'disc_res'])
+                self.assertEqual(res1.options.discspec_type, 2)
+                res2 = nsev(q, self.tvec, M=64, kappa=kappa, dst=2, cst=2, skip_empty_disc=False)
+                self.assertIsNone(res2.metadata)
+                for k in ['cont_ref', 'cont_a', 'cont_b']:
+                    self.assertTrue(np.array_equal(res1[k], res2[k]), "%s differs" % k)
+        res = nsev(1.3 * self.sech, self.tvec, M=64, dst=0)
+        self.assertFalse(res.metadata['discrete_spectrum']['skipped'])
+        self.assertIsNone(nsev(0.3 * self.sech, self.tvec, M=64, dst=3).metadata)
+        res = nsev(0.3 * self.sech, self.tvec, M=64, parallel_segments=4)
+        self.check_skipped(res, 'l1_norm', ['disc_norm'])
+        self.assertEqual(res.metadata['parallel_segments'], 4)
+
+    def test_kdvv(self):
+        res = kdvv(-self.sech, self.tvec, M=64, dst=2)
+        self.check_skipped(res, 'nonpositive', ['disc_norm', 'disc_res'])
+        res = kdvv(self.sech, self.tvec, M=64)
+        self.assertFalse(res.metadata['discrete_spectrum']['skipped'])
+
+    def test_manakovv(self):
+        for kappa, amplitude, reason in [(-1, 1.3, 'defocusing'), (1, 0.3, 'l1_norm')]:
+            with self.subTest(kappa=kappa, amplitude=amplitude):
+                q = amplitude * self.sech
+                res = manakovv(q, q, self.tvec, M=64, kappa=kappa, dst=1)
+                self.check_skipped(res, reason, ['disc_res'])
+        res = manakovv(self.sech, self.sech, self.tvec, M=64)
+        self.assertFalse(res.metadata['discrete_spectrum']['skipped'])
@@ -0,0 +1,123 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from .array_test import relnorm
+from FNFTpy import nsev, kdvv, manakovv, nsev_chunked, kdvv_chunked, manakovv_chunked, NsevPlan, get_nsev_options
+from FNFTpy.chunked import xi_chunks, chunk_size_from_budget, run_xi_chunks
+
+
+class ChunkedXiTest(unittest.TestCase):
+    """Testcase for the xi-chunked continuous spectrum: must equal a single call."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-10, 10, 512)
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+        self.M = 1001
+        self.res = nsev(self.q, self.tvec, M=self.M, cst=2)
+
+    def check_nsev(self, res):
+        for k in ['cont_ref', 'cont_a', 'cont_b']:
+            self.assertTrue(relnorm(self.res[k], res[k]) < 1e-10, "%s differs" % k)
+        self.assertEqual(res['bound_states_num'], self.res['bound_states_num'])
+        self.assertTrue(np.allclose(np.sort_complex(res['bound_states']), np.sort_complex(self.res['bound_states'])))
+
+    def test_xi_chunks(self):
+        for M, chunk_size in [(1001, 100), (10, 3), (5, 1), (2, 7)]:
+            chunks = xi_chunks(M, chunk_size)
+            self.assertEqual(chunks[0][0], 0)
+            self.assertEqual(chunks[-1][1], M)
+            for (a, b), (c, d) in zip(chunks[:-1], chunks[1:]):
+                self.assertEqual(b, c)
+            length = chunks[0][1] - chunks[0][0]
+            self.assertTrue(min(2, M) <= length <= max(2, chunk_size))
+            for a, b in chunks[:-1]:
+                self.assertEqual(b - a, length)
+            self.assertTrue(1 <= chunks[-1][1] - chunks[-1][0] <= length)
+        self.assertEqual(chunk_size_from_budget(16 * 3 * 100, 3), 100)
+        self.assertEqual(chunk_size_from_budget(16 * 3 * 100, 3, workers=4), 25)
+
+    def test_parallel(self):
+        res = nsev_chunked(self.q, self.tvec, M=self.M, cst=2, workers=4, chunk_size=97)
+        self.check_nsev(res)
+        self.assertEqual(res.metadata['xi_chunks'], len(xi_chunks(self.M, 97)))
+
+    def test_single_plan(self):
+        # the last chunk is shorter, it is padded to the length of the plan
+        chunks = xi_chunks(self.M, 120)
+        self.assertNotEqual(chunks[-1][1] - chunks[-1][0], chunks[0][1] - chunks[0][0])
+        lengths = []
+        options = get_nsev_options(dst=3, cst=2)
+
+        def make_plan(m):
+            lengths.append(m)
+            return NsevPlan(len(self.q), self.tvec[0], self.tvec[-1], -2, 2, m, 1, 1, options)
+
+        out = np.empty((3, self.M), dtype=np.complex128)
+        run_xi_chunks(make_plan, [self.q], -2, 2, self.M, ['cont_ref', 'cont_a', 'cont_b'], chunks, out)
+        self.assertEqual(lengths, [chunks[0][1] - chunks[0][0]])
+        for k, name in enumerate(['cont_ref', 'cont_a', 'cont_b']):
+            self.assertTrue(relnorm(self.res[name], out[k]) < 1e-10, "%s differs" % name)
+
+    def test_sequential_memory_budget(self):
+        res = nsev_chunked(self.q, self.tvec, M=self.M, cst=2, workers=1, memory_budget=16 * 3 * 100)
+        self.check_nsev(res)
+        self.assertTrue(res.metadata['chunk_size'] <= 100)
+
+    def test_memmap_output(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = np.memmap(os.path.join(tmpdir, 'cont.dat'), dtype=np.complex128, mode='w+', shape=(3, self.M))
+            res = nsev_chunked(self.q, self.tvec, M=self.M, cst=2, workers=1, chunk_size=128, out=out)
+            self.check_nsev(res)
+            self.assertTrue(np.shares_memory(res['cont_b'], out))
+            del res, out
+        with self.assertRaises(ValueError):
+            nsev_chunked(self.q, self.tvec, M=self.M, cst=2, out=np.zeros((1, self.M), dtype=np.complex128))
+
+    def test_skip_discrete_spectrum(self):
+        res = nsev_chunked(self.q, self.tvec, M=self.M, dst=3, chunk_size=200)
+        self.assertEqual(res['bound_states_num'], 0)
+        self.assertNotIn('disc_norm', res)
+        self.assertTrue(relnorm(self.res['cont_ref'], res['cont_ref']) < 1e-10)
+
+    def test_kdvv_manakovv(self):
+        u = 2.0 / np.cosh(self.tvec) ** 2
+        res = kdvv(u, self.tvec, M=200, cst=2)
+        res_c = kdvv_chunked(u, self.tvec, M=200, cst=2, chunk_size=30)
+        for k in ['cont_ref', 'cont_a', 'cont_b']:
+            self.assertTrue(relnorm(res[k], res_c[k]) < 1e-8, "%s differs" % k)
+        q2 = 0.5 / np.cosh(self.tvec - 1)
+        res = manakovv(self.q, q2, self.tvec, M=200, cst=2)
+        res_c = manakovv_chunked(self.q, q2, self.tvec, M=200, cst=2, chunk_size=30)
+        for k in ['cont_ref1', 'cont_ref2', 'cont_a', 'cont_b1', 'cont_b2']:
+            self.assertTrue(relnorm(res[k], res_c[k]) < 1e-8, "%s differs" % k)
+        self.assertEqual(res['bound_states_num'], res_c['bound_states_num'])
@@ -0,0 +1,83 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from .array_test import relnorm
+from FNFTpy import nsev, IncrementalNsev, get_nsev_options
+
+
+class IncrementalNsevTest(unittest.TestCase):
+    """Testcase for IncrementalNsev: spectra after edits and appends must equal nsev of the whole signal."""
+
+    def setUp(self):
+        D = 1001
+        self.tvec = np.linspace(-20, 20, D)
+        self.dt = self.tvec[1] - self.tvec[0]
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+        self.inc = IncrementalNsev(self.q, self.tvec, segment_len=64, M=32,
+                                   options=get_nsev_options(dis=1, cst=2))
+
+    def check_spectrum(self, q, res):
+        tvec = self.tvec[0] + np.arange(len(q)) * self.dt
+        ref = nsev(q, tvec, M=32, dis=1, cst=2)
+        self.assertEqual(res['return_value'], 0)
+        for k in ['cont_ref', 'cont_a', 'cont_b']:
+            self.assertTrue(relnorm(ref[k], res[k]) < 1e-10, "%s differs" % k)
+
+    def test_initial(self):
+        self.check_spectrum(self.q, self.inc.result())
+        self.assertEqual(self.inc.nsegments, 16)
+
+    def test_update(self):
+        q = self.q.copy()
+        q[300:310] = 0.5
+        res = self.inc.update(slice(300, 310), q[300:310])
+        self.check_spectrum(q, res)
+        self.assertEqual(res.metadata['recomputed'], 1)
+        q[100:180] = 0.0
+        res = self.inc.update(100, q[100:180])
+        self.check_spectrum(q, res)
+        self.assertEqual(res.metadata['recomputed'], 2)
+        self.assertTrue(np.array_equal(self.inc.samples, q))
+
+    def test_append(self):
+        q = self.q
+        for n in [500, 1, 63, 2000]:
+            new = 0.2 * np.exp(1.0j * np.arange(n))
+            q = np.concatenate([q, new])
+            res = self.inc.append(new)
+            self.check_spectrum(q, res)
+        self.assertEqual(self.inc.nsegments, len(q) // 64 + (len(q) % 64 > 1))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.inc.update(slice(995, 1005), np.zeros(10))
+        with self.assertRaises(ValueError):
+            self.inc.update(slice(0, 10, 2), np.zeros(5))
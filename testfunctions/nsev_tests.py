@@ -29,9 +29,14 @@ Christoph Mahnke, 2018-2023
 
 import unittest
 import numpy as np
+import array
+from concurrent.futures import ThreadPoolExecutor
 from .array_test import relnorm, check_boolarray
 from examples import nsev_example
-from FNFTpy import nsev
+from FNFTpy import nsev, nsev_wrapper, get_nsev_options, NsevPlan, compose_ab
+from FNFTpy.fnft_nsev_wrapper import nsev_coarse_to_fine
+from FNFTpy.auxiliary import as_input_array
+from FNFTpy.bound_states import merge_bound_states, full_filter_box
 
 
 class NsevExampleTest(unittest.TestCase):
@@ -210,3 +215,280 @@ class NsevDstCstInputTest(unittest.TestCase):
         for k in expected.keys():
             with self.subTest(key=k):
                 self.assertTrue(check_boolarray(self.res[k], expected[k]), "unexpected output")
+
+
+class NsevThreadSafetyTest(unittest.TestCase):
+    """Testcase for concurrent calls of nsev with different spectrum types."""
+
+    def setUp(self):
+        D = 512
+        tvec = np.linspace(-8, 8, D)
+        q = 2.3 / np.cosh(tvec) + 0.0j
+        self.settings = [(cst, dst) for cst in [0, 1, 2, 3] for dst in [0, 1, 2, 3]] * 4
+
+        def single_call(setting):
+            return nsev(q, tvec, M=64, cst=setting[0], dst=setting[1])
+
+        self.res_sequential = [single_call(s) for s in self.settings]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.res_concurrent = list(executor.map(single_call, self.settings))
+
+    def test_concurrent_equals_sequential(self):
+        for setting, r1, r2 in zip(self.settings, self.res_sequential, self.res_concurrent):
+            with self.subTest(cst=setting[0], dst=setting[1]):
+                self.assertEqual(r2['return_value'], 0, "FNFT nsev return value not 0")
+                self.assertEqual(sorted(r1.keys()), sorted(r2.keys()), "result fields differ")
+                for k in r1.keys():
+                    if k != 'options':
+                        self.assertTrue(np.array_equal(r1[k], r2[k]), "%s differs" % k)
+
+
+class NsevPlanTest(unittest.TestCase):
+    """Testcase for repeated execution of a NsevPlan."""
+
+    def setUp(self):
+        D = 512
+        M = 64
+        K = D
+        self.tvec = np.linspace(-8, 8, D)
+        self.signals = [a / np.cosh(self.tvec) + 0.0j for a in [1.3, 2.3, 0.4, 2.3]]
+        options = get_nsev_options(dst=2, cst=2)
+        self.res_wrapper = [nsev_wrapper(D, q, self.tvec[0], self.tvec[-1], -10, 10, M, K, 1, options)
+                            for q in self.signals]
+        plan = NsevPlan(D, self.tvec[0], self.tvec[-1], -10, 10, M, K, 1, options)
+        self.res_plan = [plan.execute(q) for q in self.signals]
+
+    def test_plan_equals_wrapper(self):
+        for r1, r2 in zip(self.res_wrapper, self.res_plan):
+            self.assertEqual(r2['return_value'], 0, "FNFT nsev return value not 0")
+            self.assertEqual(sorted(r1.keys()), sorted(r2.keys()), "result fields differ")
+            for k in r1.keys():
+                if k != 'options':
+                    self.assertTrue(np.array_equal(r1[k], r2[k]), "%s differs" % k)
+
+
+class NsevOutputArrayTest(unittest.TestCase):
+    """Testcase for nsev_wrapper writing into caller-supplied output arrays."""
+
+    def setUp(self):
+        self.D = 512
+        self.M = 64
+        self.K = self.D
+        self.tvec = np.linspace(-8, 8, self.D)
+        self.signals = [a / np.cosh(self.tvec) + 0.0j for a in [1.3, 2.3, 0.4]]
+        self.options = get_nsev_options(dst=0, cst=1)
+        self.res_default = [nsev_wrapper(self.D, q, self.tvec[0], self.tvec[-1], -10, 10, self.M, self.K, 1,
+                                         self.options) for q in self.signals]
+        N = len(self.signals)
+        self.cont = np.zeros((N, 2 * self.M), dtype=np.complex128)
+        self.bound_states = np.zeros((N, self.K), dtype=np.complex128)
+        self.disc = np.zeros((N, self.K), dtype=np.complex128)
+        self.res_out = [nsev_wrapper(self.D, q, self.tvec[0], self.tvec[-1], -10, 10, self.M, self.K, 1,
+                                     self.options, out_cont=self.cont[i], out_bound_states=self.bound_states[i],
+                                     out_disc=self.disc[i]) for i, q in enumerate(self.signals)]
+
+    def test_output_arrays(self):
+        for i, (r1, r2) in enumerate(zip(self.res_default, self.res_out)):
+            self.assertEqual(r2['return_value'], 0, "FNFT nsev return value not 0")
+            for k in ['bound_states', 'disc_norm', 'cont_a', 'cont_b']:
+                self.assertTrue(np.array_equal(r1[k], r2[k]), "%s differs" % k)
+            self.assertTrue(np.shares_memory(r2['cont_a'], self.cont[i]), "cont_a not written into out_cont")
+            self.assertTrue(np.shares_memory(r2['bound_states'], self.bound_states[i]),
+                            "bound_states not written into out_bound_states")
+            self.assertTrue(np.shares_memory(r2['disc_norm'], self.disc[i]), "disc_norm not written into out_disc")
+
+    def test_invalid_output_arrays(self):
+        q = self.signals[0]
+        invalid = [np.zeros(self.M, dtype=np.complex128),  # wrong length
+                   np.zeros(2 * self.M, dtype=np.complex64),  # wrong dtype
+                   np.zeros((2 * self.M, 2), dtype=np.complex128)[:, 0],  # not contiguous
+                   list(np.zeros(2 * self.M, dtype=np.complex128))]  # no numpy array
+        for out_cont in invalid:
+            with self.assertRaises(ValueError):
+                nsev_wrapper(self.D, q, self.tvec[0], self.tvec[-1], -10, 10, self.M, self.K, 1,
+                             self.options, out_cont=out_cont)
+
+
+class NsevInputArrayTest(unittest.TestCase):
+    """Testcase for passing the samples as different array and buffer types."""
+
+    def setUp(self):
+        D = 512
+        self.tvec = np.linspace(-8, 8, D)
+        self.q = 2.3 / np.cosh(self.tvec) + 0.0j
+        self.res_reference = nsev(self.q, self.tvec, M=64)
+        self.inputs = {'memoryview': memoryview(self.q),
+                       'bytes': self.q.tobytes(),
+                       'array.array': array.array('d', self.q.real),
+                       'list': list(self.q),
+                       'strided': np.repeat(self.q, 2)[::2]}
+
+    def test_no_copy(self):
+        self.assertTrue(as_input_array(self.q) is self.q, "complex128 C-contiguous array was copied")
+
+    def test_input_types(self):
+        for name, q in self.inputs.items():
+            with self.subTest(input=name):
+                res = nsev(q, self.tvec, M=64)
+                self.assertEqual(res['return_value'], 0, "FNFT nsev return value not 0")
+                self.assertTrue(np.array_equal(res['cont_ref'], self.res_reference['cont_ref']),
+                                "cont_ref differs")
+                self.assertTrue(np.array_equal(res['bound_states'], self.res_reference['bound_states']),
+                                "bound_states differ")
+
+    def test_int8_array(self):
+        # typed byte buffers are converted by value, not read as raw complex128 bytes
+        samples = array.array('b', [0, 1, -2, 3, -4, 5, 1, 0])
+        self.assertTrue(np.array_equal(as_input_array(samples), np.array(samples, dtype=np.complex128)))
+        self.assertTrue(np.array_equal(as_input_array(array.array('B', [1, 2, 3])), [1, 2, 3]))
+        self.assertEqual(len(as_input_array(memoryview(self.q.tobytes()))), len(self.q))
+
+
+class NsevParallelSegmentsTest(unittest.TestCase):
+    """Testcase for the segment-parallel continuous spectrum: results must equal the single call."""
+
+    def setUp(self):
+        D = 4096
+        self.tvec = np.linspace(-20, 20, D)
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+
+    def test_compose_ab(self):
+        # composing with the identity (a=1, b=0) does not change the coefficients
+        a = np.array([0.3 + 0.2j, 1.0 - 0.5j])
+        b = np.array([0.1 - 0.7j, 0.4j])
+        ones, zeros = np.ones(2, dtype=np.complex128), np.zeros(2, dtype=np.complex128)
+        for ab in [compose_ab((a, b), (ones, zeros)), compose_ab((ones, zeros), (a, b))]:
+            self.assertTrue(np.allclose(ab[0], a) and np.allclose(ab[1], b))
+
+    def test_parallel_segments(self):
+        for kappa in [1, -1]:
+            for nseg in [2, 5, 16]:
+                with self.subTest(kappa=kappa, parallel_segments=nseg):
+                    res1 = nsev(self.q, self.tvec, M=64, kappa=kappa, dst=2, cst=2, dis=1)
+                    res2 = nsev(self.q, self.tvec, M=64, kappa=kappa, dst=2, cst=2, dis=1, parallel_segments=nseg)
+                    self.assertEqual(res2['return_value'], 0, "FNFT nsev return value not 0")
+                    self.assertEqual(res2.metadata['parallel_segments'], nseg)
+                    for k in ['cont_ref', 'cont_a', 'cont_b']:
+                        self.assertTrue(relnorm(res1[k], res2[k]) < 1e-10, "%s differs" % k)
+                    for k in ['bound_states', 'disc_norm', 'disc_res']:
+                        self.assertTrue(np.array_equal(res1[k], res2[k]), "%s differs" % k)
+
+    def test_invalid_segments(self):
+        with self.assertRaises(ValueError):
+            nsev(self.q[0:10], self.tvec[0:10], parallel_segments=6)
+
+
+def multi_soliton(tvec, solitons):
+    """Return a sum of separated NSE solitons, solitons: list of (xi, eta, t0), bound state xi + 1j*eta."""
+    q = np.zeros(len(tvec), dtype=np.complex128)
+    for xi, eta, t0 in solitons:
+        q += 2 * eta / np.cosh(2 * eta * (tvec - t0)) * np.exp(-2.0j * xi * tvec)
+    return q
+
+
+class NsevPartitionedBoundStatesTest(unittest.TestCase):
+    """Testcase for the partitioned bound state search: results must equal the search in the whole half plane."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-30, 30, 4096)
+        self.q = multi_soliton(self.tvec, [(-0.6, 0.5, -12), (-0.1, 0.4, 0), (0.3, 0.45, 6), (0.7, 0.6, 14)])
+        self.bb = [-np.inf, np.inf, 0, np.inf]
+
+    def check_equal(self, res1, res2, fields):
+        self.assertEqual(res1['bound_states_num'], res2['bound_states_num'])
+        order1 = np.argsort(res1['bound_states'].real)
+        order2 = np.argsort(res2['bound_states'].real)
+        for k in fields:
+            self.assertTrue(np.allclose(res1[k][order1], res2[k][order2], atol=1e-8), "%s differs" % k)
+
+    def test_partitioned(self):
+        res1 = nsev(self.q, self.tvec, M=64, dst=2, cst=2)
+        bb = full_filter_box(self.q, self.tvec[0], self.tvec[-1])
+        for nboxes in [2, 3, 8]:
+            with self.subTest(bound_state_boxes=nboxes):
+                res2 = nsev(self.q, self.tvec, M=64, dst=2, cst=2, bound_state_boxes=nboxes)
+                self.assertEqual(res2['return_value'], 0, "FNFT nsev return value not 0")
+                self.check_equal(res1, res2, ['bound_states', 'disc_norm', 'disc_res'])
+                for k in ['cont_ref', 'cont_a', 'cont_b']:
+                    self.assertTrue(np.array_equal(res1[k], res2[k]), "%s differs" % k)
+                boxes = res2.metadata['bound_state_boxes']
+                self.assertEqual(boxes[0][0], bb[0])
+                self.assertEqual(boxes[-1][1], bb[1])
+                for box1, box2 in zip(boxes[:-1], boxes[1:]):
+                    self.assertEqual(box1[1], box2[0])
+                self.assertEqual(sum(res2.metadata['bound_states_per_box']), res2['bound_states_num'])
+
+    def test_partitioned_manual(self):
+        res1 = nsev(self.q, self.tvec, M=64, dst=2, cst=2, bsf=3, bb=self.bb)
+        res2 = nsev(self.q, self.tvec, M=64, dst=2, cst=2, bsf=3, bb=self.bb, bound_state_boxes=3)
+        self.check_equal(res1, res2, ['bound_states', 'disc_norm', 'disc_res'])
+        boxes = res2.metadata['bound_state_boxes']
+        self.assertEqual(boxes[0][0], -np.inf)
+        self.assertEqual(boxes[-1][1], np.inf)
+
+    def test_newton_guesses(self):
+        res1 = nsev(self.q, self.tvec, M=64, dst=0)
+        bsg = res1['bound_states'] + 1e-3
+        res1 = nsev(self.q, self.tvec, M=64, dst=0, bsl=1, bsg=bsg)
+        res2 = nsev(self.q, self.tvec, M=64, dst=0, bsl=1, bsg=bsg, bound_state_boxes=4)
+        self.check_equal(res1, res2, ['bound_states', 'disc_norm'])
+
+    def test_merge_bound_states(self):
+        cores = [(-np.inf, 0.0, 0, np.inf), (0.0, np.inf, 0, np.inf)]
+        parts = [{'bound_states': np.array([-1 + 1j, 1e-9 + 0.5j])},
+                 {'bound_states': np.array([-1e-9 + 0.5j, 2 + 1j])}]
+        merged, counts = merge_bound_states(parts, cores)
+        self.assertEqual(len(merged['bound_states']), 3)
+        self.assertEqual(sum(counts), 3)
+
+    def test_invalid_combination(self):
+        with self.assertRaises(ValueError):
+            nsev(self.q, self.tvec, parallel_segments=2, bound_state_boxes=2)
+
+
+class NsevCoarseToFineTest(unittest.TestCase):
+    """Testcase for the coarse-to-fine bound state search: results must agree with the single-stage default."""
+
+    def setUp(self):
+        D = 2 ** 10
+        self.tvec = np.linspace(-32, 32, D)
+        qo = 5.4
+        lam0 = 3.0
+        self.q = np.multiply(qo / np.cosh(self.tvec), np.exp(-2.0j * self.tvec * lam0))
+        self.tvec2 = np.linspace(-30, 30, 4096)
+        self.q2 = multi_soliton(self.tvec2, [(-0.6, 0.5, -12), (-0.1, 0.4, 0), (0.3, 0.45, 6), (0.7, 0.6, 14)])
+
+    def check_close(self, res1, res2, fields, tol=1e-6):
+        self.assertEqual(res1['bound_states_num'], res2['bound_states_num'])
+        order1 = np.lexsort((res1['bound_states'].imag, res1['bound_states'].real))
+        order2 = np.lexsort((res2['bound_states'].imag, res2['bound_states'].real))
+        for k in fields:
+            self.assertTrue(relnorm(res1[k][order1], res2[k][order2]) < tol, "%s differs" % k)
+
+    def test_sech(self):
+        res1 = nsev(self.q, self.tvec, M=64, dst=2, cst=2)
+        for decimation in [2, 4]:
+            with self.subTest(coarse_decimation=decimation):
+                res2 = nsev(self.q, self.tvec, M=64, dst=2, cst=2, coarse_decimation=decimation)
+                self.assertEqual(res2['return_value'], 0, "FNFT nsev return value not 0")
+                self.assertEqual(res2.metadata['decimation'], decimation)
+                self.assertTrue(res2.metadata['candidates'] >= res2['bound_states_num'])
+                self.check_close(res1, res2, ['bound_states', 'disc_norm', 'disc_res'])
+                for k in ['cont_ref', 'cont_a', 'cont_b']:
+                    self.assertTrue(np.array_equal(res1[k], res2[k]), "%s differs" % k)
+
+    def test_workers(self):
+        res1 = nsev(self.q2, self.tvec2, M=64, dst=0, cst=3)
+        for workers in [1, 2, 4]:
+            with self.subTest(workers=workers):
+                res2 = nsev(self.q2, self.tvec2, M=64, dst=0, cst=3, coarse_decimation=4, workers=workers)
+                self.assertTrue(res2.metadata['refine_chunks'] <= workers)
+                self.check_close(res1, res2, ['bound_states', 'disc_norm'])
+
+    def test_invalid_decimation(self):
+        options = get_nsev_options()
+        D = len(self.q)
+        with self.assertRaises(ValueError):
+            nsev_coarse_to_fine(D, self.q, -32, 32, -2, 2, 16, D, 1, options, 1)
+        with self.assertRaises(ValueError):
+            nsev(self.q, self.tvec, bound_state_boxes=2, coarse_decimation=2)
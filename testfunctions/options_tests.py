@@ -29,7 +29,8 @@ Christoph Mahnke, 2018-2023
 
 from FNFTpy import KdvvOptionsStruct, ManakovvOptionsStruct, NsepOptionsStruct, NsevInverseOptionsStruct, \
     NsevOptionsStruct, \
-    get_kdvv_options, get_manakovv_options, get_nsep_options, get_nsev_options, get_nsev_inverse_options
+    get_kdvv_options, get_manakovv_options, get_nsep_options, get_nsev_options, get_nsev_inverse_options, \
+    FrozenOptions
 
 import unittest
 
@@ -73,3 +74,46 @@ class FnftpyOptionsTest(unittest.TestCase):
             opts = self.expected[k][1]()
             with self.subTest('check standard repr of %s' % k):
                 self.assertEqual(repr(opts), self.expected[k][2])
+
+    def test_default_options_cached_copy(self):
+        for k in self.expected.keys():
+            opts1 = self.expected[k][1]()
+            opts2 = self.expected[k][1]()
+            with self.subTest('check get_%s_options returns independent copies' % k):
+                self.assertIsNot(opts1, opts2)
+                opts1.discretization = 1
+                self.assertEqual(repr(opts2), self.expected[k][2])
+                self.assertEqual(repr(self.expected[k][1]()), self.expected[k][2])
+
+
+class FrozenOptionsTest(unittest.TestCase):
+    """test FrozenOptions: immutable, hashable and equal for equal fields."""
+
+    def setUp(self):
+        self.opts = get_nsev_options(dis=4)  # bounding box holds NaN
+        self.frozen = self.opts.freeze()
+
+    def test_frozen_options(self):
+        self.assertIsInstance(self.frozen, FrozenOptions)
+        self.assertIsInstance(self.frozen.struct, NsevOptionsStruct)
+        self.assertEqual(self.frozen, get_nsev_options(dis=4).freeze())
+        self.assertEqual(hash(self.frozen), hash(get_nsev_options(dis=4).freeze()))
+        self.assertNotEqual(self.frozen, get_nsev_options(dis=5).freeze())
+        self.assertNotEqual(self.frozen, get_kdvv_options().freeze())
+        self.assertEqual({self.frozen: 1}[get_nsev_options(dis=4).freeze()], 1)
+        self.assertEqual(repr(self.frozen), repr(self.opts))
+        self.assertEqual(self.frozen.discretization, 4)
+
+    def test_frozen_options_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.frozen.discretization = 5
+        self.opts.discretization = 5  # changing the source struct does not change the frozen copy
+        self.assertEqual(self.frozen.discretization, 4)
+        thawed = self.frozen.thaw()
+        thawed.discretization = 5
+        self.assertEqual(self.frozen.discretization, 4)
+        struct = self.frozen.struct
+        struct.discretization = 5
+        self.assertEqual(self.frozen.discretization, 4)
+        self.assertEqual(self.frozen.struct.discretization, 4)
+        self.assertEqual(self.frozen, get_nsev_options(dis=4).freeze())
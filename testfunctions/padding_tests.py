@@ -0,0 +1,78 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, kdvv, manakovv, pad_pow2
+from FNFTpy.auxiliary import next_pow2
+
+
+class PadPow2Test(unittest.TestCase):
+    """Testcase for zero-padding to a power of two number of samples."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-15, 15, 3000)
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+
+    def test_pad_pow2(self):
+        self.assertEqual([next_pow2(D) for D in [1, 2, 3, 1024, 1025, 100000]], [1, 2, 4, 1024, 2048, 131072])
+        (qp,), T1, T2, padding = pad_pow2([self.q], -15, 15)
+        self.assertEqual(len(qp), 4096)
+        self.assertEqual(padding, (548, 548))
+        self.assertTrue(np.array_equal(qp[548:548 + 3000], self.q))
+        self.assertEqual(np.count_nonzero(qp), 3000)
+        tp = np.linspace(T1, T2, 4096)
+        self.assertTrue(np.allclose(tp[548:548 + 3000], self.tvec, rtol=0, atol=1e-12))
+        (q1, q2), T1, T2, padding = pad_pow2([self.q[:1023], self.q[:1023]], 0, 1)
+        self.assertEqual(padding, (0, 1))
+        self.assertEqual((len(q1), len(q2)), (1024, 1024))
+        qs, T1, T2, padding = pad_pow2([self.q[:512]], 0, 1)
+        self.assertTrue(np.array_equal(qs[0], self.q[:512]))
+        self.assertEqual((T1, T2, padding), (0, 1, (0, 0)))
+
+    def test_transforms(self):
+        (qp,), T1, T2, _ = pad_pow2([self.q], -15, 15)
+        tp = np.linspace(T1, T2, len(qp))
+        calls = {'nsev': lambda q, t, **kw: nsev(q, t, M=32, cst=2, **kw),
+                 'kdvv': lambda q, t, **kw: kdvv(q.real, t, M=32, **kw),
+                 'manakovv': lambda q, t, **kw: manakovv(q, 0.5 * q, t, M=32, cst=2, **kw)}
+        for name, call in calls.items():
+            with self.subTest(transform=name):
+                res1 = call(self.q, self.tvec, pad=True)
+                res2 = call(qp, tp)
+                self.assertEqual(res1.metadata['padding'], (548, 548))
+                for k in res2:
+                    if k != 'options':
+                        self.assertTrue(np.allclose(res1[k], res2[k], rtol=1e-12, atol=1e-12), "%s differs" % k)
+
+    def test_nsev_spectrum_unchanged(self):
+        res1 = nsev(self.q, self.tvec, M=32, cst=1, dst=0)
+        res2 = nsev(self.q, self.tvec, M=32, cst=1, dst=0, pad=True)
+        for k in ['cont_a', 'cont_b', 'bound_states']:
+            self.assertTrue(np.allclose(res1[k], res2[k], rtol=1e-8, atol=1e-10), "%s differs" % k)
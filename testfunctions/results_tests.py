@@ -0,0 +1,82 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, kdvv, NsevResult, KdvvResult, get_nsev_options
+
+
+class ResultsDictInterfaceTest(unittest.TestCase):
+    """Testcase for the dictionary interface of the result objects."""
+
+    def setUp(self):
+        D = 256
+        self.tvec = np.linspace(-8, 8, D)
+        self.q = 1.3 / np.cosh(self.tvec) + 0.0j
+        self.res_nsev = nsev(self.q, self.tvec, M=32, dst=2, cst=1)
+        self.res_kdvv = kdvv(self.q.real, self.tvec, M=32)
+
+    def test_result_types(self):
+        self.assertIsInstance(self.res_nsev, NsevResult)
+        self.assertIsInstance(self.res_kdvv, KdvvResult)
+
+    def test_keys(self):
+        self.assertEqual(sorted(self.res_nsev.keys()),
+                         ['bound_states', 'bound_states_num', 'cont_a', 'cont_b', 'disc_norm', 'disc_res',
+                          'options', 'return_value'])
+        self.assertFalse('cont_ref' in self.res_nsev)
+        self.assertIsNone(self.res_nsev.get('cont_ref'))
+        with self.assertRaises(KeyError):
+            self.res_nsev['cont_ref']
+        self.assertEqual(len(self.res_nsev), len(dict(self.res_nsev)))
+        self.assertTrue(self.res_kdvv['cont'] is self.res_kdvv['cont_ref'])
+
+    def test_items(self):
+        for k, v in self.res_nsev.items():
+            self.assertTrue(self.res_nsev[k] is v or k == 'options')
+        self.assertTrue(self.res_nsev['bound_states'] is self.res_nsev.bound_states)
+
+    def test_lazy_options(self):
+        self.assertIsInstance(self.res_nsev['options'], str)
+        self.assertEqual(self.res_nsev['options'], repr(get_nsev_options(dst=2, cst=1)))
+        self.assertEqual(self.res_nsev.options.contspec_type, 1)
+
+    def test_extra_items(self):
+        self.res_nsev['Xi'] = np.array([-2.0, 2.0])
+        self.assertTrue('Xi' in self.res_nsev)
+        self.assertTrue('Xi' in list(self.res_nsev))
+        del self.res_nsev['Xi']
+        self.assertFalse('Xi' in self.res_nsev)
+
+    def test_trimmed_discrete_spectrum(self):
+        # results using only a small part of the K-sized buffers must not keep these buffers alive
+        for k in ['bound_states', 'disc_norm', 'disc_res']:
+            arr = self.res_nsev[k]
+            if arr.base is not None:
+                self.assertGreaterEqual(2 * arr.size, arr.base.size, "%s keeps oversized buffer" % k)
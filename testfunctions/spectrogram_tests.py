@@ -0,0 +1,83 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import multiprocessing
+import numpy as np
+from FNFTpy import nsev, nsev_spectrogram
+
+
+class NsevSpectrogramTest(unittest.TestCase):
+    """Testcase for nsev_spectrogram: windows must equal nsev of the slices."""
+
+    def setUp(self):
+        D = 2048
+        self.tvec = np.linspace(-50, 50, D)
+        self.q = 1.5 / np.cosh(self.tvec + 25) + 0.8 / np.cosh(2 * (self.tvec - 10)) + 0.0j
+        self.window = 512
+        self.hop = 192
+
+    def check_windows(self, batch, taper, absolute_time):
+        starts = batch.metadata['starts']
+        self.assertEqual(len(batch), (len(self.q) - self.window) // self.hop + 1)
+        self.assertEqual(batch['cont_ref'].shape, (len(batch), 32))
+        for i, start in enumerate(starts):
+            tvec = self.tvec[start:start + self.window]
+            if not absolute_time:
+                tvec = tvec - 0.5 * (tvec[0] + tvec[-1])
+            ref = nsev(self.q[start:start + self.window] * taper, tvec, M=32, dst=2, skip_empty_disc=False)
+            row = batch.row(i)
+            self.assertEqual(row['return_value'], ref['return_value'])
+            for k in ['bound_states', 'disc_norm', 'cont_ref']:
+                self.assertTrue(np.allclose(row[k], ref[k], rtol=1e-9, atol=1e-12), "%s differs in window %d" % (k, i))
+
+    def test_spectrogram(self):
+        batch = nsev_spectrogram(self.q, self.tvec, self.window, self.hop, M=32, dst=2, workers=2)
+        self.check_windows(batch, 1.0, False)
+
+    def test_taper_absolute_time(self):
+        batch = nsev_spectrogram(self.q, self.tvec, self.window, self.hop, M=32, dst=2, taper='hann',
+                                 absolute_time=True, workers=2)
+        self.check_windows(batch, np.hanning(self.window), True)
+
+    def test_process_backend(self):
+        # the untapered windows are strided views of q, the process backend copies them into shared memory
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            self.skipTest("start method 'fork' not available")
+        batch = nsev_spectrogram(self.q, self.tvec, self.window, self.hop, M=32, dst=2, workers=2,
+                                 backend='process', mp_context='fork')
+        self.check_windows(batch, 1.0, False)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            nsev_spectrogram(self.q, self.tvec, len(self.q) + 1, 10)
+        with self.assertRaises(ValueError):
+            nsev_spectrogram(self.q, self.tvec, 64, 10, taper='unknown')
+        with self.assertRaises(ValueError):
+            nsev_spectrogram(self.q, self.tvec, 64, 10, taper=np.ones(63))
@@ -0,0 +1,95 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, stream_frames, nsev_stream
+
+
+class StreamFramesTest(unittest.TestCase):
+    """Testcase for stream_frames: frames must equal slices of the whole signal."""
+
+    def setUp(self):
+        self.x = np.arange(53) + 1.0j
+        self.chunks = [self.x[0:3], self.x[3:4], self.x[4:30], self.x[30:31], self.x[31:]]
+
+    def test_frames(self):
+        for frame_len, hop in [(8, 3), (8, 8), (5, 9), (7, 1)]:
+            with self.subTest(frame_len=frame_len, hop=hop):
+                frames = [(start, frame.copy()) for start, frame in stream_frames(iter(self.chunks), frame_len, hop)]
+                starts = list(range(0, len(self.x) - frame_len + 1, hop))
+                self.assertEqual([f[0] for f in frames], starts)
+                for start, frame in frames:
+                    self.assertTrue(np.array_equal(frame, self.x[start:start + frame_len]))
+
+    def test_lazy(self):
+        consumed = []
+
+        def source():
+            for c in self.chunks:
+                consumed.append(len(c))
+                yield c
+
+        frames = stream_frames(source(), 4, 4)
+        next(frames)
+        self.assertEqual(consumed, [3, 1])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            next(stream_frames(self.chunks, 8, 0))
+
+
+class NsevStreamTest(unittest.TestCase):
+    """Testcase for nsev_stream: results must equal nsev of the frames."""
+
+    def setUp(self):
+        self.dt = 0.05
+        t = np.arange(2000) * self.dt
+        self.x = 1.5 / np.cosh(t - 20) + 0.8 / np.cosh(2 * (t - 60)) + 0.0j
+        self.frame_len = 512
+        self.hop = 256
+
+    def test_nsev_stream(self):
+        chunks = np.array_split(self.x, 17)
+        tvec = (np.arange(self.frame_len) - 0.5 * (self.frame_len - 1)) * self.dt
+        for res in nsev_stream(chunks, self.frame_len, self.hop, self.dt, M=32, dst=2, cst=2):
+            start = res.metadata['start']
+            ref = nsev(self.x[start:start + self.frame_len], tvec, M=32, dst=2, cst=2, skip_empty_disc=False)
+            # the time windows may differ by rounding errors
+            self.assertEqual(res['return_value'], ref['return_value'])
+            for k in ['bound_states', 'disc_norm', 'cont_ref', 'cont_a', 'cont_b']:
+                self.assertTrue(np.allclose(res[k], ref[k], rtol=1e-9, atol=1e-12),
+                                "%s differs in frame %d" % (k, res.metadata['frame']))
+
+    def test_absolute_time(self):
+        for res in nsev_stream([self.x], self.frame_len, self.hop, self.dt, M=32, absolute_time=True):
+            start = res.metadata['start']
+            tvec = (start + np.arange(self.frame_len)) * self.dt
+            ref = nsev(self.x[start:start + self.frame_len], tvec, M=32, skip_empty_disc=False)
+            self.assertTrue(np.allclose(res['cont_ref'], ref['cont_ref'], rtol=1e-9, atol=1e-12))
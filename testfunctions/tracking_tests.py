@@ -0,0 +1,94 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from FNFTpy import nsev, BoundStateTracker, get_nsev_options
+from FNFTpy.tracking import match_bound_states
+
+
+class BoundStateTrackerTest(unittest.TestCase):
+    """Testcase for the warm-started bound state tracking."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-15, 15, 1024)
+
+    def signal(self, amplitude):
+        return amplitude / np.cosh(self.tvec) * np.exp(0.2j * self.tvec)
+
+    def test_sweep(self):
+        tracker = BoundStateTracker('nsev', self.tvec, K=16)
+        for k in range(8):
+            q = self.signal(1.7 + 0.01 * k)
+            res = tracker.step(q)
+            res_full = nsev(q, self.tvec, K=16, cst=3)
+            self.assertEqual(res.metadata['localization'], 'full' if k == 0 else 'newton')
+            self.assertEqual(res['bound_states_num'], res_full['bound_states_num'])
+            self.assertTrue(np.allclose(np.sort_complex(res['bound_states']),
+                                        np.sort_complex(res_full['bound_states']), atol=1e-6))
+            self.assertEqual(list(res.metadata['track_ids']), list(range(res['bound_states_num'])))
+        self.assertEqual((tracker.newton_steps, tracker.full_steps), (7, 1))
+        for steps, values in tracker.trajectories.values():
+            self.assertEqual(list(steps), list(range(8)))
+            self.assertTrue(np.all(np.diff(values.imag) > 0))  # growing amplitude: growing imaginary part
+
+    def test_newton_default_K(self):
+        # the Newton steps use as many guesses as bound states, not K
+        tracker = BoundStateTracker('nsev', self.tvec)
+        for k in range(5):
+            q = self.signal(1.7 + 0.01 * k)
+            res = tracker.step(q)
+            self.assertEqual(res['bound_states_num'], nsev(q, self.tvec, cst=3)['bound_states_num'])
+        self.assertTrue(tracker.newton_steps > 0)
+        self.assertEqual((tracker.newton_steps, tracker.full_steps), (4, 1))
+
+    def test_fallback(self):
+        tracker = BoundStateTracker('nsev', self.tvec, K=16, max_shift=0.1)
+        tracker.step(self.signal(1.7))
+        res = tracker.step(self.signal(2.6))  # jump: the guesses are far off
+        self.assertEqual(res.metadata['localization'], 'full')
+        res_full = nsev(self.signal(2.6), self.tvec, K=16, cst=3)
+        self.assertEqual(res['bound_states_num'], res_full['bound_states_num'])
+        tracker = BoundStateTracker('nsev', self.tvec, K=16, full_search_every=3)
+        localization = [tracker.step(self.signal(1.7 + 0.01 * k)).metadata['localization'] for k in range(6)]
+        self.assertEqual(localization, ['full', 'newton', 'newton', 'full', 'newton', 'newton'])
+
+    def test_match_bound_states(self):
+        previous = np.array([1j, 2 + 1j, -1 + 0.5j])
+        current = np.array([2.01 + 1j, -1 + 0.52j, 5j, 0.01 + 1j])
+        self.assertEqual(list(match_bound_states(previous, current)), [1, 2, -1, 0])
+        self.assertEqual(list(match_bound_states(previous, current, match_tol=0.015)), [1, -1, -1, 0])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            BoundStateTracker('nsep', self.tvec)
+        with self.assertRaises(ValueError):
+            BoundStateTracker('nsev', self.tvec, options=get_nsev_options(dst=3))
+        with self.assertRaises(ValueError):
+            BoundStateTracker('manakovv', self.tvec).step(self.signal(1.0))
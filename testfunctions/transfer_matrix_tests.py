@@ -0,0 +1,80 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from .array_test import relnorm
+from FNFTpy import nsev, kdvv, manakovv, nsev_xi, kdvv_xi, manakovv_xi
+
+
+class ContinuousSpectrumXiTest(unittest.TestCase):
+    """Testcase for the continuous spectrum at arbitrary xi: must equal the BO discretization of FNFT on the grid."""
+
+    def setUp(self):
+        D = 2048
+        self.tvec = np.linspace(-15, 15, D)
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+        self.M = 33
+        self.xi = np.linspace(-2, 2, self.M)
+
+    def test_nsev_xi(self):
+        for kappa in [1, -1]:
+            res = nsev(self.q, self.tvec, M=self.M, kappa=kappa, cst=2, dis=1)
+            res_xi = nsev_xi(self.q, self.tvec, self.xi, kappa=kappa, cst=2)
+            for k in ['cont_ref', 'cont_a', 'cont_b']:
+                self.assertTrue(relnorm(res[k], res_xi[k]) < 1e-10, "%s differs" % k)
+
+    def test_kdvv_xi(self):
+        u = 2.0 / np.cosh(self.tvec) ** 2
+        res = kdvv(u, self.tvec, M=self.M, cst=2, dis=1)
+        res_xi = kdvv_xi(u, self.tvec, self.xi, cst=2)
+        for k in ['cont_ref', 'cont_a', 'cont_b']:
+            self.assertTrue(relnorm(res[k], res_xi[k]) < 1e-8, "%s differs" % k)
+
+    def test_manakovv_xi(self):
+        q2 = 0.5 / np.cosh(self.tvec - 1)
+        res = manakovv(self.q, q2, self.tvec, Xi1=-2, Xi2=2, M=self.M, cst=2, dis=12)
+        res_xi = manakovv_xi(self.q, q2, self.tvec, self.xi, cst=2)
+        for k in ['cont_ref1', 'cont_ref2', 'cont_a', 'cont_b1', 'cont_b2']:
+            self.assertTrue(relnorm(res[k], res_xi[k]) < 1e-8, "%s differs" % k)
+
+    def test_manakovv_reduces_to_nsev(self):
+        for kappa in [1, -1]:
+            res = nsev_xi(self.q, self.tvec, self.xi, kappa=kappa, cst=1)
+            res_m = manakovv_xi(0.6 * self.q, 0.8 * self.q, self.tvec, self.xi, kappa=kappa, cst=1)
+            self.assertTrue(relnorm(res['cont_a'], res_m['cont_a']) < 1e-10)
+            self.assertTrue(relnorm(0.6 * res['cont_b'], res_m['cont_b1']) < 1e-10)
+            self.assertTrue(relnorm(0.8 * res['cont_b'], res_m['cont_b2']) < 1e-10)
+
+    def test_arbitrary_points(self):
+        res = nsev_xi(self.q, self.tvec, self.xi)
+        idx = [17, 3, 30, 3]
+        res_sub = nsev_xi(self.q, self.tvec, self.xi[idx])
+        self.assertTrue(np.allclose(res_sub['cont_ref'], res['cont_ref'][idx], rtol=1e-12, atol=1e-14))
+        self.assertTrue(np.array_equal(res_sub.metadata['xi'], self.xi[idx]))
@@ -0,0 +1,83 @@
+"""
+This file is part of FNFTpy.
+FNFTpy provides wrapper functions to interact with FNFT,
+a library for the numerical computation of nonlinear Fourier transforms.
+
+For FNFTpy to work, a copy of FNFT has to be installed.
+For general information, source files and installation of FNFT,
+visit FNFT's github page: https://github.com/FastNFT
+
+For information about setup and usage of FNFTpy see README.md or documentation.
+
+FNFTpy is free software; you can redistribute it and/or
+modify it under the terms of the version 2 of the GNU General
+Public License as published by the Free Software Foundation.
+
+FNFTpy is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+Contributors:
+
+Christoph Mahnke, 2018-2023
+
+"""
+
+import unittest
+import numpy as np
+from .array_test import relnorm
+from FNFTpy import nsev, nsev_xi, NsevZoom, nsev_zoom
+from FNFTpy.zoom import chirpz
+
+
+class NsevZoomTest(unittest.TestCase):
+    """Testcase for the zoomed continuous spectrum: chirp-z evaluation and second order accuracy."""
+
+    def setUp(self):
+        self.tvec = np.linspace(-15, 15, 2048)
+        self.q = 1.3 / np.cosh(self.tvec) * np.exp(0.4j * self.tvec)
+
+    def test_chirpz(self):
+        rng = np.random.default_rng(0)
+        c = rng.standard_normal((2, 300)) + 1.0j * rng.standard_normal((2, 300))
+        z = np.exp(1.0j * (0.3 + 0.002 * np.arange(50)))
+        X = chirpz(c, 50, 0.3, 0.002)
+        for i in range(2):
+            self.assertTrue(relnorm(np.polyval(c[i, ::-1], z), X[i]) < 1e-12)
+
+    def test_second_order(self):
+        for kappa in [1, -1]:
+            err = []
+            for D in [1024, 4096]:
+                tvec = np.linspace(-15, 15, D)
+                q = 1.3 / np.cosh(tvec) * np.exp(0.4j * tvec)
+                res = NsevZoom(q, tvec, kappa=kappa).evaluate(0.3, 0.5, 40, cst=2)
+                res_ref = nsev_xi(q, tvec, res.metadata['xi'], kappa=kappa, cst=2)
+                err.append(np.max(np.abs(res['cont_b'] - res_ref['cont_b'])))
+            self.assertTrue(err[1] < err[0] / 12, "kappa=%d: no second order convergence" % kappa)
+
+    def test_band_independence(self):
+        zoom = NsevZoom(self.q, self.tvec)
+        res = zoom.evaluate(-1, 1, 201, cst=1)
+        res_band = zoom.evaluate(0.2, 0.3, 11, cst=1)
+        self.assertTrue(relnorm(res['cont_a'][120:131], res_band['cont_a']) < 1e-10)
+        self.assertTrue(relnorm(res['cont_b'][120:131], res_band['cont_b']) < 1e-10)
+
+    def test_dense_band(self):
+        res = nsev_zoom(self.q, self.tvec, 0.3, 0.31, 2 ** 14)
+        xi = res.metadata['xi']
+        self.assertEqual(len(res['cont_ref']), 2 ** 14)
+        idx = [0, 5000, 2 ** 14 - 1]
+        res_ref = nsev_xi(self.q, self.tvec, xi[idx])
+        self.assertTrue(relnorm(res_ref['cont_ref'], res['cont_ref'][idx]) < 1e-4)
+
+    def test_discrete_spectrum(self):
+        res = nsev_zoom(self.q, self.tvec, 0.3, 0.5, 40, dst=0)
+        res_full = nsev(self.q, self.tvec, Xi1=0.3, Xi2=0.5, M=40, dst=0)
+        self.assertEqual(res['bound_states_num'], res_full['bound_states_num'])
+        self.assertTrue(relnorm(res_full['cont_ref'], res['cont_ref']) < 1e-3)
+        self.assertNotIn('bound_states', nsev_zoom(self.q, self.tvec, 0.3, 0.5, 40))